@@ -26,6 +26,8 @@ AGENT_TOOLS = [
     tools.hesap_makinesi,
     tools.dusuk_stok_raporu,
     tools.kar_zarar_raporu,
+    tools.en_cok_satanlar,
+    tools.en_karli_urunler,
 ]
 
 
@@ -96,5 +98,20 @@ class StokGoldAgent:
             print(f"{error_message}\n--- Traceback ---\n{traceback.format_exc()}")
             return "Üzgünüm, beklenmedik bir hata oluştu. Detaylar konsola yazdırıldı."
 
+    async def arun(self, user_query: str, chat_history: list = None) -> str:
+        """run() ile aynı, ancak olay döngüsünü bloklamaz; araçlar app.database_async üzerinden çalışır."""
+        if chat_history is None:
+            chat_history = []
+        try:
+            response = await self.agent_executor.ainvoke({
+                "input": user_query,
+                "chat_history": chat_history
+            })
+            return response.get('output', "Üzgünüm, bir cevap oluşturamadım.")
+        except Exception as e:
+            error_message = f"Agent çalışırken bir hata oluştu: {e}"
+            print(f"{error_message}\n--- Traceback ---\n{traceback.format_exc()}")
+            return "Üzgünüm, beklenmedik bir hata oluştu. Detaylar konsola yazdırıldı."
+
 
 
@@ -11,18 +11,16 @@ from dateutil.relativedelta import relativedelta
 
 # Veritabanı fonksiyonlarımıza erişmek için import ediyoruz
 from app.database import (
-    search_products,
     get_low_stock_products,
     get_statistics_for_period,
-    get_total_grams,
-    get_total_inventory_value,
-    get_product_variety_count,
-    add_product,
-    update_stock,
-    log_transaction,
+    get_best_selling_products,
+    get_top_profitable_products,
+    get_dashboard_snapshot,
     get_transactions_for_date
 )
 from app.models import Urun
+from app.product_repository import get_product_repository
+from app import database_async
 
 # --- YARDIMCI FONKSİYON ---
 def _format_product_list(urunler: list[Urun]) -> str:
@@ -46,7 +44,7 @@ def _format_product_list(urunler: list[Urun]) -> str:
 def urun_ara(sorgu: str) -> str:
     """Veritabanında ürün kodu veya ürün cinsi ile genel bir arama yapmak için kullanılır."""
     print(f">>> Araç Kullanılıyor: urun_ara, Sorgu: {sorgu}")
-    sonuclar = search_products(sorgu)
+    sonuclar = get_product_repository().search(sorgu)
     return _format_product_list(sonuclar)
 
 
@@ -55,7 +53,7 @@ def urun_ara(sorgu: str) -> str:
 def get_stock_count_for_product(urun_adi: str) -> str:
     """Sadece bir ürünün stok adedini öğrenmek için kullanılır. Kullanıcı 'sayı', 'adet', 'stok durumu' sorduğunda bu en iyi araçtır."""
     print(f">>> Araç Kullanılıyor (Doğrudan Cevap): get_stock_count_for_product, Ürün: {urun_adi}")
-    results = search_products(urun_adi)
+    results = get_product_repository().search(urun_adi)
     if not results: return f"'{urun_adi}' adında bir ürün bulunamadı."
     if len(results) == 1:
         urun = results[0]
@@ -68,7 +66,7 @@ def get_stock_count_for_product(urun_adi: str) -> str:
 def stok_guncelle(urun_adi: str, miktar: int) -> str:
     """Mevcut bir ürünün stok adedini artırmak veya azaltmak için kullanılır. Artış için pozitif (3), azalış için negatif (-2) miktar verilir."""
     print(f">>> Araç Kullanılıyor (Yazma): stok_guncelle, Ürün: {urun_adi}, Miktar: {miktar}")
-    results = search_products(urun_adi)
+    results = get_product_repository().search(urun_adi)
     if not results: return f"'{urun_adi}' adında bir ürün bulunamadı."
     if len(results) > 1: return f"'{urun_adi}' aramasıyla birden fazla ürün bulundu. Lütfen daha spesifik olun."
     urun = results[0]
@@ -76,9 +74,11 @@ def stok_guncelle(urun_adi: str, miktar: int) -> str:
         return f"İşlem başarısız. Stok yeterli değil. Mevcut stok: {urun.stok_adeti}"
     islem_tipi = 'Alış' if miktar > 0 else 'Satış'
     birim_fiyat = urun.maliyet if islem_tipi == 'Alış' else urun.satis_fiyati
-    if update_stock(urun.id, miktar):
-        log_transaction(urun.id, islem_tipi, abs(miktar), birim_fiyat)
-        yeni_stok = urun.stok_adeti + miktar
+    try:
+        yeni_stok = get_product_repository().record_movement(urun.id, islem_tipi, abs(miktar), birim_fiyat)
+    except ValueError as e:
+        return f"İşlem başarısız. {e}"
+    if yeni_stok is not None:
         return f"Başarılı! '{urun.cins}' ürününün stoğu güncellendi. Yeni stok: {yeni_stok} adet."
     else:
         return "Stok güncellenirken bir veritabanı hatası oluştu."
@@ -93,23 +93,47 @@ def add_new_product(urun_kodu: str, cins: str, stok_adeti: int, maliyet: float,
             maliyet=maliyet, satis_fiyati=satis_fiyati, ayar=ayar, gram=gram,
             eklenme_tarihi=date.today()
         )
-        yeni_id = add_product(yeni_urun)
+        yeni_id = get_product_repository().add(yeni_urun, log_opening=True)
         if yeni_id:
-            log_transaction(yeni_id, 'Alış', stok_adeti, maliyet)
             return f"Başarılı! '{cins}' ürünü, '{urun_kodu}' koduyla sisteme eklendi."
         else: return "Ürün eklenirken bir veritabanı hatası oluştu."
     except Exception as e: return f"Ürün eklenirken bir hata oluştu: {e}"
 
 @tool(return_direct=True)
-def dusuk_stok_raporu(esik_deger: int) -> str:
-    """Stoğu belirtilen eşik değerinin altına düşmüş olan ürünleri listeler."""
+def dusuk_stok_raporu(esik_deger: int = None) -> str:
+    """
+    Kritik stoktaki ürünleri listeler. Kullanıcı bir sayı belirtirse stoğu o sayının altına
+    düşmüş ürünler, belirtmezse kendi kritik stok eşiğine inmiş ürünler listelenir.
+    """
     print(f">>> Araç Kullanılıyor (Doğrudan Cevap): dusuk_stok_raporu, Eşik Değer: {esik_deger}")
     sonuclar = get_low_stock_products(esik_deger)
+    if esik_deger is None:
+        if not sonuclar: return "Kritik stok seviyesinde ürün bulunmuyor."
+        response_lines = ["Kritik stok seviyesindeki ürünler:"]
+        for row in sonuclar: response_lines.append(f"- Cins: {row['cins']}, Kod: {row['urun_kodu']}, Mevcut Stok: {row['stok_adeti']} (Eşik: {row['kritik_esik']})")
+        return "\n".join(response_lines)
     if not sonuclar: return f"Stoğu {esik_deger} adedinin altında olan ürün bulunmuyor."
     response_lines = [f"Stoğu {esik_deger} adedinin altında olan ürünler:"]
     for row in sonuclar: response_lines.append(f"- Cins: {row['cins']}, Kod: {row['urun_kodu']}, Mevcut Stok: {row['stok_adeti']}")
     return "\n".join(response_lines)
 
+_PERIOD_FORMAT_ERROR = "Tarih formatı anlaşılamadı. Lütfen 'YYYY-MM-DD' formatını veya 'bugün', 'geçen ay' gibi ifadeleri kullanın."
+
+def _parse_period(baslangic_tarihi: str, bitis_tarihi: str) -> tuple[date, date]:
+    """Araçlara gelen 'YYYY-MM-DD', 'bugün', 'dün', 'bu ay', 'geçen ay' ifadelerini tarihe çevirir; anlaşılamazsa ValueError."""
+    today = date.today()
+    if baslangic_tarihi == 'bugün': start_date = today
+    elif baslangic_tarihi == 'dün': start_date = today - timedelta(days=1)
+    elif baslangic_tarihi == 'bu ay': start_date = today.replace(day=1)
+    elif baslangic_tarihi == 'geçen ay': start_date = (today - relativedelta(months=1)).replace(day=1)
+    else: start_date = datetime.strptime(baslangic_tarihi, "%Y-%m-%d").date()
+    if bitis_tarihi == 'bugün': end_date = today
+    elif bitis_tarihi == 'dün': end_date = today - timedelta(days=1)
+    elif bitis_tarihi == 'bu ay': end_date = today
+    elif bitis_tarihi == 'geçen ay': end_date = today.replace(day=1) - timedelta(days=1)
+    else: end_date = datetime.strptime(bitis_tarihi, "%Y-%m-%d").date()
+    return start_date, end_date
+
 @tool(return_direct=True)
 def kar_zarar_raporu(baslangic_tarihi: str, bitis_tarihi: str) -> str:
     """
@@ -118,20 +142,8 @@ def kar_zarar_raporu(baslangic_tarihi: str, bitis_tarihi: str) -> str:
         Eğer kullanıcı tek tek ürün listesi istiyorsa bu aracı KULLANMA.
         """
     print(f">>> Araç Kullanılıyor (Doğrudan Cevap): kar_zarar_raporu, Başlangıç: {baslangic_tarihi}, Bitiş: {bitis_tarihi}")
-    today = date.today()
-    try:
-        if baslangic_tarihi == 'bugün': start_date = today
-        elif baslangic_tarihi == 'dün': start_date = today - timedelta(days=1)
-        elif baslangic_tarihi == 'bu ay': start_date = today.replace(day=1)
-        elif baslangic_tarihi == 'geçen ay': start_date = (today - relativedelta(months=1)).replace(day=1)
-        else: start_date = datetime.strptime(baslangic_tarihi, "%Y-%m-%d").date()
-        if bitis_tarihi == 'bugün': end_date = today
-        elif bitis_tarihi == 'dün': end_date = today - timedelta(days=1)
-        elif bitis_tarihi == 'bu ay': end_date = today
-        elif bitis_tarihi == 'geçen ay': end_date = today.replace(day=1) - timedelta(days=1)
-        else: end_date = datetime.strptime(bitis_tarihi, "%Y-%m-%d").date()
-    except ValueError:
-        return "Tarih formatı anlaşılamadı. Lütfen 'YYYY-MM-DD' formatını veya 'bugün', 'geçen ay' gibi ifadeleri kullanın."
+    try: start_date, end_date = _parse_period(baslangic_tarihi, bitis_tarihi)
+    except ValueError: return _PERIOD_FORMAT_ERROR
     stats = get_statistics_for_period(start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
     return (f"Rapor Dönemi: {start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')}\n"
             f"----------------------------------------\n"
@@ -140,6 +152,40 @@ def kar_zarar_raporu(baslangic_tarihi: str, bitis_tarihi: str) -> str:
             f"- Net Kâr / Zarar: {stats['net_profit']:,.2f} TL")
 
 
+@tool(return_direct=True)
+def en_cok_satanlar(baslangic_tarihi: str, bitis_tarihi: str, siralama: str = "tutar", urun_sayisi: int = 5) -> str:
+    """
+    Belirtilen tarihler arasında EN ÇOK SATAN ürünleri listeler. Tarihler 'YYYY-MM-DD' veya
+    'bugün', 'dün', 'bu ay', 'geçen ay' olabilir. 'siralama' olarak satış tutarına göre 'tutar'
+    ya da satılan adede göre 'adet' verilebilir.
+    """
+    print(f">>> Araç Kullanılıyor (Doğrudan Cevap): en_cok_satanlar, Başlangıç: {baslangic_tarihi}, Bitiş: {bitis_tarihi}, Sıralama: {siralama}")
+    try: start_date, end_date = _parse_period(baslangic_tarihi, bitis_tarihi)
+    except ValueError: return _PERIOD_FORMAT_ERROR
+    if siralama not in ('tutar', 'adet'): siralama = 'tutar'
+    sonuclar = get_best_selling_products(start_date.isoformat(), end_date.isoformat(), urun_sayisi, by=siralama)
+    donem = f"{start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')}"
+    if not sonuclar: return f"{donem} döneminde satış bulunamadı."
+    response_lines = [f"{donem} döneminin en çok satan ürünleri:"]
+    for row in sonuclar:
+        urun = f"Cins: {row['cins']}, Kod: {row['urun_kodu']}" if row['urun_kodu'] is not None else "Silinmiş ürün"
+        response_lines.append(f"- {urun}, Satılan: {row['satilan_adet']} adet, Satış Tutarı: {row['satis_tutari']:,.2f} TL")
+    return "\n".join(response_lines)
+
+@tool(return_direct=True)
+def en_karli_urunler(urun_sayisi: int = 5) -> str:
+    """
+    Mevcut stoğu satılırsa EN ÇOK KÂR getirecek ürünleri (potansiyel kâr) listeler.
+    Geçmiş satışlardan elde edilen kâr için bu aracı değil kar_zarar_raporu'nu kullan.
+    """
+    print(f">>> Araç Kullanılıyor (Doğrudan Cevap): en_karli_urunler, Ürün Sayısı: {urun_sayisi}")
+    sonuclar = get_top_profitable_products(urun_sayisi)
+    if not sonuclar: return "Satış fiyatı ve maliyeti girilmiş, stokta bulunan ürün yok."
+    response_lines = ["Potansiyel kârı en yüksek ürünler:"]
+    for row in sonuclar: response_lines.append(f"- Cins: {row['cins']}, Kod: {row['urun_kodu']}, Potansiyel Kâr: {row['potansiyel_kar']:,.2f} TL")
+    return "\n".join(response_lines)
+
+
 @tool(return_direct=True)
 def gunluk_islem_detaylari_getir(tarih: str, islem_tipi: str = "Tümü") -> str:
     """
@@ -184,8 +230,14 @@ def gunluk_islem_detaylari_getir(tarih: str, islem_tipi: str = "Tümü") -> str:
 def get_inventory_summary() -> str:
     """Envanterin genel bir özetini almak için kullanılır."""
     print(f">>> Araç Kullanılıyor (Doğrudan Cevap): get_inventory_summary")
-    total_value = get_total_inventory_value(); total_grams = get_total_grams(); variety_count = get_product_variety_count()
-    return (f"Envanter Özeti:\n- Toplam Ürün Çeşidi: {variety_count}\n- Toplam Gramaj: {total_grams:,.2f} gr\n- Toplam Maliyet: {total_value:,.2f} TL")
+    return _format_inventory_summary(get_dashboard_snapshot())
+
+async def _get_inventory_summary_async() -> str:
+    print(f">>> Araç Kullanılıyor (Doğrudan Cevap, async): get_inventory_summary")
+    return _format_inventory_summary(await database_async.get_dashboard_snapshot())
+
+def _format_inventory_summary(snapshot: dict) -> str:
+    return (f"Envanter Özeti:\n- Toplam Ürün Çeşidi: {snapshot['variety_count']}\n- Toplam Gramaj: {snapshot['total_grams']:,.2f} gr\n- Toplam Maliyet: {snapshot['total_value']:,.2f} TL")
 
 @tool
 def hesap_makinesi(ifade: str) -> str:
@@ -203,7 +255,7 @@ def hesap_makinesi(ifade: str) -> str:
 def urun_detaylarini_getir(sorgu: str) -> str:
     """Bir ürün hakkında stok, maliyet, satış fiyatı gibi BİRDEN FAZLA VEYA DETAYLI bilgiyi almak için kullanılır."""
     print(f">>> Araç Kullanılıyor (Doğrudan Cevap): urun_detaylarini_getir, Sorgu: {sorgu}")
-    sonuclar = search_products(sorgu)
+    sonuclar = get_product_repository().search(sorgu)
     if not sonuclar: return f"'{sorgu}' aramasına uygun ürün bulunamadı."
     lines = ["Bulunan ürün detayları:"]
     for urun in sonuclar:
@@ -217,7 +269,7 @@ def urun_detaylarini_getir(sorgu: str) -> str:
 def satis_kari_hesapla(urun_adi: str, adet: int) -> str:
     """Belirli bir üründen belirtilen adette satılırsa ne kadar TOPLAM KÂR elde edileceğini hesaplar."""
     print(f">>> Araç Kullanılıyor (Hesaplama): satis_kari_hesapla, Ürün: {urun_adi}, Adet: {adet}")
-    results = search_products(urun_adi)
+    results = get_product_repository().search(urun_adi)
     if not results: return f"'{urun_adi}' adında bir ürün bulunamadı."
     if len(results) > 1: return f"'{urun_adi}' aramasıyla birden fazla ürün bulundu. Lütfen daha spesifik olun."
     urun = results[0]
@@ -225,4 +277,21 @@ def satis_kari_hesapla(urun_adi: str, adet: int) -> str:
         return f"'{urun.cins}' ürününün kâr hesaplaması için satış fiyatı ve maliyet bilgileri eksik."
     birim_kar = urun.satis_fiyati - urun.maliyet
     toplam_kar = birim_kar * adet
-    return (f"'{urun.cins}' ürününden birim kâr: {birim_kar:,.2f} TL. Toplam {adet} adet satıştan elde edilecek kâr: {toplam_kar:,.2f} TL.")
\ No newline at end of file
+    return (f"'{urun.cins}' ürününden birim kâr: {birim_kar:,.2f} TL. Toplam {adet} adet satıştan elde edilecek kâr: {toplam_kar:,.2f} TL.")
+
+
+# --- ASYNC ÇALIŞTIRMA ---
+# Agent ainvoke ile çalıştırıldığında veritabanına dokunan araçlar LangChain'in varsayılan
+# executor'ı yerine app.database_async thread'lerinde çalışır: okuyan araçlar okuyucu havuzunda,
+# yazan araçlar tek yazıcı thread'de sırayla. Böylece araç çağrıları LLM beklerken olay döngüsünü tıkamaz.
+def _bind_coroutine(arac, runner):
+    async def coroutine(*args, **kwargs):
+        return await runner(arac.func, *args, **kwargs)
+    arac.coroutine = coroutine
+
+for _arac in (urun_ara, get_stock_count_for_product, dusuk_stok_raporu, kar_zarar_raporu,
+              en_cok_satanlar, en_karli_urunler, gunluk_islem_detaylari_getir, urun_detaylarini_getir, satis_kari_hesapla):
+    _bind_coroutine(_arac, database_async.run_read)
+for _arac in (stok_guncelle, add_new_product):
+    _bind_coroutine(_arac, database_async.run_write)
+get_inventory_summary.coroutine = _get_inventory_summary_async
@@ -4,41 +4,163 @@
 
 import os
 import shutil
+import sqlite3
+import time
 from datetime import datetime
 from .utils import DATABASE_PATH
+from .database import close_all, create_table, get_archived_years, get_archive_path, get_db_connection
+from . import data_changes, database_async
 
-def backup_database(target_directory: str) -> (bool, str):
+# Yedekleme her adımda bu kadar sayfa kopyalar; adımlar arasında diğer bağlantılar yazabilir
+BACKUP_STEP_PAGES = 1024
+# Yedeklemenin disk hızı üst sınırı (bayt/sn); büyük veritabanlarında uygulamanın geri kalanı
+# (satış kaydı, sayfa sorguları) diski yedeklemeyle paylaşabilsin diye
+BACKUP_MAX_BYTES_PER_SECOND = 32 * 1024 * 1024
+
+def _copy_missing_archives(source_directory: str, target_directory: str) -> list[int]:
+    """
+    Arşivlenmiş yılların dosyalarından hedef klasörde olmayanları kopyalar. Arşiv dosyaları
+    yazıldıktan sonra değişmediği için mevcut olanların üzerine yazılmaz. Kaynakta da
+    bulunamayan yılları döndürür.
+    """
+    missing = []
+    for year in get_archived_years():
+        file_name = os.path.basename(get_archive_path(year))
+        source = os.path.join(source_directory, file_name)
+        target = os.path.join(target_directory, file_name)
+        if os.path.exists(target):
+            continue
+        if os.path.exists(source):
+            shutil.copy2(source, target)
+        else:
+            missing.append(year)
+    return missing
+
+def _online_backup(conn: sqlite3.Connection, destination_path: str, progress=None):
+    """
+    SQLite yedekleme API'siyle veritabanını BACKUP_STEP_PAGES sayfalık adımlarla kopyalar ve
+    hızı BACKUP_MAX_BYTES_PER_SECOND ile sınırlar. Kaynakta açık tutulan okuma işlemi yedeği
+    başlangıçtaki anlık görüntüye sabitler: adımlar arasında başka bağlantıların yazması
+    yedeği baştan başlatmaz ve yazmaları da engellemez (WAL).
+    """
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    started = time.monotonic()
+
+    def on_step(status, remaining, total):
+        done = total - remaining
+        if progress is not None:
+            progress(done, total)
+        # Sınırın izin verdiği süreden hızlı gidildiyse aradaki fark kadar beklenir
+        delay = done * page_size / BACKUP_MAX_BYTES_PER_SECOND - (time.monotonic() - started)
+        if delay > 0:
+            time.sleep(delay)
+
+    destination = sqlite3.connect(destination_path)
+    try:
+        conn.execute("BEGIN")
+        conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        conn.backup(destination, pages=BACKUP_STEP_PAGES, progress=on_step)
+    finally:
+        conn.rollback()
+        destination.close()
+
+def _unused_backup_path(target_directory: str, timestamp: str) -> str:
+    """Klasörde henüz bulunmayan, tarih damgalı bir yedek dosyası yolu döndürür."""
+    destination_path = os.path.join(target_directory, f"stokgold_backup_{timestamp}.db")
+    counter = 2
+    while os.path.exists(destination_path):
+        destination_path = os.path.join(target_directory, f"stokgold_backup_{timestamp}_{counter}.db")
+        counter += 1
+    return destination_path
+
+def backup_database(target_directory: str, compact: bool = False, progress=None) -> (bool, str):
     """
-    Mevcut veritabanını belirtilen klasöre yedekler.
+    Mevcut veritabanını ve arşiv dosyalarını belirtilen klasöre yedekler.
     Başarı durumunu ve mesajı döndürür.
+
+    Uygulama açıkken de tutarlı bir kopya alınır; uzun sürebileceği için arayüz thread'i
+    dışında çağrılmalıdır. progress verilirse (kopyalanan, toplam) sayfa sayısıyla çağrılır.
+    compact verilirse yedek VACUUM INTO ile boş sayfalardan arındırılmış olarak yazılır; bu
+    daha yavaştır, hız sınırı uygulanmaz ve ilerleme (0, 0) ile belirsiz olarak bildirilir.
     """
     try:
         if not os.path.exists(DATABASE_PATH):
             return False, "Yedeklenecek veritabanı dosyası bulunamadı."
 
-        # Yedek dosyası için tarih damgalı bir isim oluştur
         timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
-        backup_file_name = f"stokgold_backup_{timestamp}.db"
-        destination_path = os.path.join(target_directory, backup_file_name)
+        # Yedek önce bu denemenin oluşturduğu geçici bir dosyaya yazılır; yalnızca tamamlanınca
+        # tarih damgalı adını alır. Hata olursa yalnızca bu geçici dosya silinir, klasörde
+        # önceden bulunan dosyalara dokunulmaz. ('x' kipi dosya zaten varsa hata verir;
+        # VACUUM INTO boş bir hedef dosyayı kabul eder.)
+        partial_path = os.path.join(target_directory, f"stokgold_backup_{timestamp}.{os.getpid()}.partial")
+        open(partial_path, 'x').close()
+        try:
+            # Çalışan uygulamanın bağlantı havuzundan bağımsız, yalnızca yedek için bir bağlantı
+            conn = get_db_connection()
+            try:
+                if compact:
+                    if progress is not None:
+                        progress(0, 0)
+                    conn.execute("VACUUM INTO ?", (partial_path,))
+                else:
+                    _online_backup(conn, partial_path, progress)
+            finally:
+                conn.close()
+            destination_path = _unused_backup_path(target_directory, timestamp)
+            os.replace(partial_path, destination_path)
+        except Exception:
+            # Yarım kalan yedek dosyası geçerli bir yedek gibi görünmesin
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
 
-        # Veritabanı dosyasını kopyala
-        shutil.copy2(DATABASE_PATH, destination_path)
-        return True, f"Veritabanı başarıyla '{destination_path}' konumuna yedeklendi."
+        # Yıllık arşivler yedekle aynı klasöre; klasörde zaten olanlar tekrar kopyalanmaz
+        missing = _copy_missing_archives(os.path.dirname(DATABASE_PATH), target_directory)
+        message = f"Veritabanı başarıyla '{destination_path}' konumuna yedeklendi."
+        if missing:
+            message += f"\nUyarı: şu yılların arşiv dosyaları bulunamadı: {', '.join(map(str, missing))}"
+        return True, message
     except Exception as e:
         return False, f"Yedekleme sırasında bir hata oluştu: {e}"
 
 def restore_database(source_path: str) -> (bool, str):
     """
     Seçilen yedek dosyasından geri yükleme yapar.
-    Bu işlem mevcut veritabanının üzerine yazar.
+    Bu işlem mevcut veritabanının üzerine yazar. Yedeğin arşivlediği yılların dosyaları
+    veri klasöründe yoksa yedek dosyasının bulunduğu klasörden alınır.
+
+    Havuzdaki bağlantılar kapatılırken hiçbir thread onları kullanıyor olmamalıdır:
+    database_async işleri burada bitirilir; arayüzün sorgu thread'lerini (QueryRunner)
+    çağıran taraf önceden boşaltmalıdır.
     """
     try:
         if not os.path.exists(source_path):
             return False, "Seçilen yedek dosyası bulunamadı."
 
+        # Arka plan işleri bitmeden bağlantıları kapatılmasın; sonra açık bağlantılar
+        # eski dosyayı tutmasın diye havuzu kapat
+        database_async.shutdown()
+        close_all()
+
+        # Eski veritabanına ait WAL dosyaları yeni dosyaya uygulanmasın
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(DATABASE_PATH + suffix):
+                os.remove(DATABASE_PATH + suffix)
+
         # Mevcut veritabanı dosyasını yedekten gelenle değiştir
         shutil.copy2(source_path, DATABASE_PATH)
 
-        return True, "Veritabanı başarıyla geri yüklendi. Değişikliklerin etkili olması için lütfen uygulamayı yeniden başlatın."
+        # Eski sürümde alınmış bir yedek, sayfalar yeniden okumadan önce güncel şemaya taşınır
+        create_table()
+
+        missing = _copy_missing_archives(os.path.dirname(os.path.abspath(source_path)), os.path.dirname(DATABASE_PATH))
+
+        # Bellekteki kopyalar ve açık sayfalar eski veritabanına ait; hepsi yeniden okusun
+        data_changes.publish({data_changes.EXTERNAL_CHANGE: set()})
+
+        message = "Veritabanı başarıyla geri yüklendi. Değişikliklerin etkili olması için lütfen uygulamayı yeniden başlatın."
+        if missing:
+            message += f"\nUyarı: şu yılların arşiv dosyaları bulunamadı, bu yılların hareketleri raporlarda görünmeyecek: {', '.join(map(str, missing))}"
+        return True, message
     except Exception as e:
         return False, f"Geri yükleme sırasında bir hata oluştu: {e}"
\ No newline at end of file
@@ -0,0 +1,80 @@
+# MIT License
+# Copyright (c) 2025 Aykut Yahya Ay
+# See LICENSE file for full license details.
+
+"""
+Veritabanı değişiklik bildirimleri.
+
+database.py'deki yazma fonksiyonları neyi değiştirdiklerini işlemleri içinde
+kaydeder; işlem commit edildiğinde değişiklikler tek bir küme halinde abonelere
+yayınlanır, geri alınırsa atılır. Uygulama dışından gelen değişiklikler (başka bir
+süreç, veritabanı dosyasının geri yüklenmesi) database.check_external_changes() ile
+yakalanır ve EXTERNAL_CHANGE olarak yayınlanır.
+
+Abonelere {tür: ID kümesi} sözlüğü verilir. Abone, yayını yapan thread'de (commit
+eden thread) çağrılır; arayüz tarafı için app.ui.data_change_notifier kullanılmalıdır.
+"""
+
+import threading
+
+PRODUCT_UPSERTED = "product_upserted"
+PRODUCT_DELETED = "product_deleted"
+# Hareket kaydedildi; ilgili ürünlerin stok adedi de değişmiş olabilir. ID'ler ürün ID'leridir.
+MOVEMENT_LOGGED = "movement_logged"
+REPAIR_CHANGED = "repair_changed"
+# Bir satış/stok düşüşü ürünü kritik stok eşiğine (min_stok) indirdi. Her zaman
+# MOVEMENT_LOGGED ya da PRODUCT_UPSERTED ile birlikte gelir.
+LOW_STOCK_REACHED = "low_stock_reached"
+# Neyin değiştiği bilinmiyor; her şey yeniden okunmalı. ID kümesi boştur.
+EXTERNAL_CHANGE = "external_change"
+
+_subscribers = []
+_subscribers_lock = threading.Lock()
+_local_commits = 0
+
+
+def subscribe(callback):
+    """callback(changes) her commit sonrasında çağrılır. callback'i geri döndürür."""
+    with _subscribers_lock:
+        _subscribers.append(callback)
+    return callback
+
+
+def unsubscribe(callback):
+    with _subscribers_lock:
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+
+
+def local_commit_count() -> int:
+    """
+    Bu süreçte veritabanına yazan commit sayısı; dış değişiklikleri ayırt etmek için
+    kullanılır. Değişiklik yayınlamayan commit'ler (arşivleme, şema geçişi) de sayılır.
+    """
+    return _local_commits
+
+
+def note_local_commit():
+    """Bu süreçteki bir bağlantının veritabanına yazan bir commit yaptığını kaydeder."""
+    global _local_commits
+    with _subscribers_lock:
+        _local_commits += 1
+
+
+def merge(target: dict, changes: dict):
+    """changes içindeki türleri ve ID'leri target'a ekler."""
+    for kind, ids in changes.items():
+        target.setdefault(kind, set()).update(ids)
+
+
+def publish(changes: dict):
+    """Değişiklikleri tüm abonelere iletir. Bir abonenin hatası diğerlerini etkilemez."""
+    if not changes:
+        return
+    with _subscribers_lock:
+        subscribers = list(_subscribers)
+    for callback in subscribers:
+        try:
+            callback(changes)
+        except Exception as e:
+            print(f"Değişiklik bildirimi hatası ({getattr(callback, '__qualname__', callback)}): {e}")
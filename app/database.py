@@ -2,380 +2,1733 @@
 # Copyright (c) 2025 Aykut Yahya Ay
 # See LICENSE file for full license details.
 
-from datetime import datetime
-from .models import Urun
-from .tamir_model import Tamir
+import configparser
+import queue
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import date, timedelta
+from .models import Urun, URUN_COLUMNS, DEFAULT_MIN_STOK
+from .tamir_model import Tamir, TAMIR_COLUMNS
+from . import data_changes, query_trace
+from .query_trace import traced
 import sqlite3
-from .utils import DATABASE_PATH
+import threading
+from .utils import DATABASE_PATH, CONFIG_PATH, get_base_path
 import os
 
 
+# Bağlantı başına tutulacak hazır (prepared) SQL ifadesi sayısı.
+# sqlite3'ün varsayılanı 128'dir; fonksiyon sayısı arttıkça önbellekten düşmemeleri için büyütüyoruz.
+STATEMENT_CACHE_SIZE = 256
+
+# Bağlantı açılırken uygulanan depolama ayarları. config.ini içindeki
+# [Database] profile anahtarı hangisinin kullanılacağını seçer; [profile:<ad>]
+# bölümleri bu değerleri ezebilir.
+TUNING_PROFILES = {
+    # Her commit diske tam olarak yazılır; elektrik kesintisine karşı en güvenli seçenek.
+    'safe': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'mmap_size': 0,
+        'cache_size': -8000,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+    },
+    # WAL + NORMAL: uygulama çökse de veri kaybolmaz, yalnızca işletim sistemi
+    # çökerse son commit'ler kaybolabilir. Günlük kullanım için önerilen ayar.
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,
+        'cache_size': -32000,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # Yoğun satış günleri için: commit'lerde fsync yapılmaz. Elektrik kesintisinde
+    # son işlemler kaybolabilir, bu yüzden düzenli yedekle birlikte kullanılmalıdır.
+    'fast-pos': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'mmap_size': 1073741824,
+        'cache_size': -128000,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,
+    },
+}
+DEFAULT_PROFILE = 'balanced'
+
+_thread_local = threading.local()
+_pool_lock = threading.Lock()
+_open_connections = []
+_pool_generation = 0
+_tuning = None
+
+
+def load_tuning_profile(profile_name: str = None) -> tuple[str, dict]:
+    """
+    Depolama ayar profilini yükler. İsim verilmezse config.ini'deki
+    [Database] profile değeri, o da yoksa DEFAULT_PROFILE kullanılır.
+    """
+    parser = configparser.ConfigParser()
+    # Önce programla gelen config.ini, sonra kullanıcının AppData'daki config.ini'si okunur.
+    parser.read([os.path.join(get_base_path(), "config.ini"), CONFIG_PATH], encoding="utf-8")
+
+    name = profile_name or parser.get("Database", "profile", fallback=DEFAULT_PROFILE)
+    if name not in TUNING_PROFILES and not parser.has_section(f"profile:{name}"):
+        print(f"Bilinmeyen depolama profili '{name}', '{DEFAULT_PROFILE}' kullanılıyor.")
+        name = DEFAULT_PROFILE
+
+    settings = dict(TUNING_PROFILES.get(name, TUNING_PROFILES[DEFAULT_PROFILE]))
+    if parser.has_section(f"profile:{name}"):
+        for key, value in parser.items(f"profile:{name}"):
+            if key in settings:
+                settings[key] = value
+    return name, settings
+
+
+def set_tuning_profile(profile_name: str):
+    """Aktif profili değiştirir; havuz kapatıldığı için yeni bağlantılar bu profille açılır."""
+    global _tuning
+    _tuning = load_tuning_profile(profile_name)
+    close_all()
+
+
+def set_query_tracing(enabled: bool, slow_ms: float = None):
+    """
+    Sorgu izlemeyi açar/kapatır. SQL ifadelerini yakalayan trace callback bağlantı
+    açılırken kurulduğu için havuz kapatılır; yeni bağlantılar yeni ayarla açılır.
+    """
+    query_trace.configure(enabled, slow_ms)
+    close_all()
 
-def get_db_connection():
 
-    conn = sqlite3.connect(DATABASE_PATH)
+def _apply_tuning(conn: sqlite3.Connection, settings: dict):
+    for pragma, value in settings.items():
+        value = str(value).strip()
+        # PRAGMA değerleri parametre olarak bağlanamadığı için sadece sayı/anahtar kelimeye izin ver
+        if not value.lstrip('-').isalnum():
+            print(f"Geçersiz PRAGMA değeri atlandı: {pragma} = {value}")
+            continue
+        conn.execute(f"PRAGMA {pragma} = {value}")
+
+
+def get_db_connection():
+    """Yeni ve bağımsız bir SQLite bağlantısı açar ve aktif depolama profilini uygular."""
+    global _tuning
+    if _tuning is None:
+        _tuning = load_tuning_profile()
+
+    # Havuzdaki bağlantılar close_all() ile başka bir thread'den kapatılabildiği için
+    # check_same_thread kapalı; her bağlantıyı yine de yalnızca sahibi olan thread kullanır.
+    conn = sqlite3.connect(DATABASE_PATH, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    _apply_tuning(conn, _tuning[1])
+    if query_trace.is_enabled():
+        conn.set_trace_callback(query_trace.statement_hook)
+    return conn
+
+
+def _get_thread_connection():
+    """Çağıran thread'e ait kalıcı bağlantıyı döndürür, yoksa açar."""
+    conn = getattr(_thread_local, 'conn', None)
+    if conn is not None and _thread_local.generation == _pool_generation:
+        return conn
+
+    conn = get_db_connection()
+    with _pool_lock:
+        _open_connections.append(conn)
+        _thread_local.generation = _pool_generation
+    _thread_local.conn = conn
+    _thread_local.depth = 0
+    _thread_local.pending_changes = {}
     return conn
 
 
+@contextmanager
+def pooled_connection():
+    """
+    Thread'e ait kalıcı bağlantıyı verir. En dıştaki blok başarıyla biterse
+    açık işlem commit edilir, hata olursa geri alınır. İç içe kullanımda
+    (örn. search_products -> get_all_products) işlemi yalnızca en dıştaki blok bitirir.
+    İşlem sırasında _record_change ile not edilen değişiklikler commit'ten sonra
+    yayınlanır, geri alınırsa atılır. Veritabanına yazan her blok, değişiklik
+    yayınlamasa da data_changes.note_local_commit() ile yerel commit olarak sayılır.
+    """
+    conn = _get_thread_connection()
+    if _thread_local.depth == 0:
+        _thread_local.start_changes = conn.total_changes
+        _thread_local.schema_written = False
+    _thread_local.depth += 1
+    committed = False
+    try:
+        yield conn
+        if _thread_local.depth == 1:
+            if conn.in_transaction:
+                conn.commit()
+            committed = True
+    except BaseException:
+        if _thread_local.depth == 1:
+            if conn.in_transaction:
+                conn.rollback()
+            _thread_local.pending_changes.clear()
+        raise
+    finally:
+        _thread_local.depth -= 1
+        # Blok içinde ayrıca commit edilmiş (arşivleme aşamaları, geçişler) yazmalar da sayılır
+        if _thread_local.depth == 0 and (_thread_local.schema_written
+                                         or conn.total_changes != _thread_local.start_changes):
+            data_changes.note_local_commit()
+
+    if committed and _thread_local.pending_changes:
+        changes, _thread_local.pending_changes = _thread_local.pending_changes, {}
+        data_changes.publish(changes)
+
+
+def _record_change(kind: str, *ids):
+    """Açık işlemin değiştirdiği kayıtları not eder; pooled_connection bloğu içinde çağrılmalıdır."""
+    _thread_local.pending_changes.setdefault(kind, set()).update(ids)
+
+
+def _record_schema_write():
+    """
+    total_changes'e yansımayan yazmaları (şema değişikliği, VACUUM) yerel commit olarak
+    sayılmak üzere not eder; pooled_connection bloğu içinde çağrılmalıdır.
+    """
+    _thread_local.schema_written = True
+
+
+def close_thread_connection():
+    """Çağıran thread'in havuzdaki bağlantısını kapatır (biten arka plan thread'leri için)."""
+    conn = getattr(_thread_local, 'conn', None)
+    if conn is None:
+        return
+    _thread_local.conn = None
+    with _pool_lock:
+        if conn in _open_connections:
+            _open_connections.remove(conn)
+    conn.close()
+
+
+def close_all():
+    """
+    Havuzdaki tüm bağlantıları kapatır. Uygulama kapanırken ve veritabanı
+    dosyası geri yüklenmeden önce çağrılmalıdır; sonraki çağrılar yeni bağlantı açar.
+    Toplu yazma kuyruğu çalışıyorsa önce bekleyen hareketler commit edilir.
+    """
+    global _pool_generation, _movement_queue, _watch_conn, _watch_state
+    with _movement_queue_lock:
+        if _movement_queue is not None:
+            _movement_queue.close()
+            _movement_queue = None
+
+    with _pool_lock:
+        connections = list(_open_connections)
+        _open_connections.clear()
+        _pool_generation += 1
+    with _watch_lock:
+        if _watch_conn is not None:
+            connections.append(_watch_conn)
+        _watch_conn, _watch_state = None, None
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"Veritabanı bağlantısı kapatılırken hata: {e}")
+
+
+_watch_lock = threading.Lock()
+_watch_conn = None
+_watch_state = None
+
+
+def check_external_changes() -> bool:
+    """
+    Son çağrıdan bu yana veritabanının bu sürecin yapmadığı bir commit ile değişip
+    değişmediğini PRAGMA data_version ile kontrol eder. Değiştiyse EXTERNAL_CHANGE
+    yayınlar ve True döndürür. İlk çağrı yalnızca başlangıç değerini kaydeder.
+
+    data_version, kontrolde kullanılan bağlantı dışındaki her commit'te değişir; bu süreçteki
+    commit'ler data_changes.local_commit_count() ile ayırt edilir. Aynı aralıkta hem bu
+    süreçten hem dışarıdan commit gelirse değişiklik yerel sayılır.
+    """
+    global _watch_conn, _watch_state
+    with _watch_lock:
+        try:
+            if _watch_conn is None:
+                _watch_conn = get_db_connection()
+            local_commits = data_changes.local_commit_count()
+            version = _watch_conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Veritabanı hatası (check_external_changes): {e}")
+            return False
+        previous, _watch_state = _watch_state, (version, local_commits)
+
+    if previous is None or version == previous[0] or local_commits != previous[1]:
+        return False
+    data_changes.publish({data_changes.EXTERNAL_CHANGE: set()})
+    return True
+
+
+@traced
+def get_storage_diagnostics() -> dict:
+    """Aktif profil adını ve bağlantıda gerçekten geçerli olan PRAGMA değerlerini döndürür."""
+    diagnostics = {'profile': _tuning[0] if _tuning else None}
+    try:
+        with pooled_connection() as conn:
+            for pragma in TUNING_PROFILES[DEFAULT_PROFILE]:
+                diagnostics[pragma] = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (get_storage_diagnostics): {e}")
+    return diagnostics
+
+
+@traced
+def checkpoint_wal():
+    """WAL dosyasındaki değişiklikleri ana veritabanı dosyasına yazar ve WAL'ı sıfırlar."""
+    try:
+        with pooled_connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (checkpoint_wal): {e}")
+
+
+def _migration_1_indexes(conn: sqlite3.Connection):
+    """Tarih, tip, ürün ve stok sorgularının tam tablo taraması yapmaması için temel indeksler."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_hareketler_tarih ON hareketler (tarih)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_hareketler_tip_tarih ON hareketler (tip, tarih)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_hareketler_urun_id ON hareketler (urun_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_urunler_stok_adeti ON urunler (stok_adeti)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tamirler_durum_alinan_tarih ON tamirler (durum, alinan_tarih)")
+
+
+def _migration_2_local_day(conn: sqlite3.Connection):
+    """
+    hareketler tablosuna yerel saate göre yyyymmdd biçiminde 'gun' sütunu ekler.
+    tarih sütunu UTC (CURRENT_TIMESTAMP) tutulduğu için gece geç saatteki satışlar
+    date(tarih) ile yanlış güne düşüyordu; ayrıca fonksiyon içine alınan sütun indeks kullanamaz.
+    """
+    conn.execute("ALTER TABLE hareketler ADD COLUMN gun INTEGER")
+    conn.execute("""UPDATE hareketler
+                    SET gun = CAST(strftime('%Y%m%d', tarih, 'localtime') AS INTEGER)""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_hareketler_gun ON hareketler (gun)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_hareketler_tip_gun ON hareketler (tip, gun)")
+    # 'gun' vermeden eklenen kayıtlar (örn. harici araçlar) için yedek doldurma
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_hareketler_gun AFTER INSERT ON hareketler
+        WHEN NEW.gun IS NULL
+        BEGIN
+            UPDATE hareketler
+            SET gun = CAST(strftime('%Y%m%d', NEW.tarih, 'localtime') AS INTEGER)
+            WHERE id = NEW.id;
+        END
+    """)
+
+
+# Geçiş 3'ün gunluk_ozet trigger gövdeleri. Çıkarma, ürünün o anki cins/ayar/maliyet
+# bilgisini okuduğu için ürün değiştirilip silindiğinde özet hareketlerden sapıyordu;
+# geçiş 11 bunları hareketteki anlık görüntü sütunlarını kullananlarla değiştirir.
+# Yalnızca geçiş 3 içindir; yeni trigger'larda _ROLLUP_ADD_SQL kullanılmalı.
+_ROLLUP_ADD_SQL_V3 = """
+    INSERT INTO gunluk_ozet (tip, gun, cins, ayar, islem_sayisi, adet, tutar, maliyet)
+    SELECT NEW.tip,
+           COALESCE(NEW.gun, CAST(strftime('%Y%m%d', NEW.tarih, 'localtime') AS INTEGER)),
+           COALESCE(u.cins, ''), COALESCE(u.ayar, 0),
+           1, NEW.adet, NEW.toplam_tutar, NEW.adet * COALESCE(u.maliyet, 0)
+    FROM (SELECT 1) LEFT JOIN urunler u ON u.id = NEW.urun_id
+    WHERE true
+    ON CONFLICT (tip, gun, cins, ayar) DO UPDATE SET
+        islem_sayisi = islem_sayisi + excluded.islem_sayisi,
+        adet = adet + excluded.adet,
+        tutar = tutar + excluded.tutar,
+        maliyet = maliyet + excluded.maliyet;
+"""
+# Yalnızca geçiş 3 içindir, geçiş 11 bunu değiştirir; yeni trigger'larda _ROLLUP_REMOVE_SQL kullanılmalı.
+_ROLLUP_REMOVE_SQL_V3 = """
+    UPDATE gunluk_ozet SET
+        islem_sayisi = islem_sayisi - 1,
+        adet = adet - OLD.adet,
+        tutar = tutar - OLD.toplam_tutar,
+        maliyet = maliyet - OLD.adet * COALESCE((SELECT maliyet FROM urunler WHERE id = OLD.urun_id), 0)
+    WHERE tip = OLD.tip
+      AND gun = COALESCE(OLD.gun, CAST(strftime('%Y%m%d', OLD.tarih, 'localtime') AS INTEGER))
+      AND cins = COALESCE((SELECT cins FROM urunler WHERE id = OLD.urun_id), '')
+      AND ayar = COALESCE((SELECT ayar FROM urunler WHERE id = OLD.urun_id), 0);
+    DELETE FROM gunluk_ozet WHERE islem_sayisi <= 0;
+"""
+
+
+def _migration_3_daily_rollup(conn: sqlite3.Connection):
+    """Rapor sorgularının ham hareket geçmişini her seferinde toplamaması için günlük özet tablosu."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS gunluk_ozet (
+            tip TEXT NOT NULL,
+            gun INTEGER NOT NULL,
+            cins TEXT NOT NULL,
+            ayar INTEGER NOT NULL,
+            islem_sayisi INTEGER NOT NULL DEFAULT 0,
+            adet INTEGER NOT NULL DEFAULT 0,
+            tutar REAL NOT NULL DEFAULT 0.0,
+            maliyet REAL NOT NULL DEFAULT 0.0,
+            PRIMARY KEY (tip, gun, cins, ayar)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_hareketler_ozet_ekle AFTER INSERT ON hareketler
+        BEGIN {_ROLLUP_ADD_SQL_V3} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_hareketler_ozet_sil AFTER DELETE ON hareketler
+        BEGIN {_ROLLUP_REMOVE_SQL_V3} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_hareketler_ozet_guncelle
+        AFTER UPDATE OF urun_id, tip, adet, toplam_tutar, tarih, gun ON hareketler
+        BEGIN {_ROLLUP_REMOVE_SQL_V3} {_ROLLUP_ADD_SQL_V3} END
+    """)
+    conn.execute("DELETE FROM gunluk_ozet")
+    conn.execute("""
+        INSERT INTO gunluk_ozet (tip, gun, cins, ayar, islem_sayisi, adet, tutar, maliyet)
+        SELECT h.tip, h.gun, COALESCE(u.cins, ''), COALESCE(u.ayar, 0),
+               COUNT(*), SUM(h.adet), SUM(h.toplam_tutar), SUM(h.adet * COALESCE(u.maliyet, 0))
+        FROM hareketler h
+        LEFT JOIN urunler u ON u.id = h.urun_id
+        GROUP BY h.tip, h.gun, COALESCE(u.cins, ''), COALESCE(u.ayar, 0)
+    """)
+
+
+def _movement_snapshot_sql(row: str) -> tuple[str, str, str]:
+    """
+    Hareketin özet anahtarı (cins, ayar) ve birim maliyeti için SQL ifadeleri: hareketteki
+    anlık görüntü, o yoksa (sütunlar dolmadan önce) ürünün o anki değeri. row 'NEW', 'OLD' ya da 'h'.
+    """
+    return tuple(
+        f"COALESCE({row}.{column}, (SELECT {source} FROM urunler WHERE id = {row}.urun_id), {default})"
+        for column, source, default in (('cins', 'cins', "''"), ('ayar', 'ayar', '0'), ('birim_maliyet', 'maliyet', '0'))
+    )
+
+
+_NEW_CINS, _NEW_AYAR, _NEW_MALIYET = _movement_snapshot_sql('NEW')
+_OLD_CINS, _OLD_AYAR, _OLD_MALIYET = _movement_snapshot_sql('OLD')
+_OLD_ROLLUP_KEY = f"""tip = OLD.tip
+      AND gun = COALESCE(OLD.gun, CAST(strftime('%Y%m%d', OLD.tarih, 'localtime') AS INTEGER))
+      AND cins = {_OLD_CINS} AND ayar = {_OLD_AYAR}"""
+
+# gunluk_ozet tablosuna bir hareketin katkısını ekleyen/çıkaran trigger gövdeleri. Anahtar
+# ve maliyet hareketin kendi satırından (cins, ayar, birim_maliyet) okunur; ürün sonradan
+# değiştirilse ya da silinse de çıkarma, eklemenin yazdığı satırı ve tutarı bulur.
+_ROLLUP_ADD_SQL = f"""
+    INSERT INTO gunluk_ozet (tip, gun, cins, ayar, islem_sayisi, adet, tutar, maliyet)
+    VALUES (NEW.tip,
+            COALESCE(NEW.gun, CAST(strftime('%Y%m%d', NEW.tarih, 'localtime') AS INTEGER)),
+            {_NEW_CINS}, {_NEW_AYAR},
+            1, NEW.adet, NEW.toplam_tutar, NEW.adet * {_NEW_MALIYET})
+    ON CONFLICT (tip, gun, cins, ayar) DO UPDATE SET
+        islem_sayisi = islem_sayisi + excluded.islem_sayisi,
+        adet = adet + excluded.adet,
+        tutar = tutar + excluded.tutar,
+        maliyet = maliyet + excluded.maliyet;
+"""
+_ROLLUP_REMOVE_SQL = f"""
+    UPDATE gunluk_ozet SET
+        islem_sayisi = islem_sayisi - 1,
+        adet = adet - OLD.adet,
+        tutar = tutar - OLD.toplam_tutar,
+        maliyet = maliyet - OLD.adet * {_OLD_MALIYET}
+    WHERE {_OLD_ROLLUP_KEY};
+    DELETE FROM gunluk_ozet WHERE {_OLD_ROLLUP_KEY} AND islem_sayisi <= 0;
+"""
+
+
+def _rebuild_daily_rollup(conn: sqlite3.Connection):
+    cins, ayar, maliyet = _movement_snapshot_sql('h')
+    conn.execute("DELETE FROM gunluk_ozet")
+    conn.execute(f"""
+        INSERT INTO gunluk_ozet (tip, gun, cins, ayar, islem_sayisi, adet, tutar, maliyet)
+        SELECT h.tip, h.gun, {cins}, {ayar}, COUNT(*), SUM(h.adet), SUM(h.toplam_tutar), SUM(h.adet * {maliyet})
+        FROM hareketler h
+        GROUP BY h.tip, h.gun, {cins}, {ayar}
+    """)
+
+
+# Türkçe büyük/küçük harf katlama: Python'un lower() metodu 'I' harfini 'i' yapar,
+# SQLite'ın lower() fonksiyonu ise yalnızca ASCII harfleri küçültür. Arama indeksine
+# yazılan metin ile arama terimi aynı kurala göre katlansın diye tablo tek yerde tutulur.
+_TR_CASE_FOLD = (
+    ('I', 'ı'), ('İ', 'i'), ('Ç', 'ç'), ('Ğ', 'ğ'), ('Ö', 'ö'), ('Ş', 'ş'), ('Ü', 'ü'),
+    ('Â', 'â'), ('Î', 'î'), ('Û', 'û'),
+)
+_TR_CASE_FOLD_TABLE = str.maketrans(
+    {**{upper: lower for upper, lower in _TR_CASE_FOLD},
+     **{chr(c): chr(c + 32) for c in range(ord('A'), ord('Z') + 1) if chr(c) != 'I'}}
+)
+
+
+def _tr_fold(text: str) -> str:
+    """Metni arama indeksindeki ile aynı Türkçe kurallara göre küçük harfe çevirir."""
+    return text.translate(_TR_CASE_FOLD_TABLE)
+
+
+def _sql_tr_fold(expr: str) -> str:
+    """_tr_fold ile aynı katlamayı yapan SQL ifadesini üretir (trigger'larda kullanılır)."""
+    for upper, lower in _TR_CASE_FOLD:
+        expr = f"replace({expr}, '{upper}', '{lower}')"
+    return f"lower({expr})"
+
+
+def _migration_4_product_search(conn: sqlite3.Connection):
+    """Ürün araması için urun_kodu, cins ve aciklama üzerinde FTS5 (trigram) indeksi."""
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS urunler_fts
+        USING fts5(urun_kodu, cins, aciklama, tokenize = 'trigram')
+    """)
+    folded = f"{_sql_tr_fold('NEW.urun_kodu')}, {_sql_tr_fold('NEW.cins')}, {_sql_tr_fold('NEW.aciklama')}"
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_urunler_fts_ekle AFTER INSERT ON urunler
+        BEGIN
+            INSERT INTO urunler_fts (rowid, urun_kodu, cins, aciklama) VALUES (NEW.id, {folded});
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_urunler_fts_sil AFTER DELETE ON urunler
+        BEGIN
+            DELETE FROM urunler_fts WHERE rowid = OLD.id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_urunler_fts_guncelle AFTER UPDATE OF urun_kodu, cins, aciklama ON urunler
+        BEGIN
+            DELETE FROM urunler_fts WHERE rowid = OLD.id;
+            INSERT INTO urunler_fts (rowid, urun_kodu, cins, aciklama) VALUES (NEW.id, {folded});
+        END
+    """)
+    conn.execute("DELETE FROM urunler_fts")
+    conn.execute(f"""
+        INSERT INTO urunler_fts (rowid, urun_kodu, cins, aciklama)
+        SELECT id, {_sql_tr_fold('urun_kodu')}, {_sql_tr_fold('cins')}, {_sql_tr_fold('aciklama')}
+        FROM urunler
+    """)
+
+
+def _sql_digits_only(expr: str) -> str:
+    """Telefon numarasındaki yaygın ayraçları (boşluk, tire, parantez, nokta, +) silen SQL ifadesi."""
+    for separator in (' ', '-', '(', ')', '.', '+', '/'):
+        expr = f"replace({expr}, '{separator}', '')"
+    return expr
+
+
+def _migration_5_repair_search(conn: sqlite3.Connection):
+    """
+    Tamir araması için müşteri adı, ürün, hasar ve notlar üzerinde FTS5 (trigram) indeksi
+    ve telefon numarasının yalnızca rakamlardan oluşan, indekslenmiş bir kopyası.
+    """
+    conn.execute("ALTER TABLE tamirler ADD COLUMN telefon_rakam TEXT")
+    conn.execute(f"UPDATE tamirler SET telefon_rakam = {_sql_digits_only('musteri_telefon')}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tamirler_telefon_rakam ON tamirler (telefon_rakam)")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tamirler_telefon_ekle AFTER INSERT ON tamirler
+        BEGIN
+            UPDATE tamirler SET telefon_rakam = {_sql_digits_only('NEW.musteri_telefon')} WHERE id = NEW.id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tamirler_telefon_guncelle AFTER UPDATE OF musteri_telefon ON tamirler
+        BEGIN
+            UPDATE tamirler SET telefon_rakam = {_sql_digits_only('NEW.musteri_telefon')} WHERE id = NEW.id;
+        END
+    """)
+
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tamirler_fts
+        USING fts5(musteri_ad_soyad, urun_aciklamasi, hasar_tespiti, notlar, tokenize = 'trigram')
+    """)
+    columns = ('musteri_ad_soyad', 'urun_aciklamasi', 'hasar_tespiti', 'notlar')
+    folded_new = ", ".join(_sql_tr_fold(f"NEW.{column}") for column in columns)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tamirler_fts_ekle AFTER INSERT ON tamirler
+        BEGIN
+            INSERT INTO tamirler_fts (rowid, {", ".join(columns)}) VALUES (NEW.id, {folded_new});
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tamirler_fts_sil AFTER DELETE ON tamirler
+        BEGIN
+            DELETE FROM tamirler_fts WHERE rowid = OLD.id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tamirler_fts_guncelle
+        AFTER UPDATE OF {", ".join(columns)} ON tamirler
+        BEGIN
+            DELETE FROM tamirler_fts WHERE rowid = OLD.id;
+            INSERT INTO tamirler_fts (rowid, {", ".join(columns)}) VALUES (NEW.id, {folded_new});
+        END
+    """)
+    conn.execute("DELETE FROM tamirler_fts")
+    conn.execute(f"""
+        INSERT INTO tamirler_fts (rowid, {", ".join(columns)})
+        SELECT id, {", ".join(_sql_tr_fold(column) for column in columns)} FROM tamirler
+    """)
+
+
+def _migration_6_product_paging(conn: sqlite3.Connection):
+    """get_products_page'in eklenme tarihine göre sayfalaması için indeks."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_urunler_eklenme_tarihi ON urunler (eklenme_tarihi)")
+
+
+_INVENTORY_ADD_SQL = """
+    INSERT INTO envanter_ozet (cins, urun_sayisi, stok_adeti, toplam_maliyet, toplam_gram)
+    VALUES (NEW.cins, 1, NEW.stok_adeti,
+            COALESCE(NEW.maliyet, 0) * NEW.stok_adeti, COALESCE(NEW.gram, 0) * NEW.stok_adeti)
+    ON CONFLICT (cins) DO UPDATE SET
+        urun_sayisi = urun_sayisi + 1,
+        stok_adeti = stok_adeti + excluded.stok_adeti,
+        toplam_maliyet = toplam_maliyet + excluded.toplam_maliyet,
+        toplam_gram = toplam_gram + excluded.toplam_gram;
+"""
+_INVENTORY_REMOVE_SQL = """
+    UPDATE envanter_ozet SET
+        urun_sayisi = urun_sayisi - 1,
+        stok_adeti = stok_adeti - OLD.stok_adeti,
+        toplam_maliyet = toplam_maliyet - COALESCE(OLD.maliyet, 0) * OLD.stok_adeti,
+        toplam_gram = toplam_gram - COALESCE(OLD.gram, 0) * OLD.stok_adeti
+    WHERE cins = OLD.cins;
+    DELETE FROM envanter_ozet WHERE cins = OLD.cins AND urun_sayisi <= 0;
+"""
+
+
+def _migration_7_inventory_totals(conn: sqlite3.Connection):
+    """Envanter toplamlarının her seferinde urunler tablosunu taramaması için cins bazında özet tablosu."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS envanter_ozet (
+            cins TEXT NOT NULL PRIMARY KEY,
+            urun_sayisi INTEGER NOT NULL DEFAULT 0,
+            stok_adeti INTEGER NOT NULL DEFAULT 0,
+            toplam_maliyet REAL NOT NULL DEFAULT 0.0,
+            toplam_gram REAL NOT NULL DEFAULT 0.0
+        ) WITHOUT ROWID
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_urunler_envanter_ekle AFTER INSERT ON urunler
+        BEGIN {_INVENTORY_ADD_SQL} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_urunler_envanter_sil AFTER DELETE ON urunler
+        BEGIN {_INVENTORY_REMOVE_SQL} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_urunler_envanter_guncelle
+        AFTER UPDATE OF cins, maliyet, gram, stok_adeti ON urunler
+        BEGIN {_INVENTORY_REMOVE_SQL} {_INVENTORY_ADD_SQL} END
+    """)
+    _rebuild_inventory_totals(conn)
+
+
+_INVENTORY_TOTALS_SQL = """
+    SELECT cins, COUNT(*), SUM(stok_adeti),
+           TOTAL(COALESCE(maliyet, 0) * stok_adeti), TOTAL(COALESCE(gram, 0) * stok_adeti)
+    FROM urunler
+    GROUP BY cins
+"""
+
+
+def _rebuild_inventory_totals(conn: sqlite3.Connection):
+    conn.execute("DELETE FROM envanter_ozet")
+    conn.execute(f"""
+        INSERT INTO envanter_ozet (cins, urun_sayisi, stok_adeti, toplam_maliyet, toplam_gram)
+        {_INVENTORY_TOTALS_SQL}
+    """)
+
+
+# Kritik stok koşulu. Kısmi indeksin WHERE ifadesiyle sorgulardaki ifade birebir aynı olmalı ki
+# SQLite indeksi kullanabilsin; DEFAULT_MIN_STOK değişirse indeksi yeniden kuran yeni bir geçiş gerekir.
+_LOW_STOCK_CONDITION = f"stok_adeti <= COALESCE(min_stok, {DEFAULT_MIN_STOK})"
+
+
+def _migration_8_low_stock_watchlist(conn: sqlite3.Connection):
+    """Ürüne özel kritik stok eşiği ve yalnızca kritik ürünleri içeren kısmi indeks."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(urunler)")}
+    if 'min_stok' not in columns:
+        conn.execute("ALTER TABLE urunler ADD COLUMN min_stok INTEGER")
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_urunler_kritik_stok ON urunler (stok_adeti)
+        WHERE {_LOW_STOCK_CONDITION}
+    """)
+
+
+# Potansiyel kâr (mevcut stok satılırsa elde edilecek kâr) ifadesi ve hesaba katılan ürünler.
+# İfade indeksinin ifadesi ve WHERE koşulu ile sorgudakiler birebir aynı olmalıdır.
+_POTENTIAL_PROFIT_EXPR = "(satis_fiyati - maliyet) * stok_adeti"
+_POTENTIAL_PROFIT_CONDITION = "satis_fiyati > 0 AND maliyet > 0 AND stok_adeti > 0"
+
+
+def _migration_9_top_n_indexes(conn: sqlite3.Connection):
+    """En kârlı ve en çok satan ürün listelerinin tablo taramadan okunması için indeksler."""
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_urunler_potansiyel_kar ON urunler ({_POTENTIAL_PROFIT_EXPR})
+        WHERE {_POTENTIAL_PROFIT_CONDITION}
+    """)
+    # Dönem içindeki satışlar ürün bazında yalnızca bu indeksten toplanır. (tip, gun) ön eki
+    # eski idx_hareketler_tip_gun'un işini de gördüğü için o indeks kaldırılır.
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_hareketler_tip_gun_urun
+        ON hareketler (tip, gun, urun_id, adet, toplam_tutar)
+    """)
+    conn.execute("DROP INDEX IF EXISTS idx_hareketler_tip_gun")
+
+
+def _migration_10_movement_archive(conn: sqlite3.Connection):
+    """Yıllık arşiv dosyalarına taşınmış yılların kaydı."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS arsiv_yillari (
+            yil INTEGER PRIMARY KEY,
+            dosya TEXT NOT NULL,
+            hareket_sayisi INTEGER NOT NULL,
+            arsivlenme_tarihi TEXT NOT NULL
+        )
+    """)
+
+
+def _migration_11_movement_snapshot(conn: sqlite3.Connection):
+    """
+    Hareketlere kayıt anındaki ürün cinsi, ayarı ve birim maliyeti için anlık görüntü
+    sütunları ekler ve gunluk_ozet trigger'larını bunları kullanacak şekilde yeniden kurar.
+    Mevcut hareketler ürünün bugünkü değerleriyle doldurulur (önceki özetin de varsayımı);
+    özet, ürün değişiklikleriyle oluşmuş sapmalardan arınması için baştan hesaplanır.
+    """
+    conn.execute("ALTER TABLE hareketler ADD COLUMN cins TEXT")
+    conn.execute("ALTER TABLE hareketler ADD COLUMN ayar INTEGER")
+    conn.execute("ALTER TABLE hareketler ADD COLUMN birim_maliyet REAL")
+    for trigger in ("trg_hareketler_ozet_ekle", "trg_hareketler_ozet_sil", "trg_hareketler_ozet_guncelle"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("""
+        UPDATE hareketler
+        SET cins = COALESCE(u.cins, ''), ayar = COALESCE(u.ayar, 0), birim_maliyet = COALESCE(u.maliyet, 0)
+        FROM urunler u WHERE u.id = hareketler.urun_id
+    """)
+    conn.execute("UPDATE hareketler SET cins = '', ayar = 0, birim_maliyet = 0 WHERE cins IS NULL")
+    # Anlık görüntü vermeden eklenen kayıtlar (örn. harici araçlar) için yedek doldurma
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_hareketler_urun_bilgisi AFTER INSERT ON hareketler
+        WHEN NEW.cins IS NULL OR NEW.ayar IS NULL OR NEW.birim_maliyet IS NULL
+        BEGIN
+            UPDATE hareketler SET
+                cins = COALESCE(NEW.cins, (SELECT cins FROM urunler WHERE id = NEW.urun_id), ''),
+                ayar = COALESCE(NEW.ayar, (SELECT ayar FROM urunler WHERE id = NEW.urun_id), 0),
+                birim_maliyet = COALESCE(NEW.birim_maliyet, (SELECT maliyet FROM urunler WHERE id = NEW.urun_id), 0)
+            WHERE id = NEW.id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_hareketler_ozet_ekle AFTER INSERT ON hareketler
+        BEGIN {_ROLLUP_ADD_SQL} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_hareketler_ozet_sil AFTER DELETE ON hareketler
+        BEGIN {_ROLLUP_REMOVE_SQL} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_hareketler_ozet_guncelle
+        AFTER UPDATE OF urun_id, tip, adet, toplam_tutar, tarih, gun, cins, ayar, birim_maliyet ON hareketler
+        BEGIN {_ROLLUP_REMOVE_SQL} {_ROLLUP_ADD_SQL} END
+    """)
+    _rebuild_daily_rollup(conn)
+
+
+# Şema geçişleri (migration). Her biri sırayla ve kendi işlemi içinde uygulanır,
+# ardından PRAGMA user_version geçişin numarasına ayarlanır. Yeni geçişler
+# listenin sonuna, bir sonraki numarayla eklenmelidir; mevcutlar asla değiştirilmez.
+MIGRATIONS = [
+    (1, "hareketler, urunler ve tamirler için temel indeksler", _migration_1_indexes),
+    (2, "hareketler için yerel gün (gun) sütunu", _migration_2_local_day),
+    (3, "trigger ile güncellenen günlük özet (gunluk_ozet) tablosu", _migration_3_daily_rollup),
+    (4, "ürün araması için FTS5 indeksi", _migration_4_product_search),
+    (5, "tamir araması için FTS5 ve telefon indeksi", _migration_5_repair_search),
+    (6, "ürün sayfalaması için eklenme tarihi indeksi", _migration_6_product_paging),
+    (7, "trigger ile güncellenen envanter özeti (envanter_ozet) tablosu", _migration_7_inventory_totals),
+    (8, "ürüne özel kritik stok eşiği (min_stok) ve kritik stok indeksi", _migration_8_low_stock_watchlist),
+    (9, "en kârlı ve en çok satan ürün sorguları için indeksler", _migration_9_top_n_indexes),
+    (10, "yıllık hareket arşivi kaydı (arsiv_yillari)", _migration_10_movement_archive),
+    (11, "hareketlerde ürün cinsi, ayarı ve maliyeti anlık görüntüsü", _migration_11_movement_snapshot),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def _day_key(day) -> int:
+    """'YYYY-MM-DD' metnini veya date nesnesini hareketler.gun biçimine (yyyymmdd) çevirir."""
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return day.year * 10000 + day.month * 100 + day.day
+
+
+def _day_str(gun: int) -> str:
+    """hareketler.gun değerini (yyyymmdd) 'YYYY-MM-DD' metnine çevirir."""
+    return f"{gun // 10000:04d}-{gun // 100 % 100:02d}-{gun % 100:02d}"
+
+
+def apply_migrations(conn: sqlite3.Connection):
+    """Veritabanının user_version değerinden sonraki tüm geçişleri sırayla uygular."""
+    current_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version, description, migrate in MIGRATIONS:
+        if version <= current_version:
+            continue
+        print(f"Şema geçişi uygulanıyor ({version}): {description}")
+        conn.execute("BEGIN")
+        try:
+            migrate(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+            _record_schema_write()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
 def create_table():
     """
     Veritabanı bağlantısı kurar ve 'urunler', 'hareketler' ve 'tamirler'
-    tablolarını, eğer mevcut değillerse, oluşturur.
-    """
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        print("Veritabanı tabloları kontrol ediliyor/oluşturuluyor...")
-
-        # Mevcut urunler tablosu
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS urunler (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                urun_kodu TEXT NOT NULL UNIQUE,
-                cins TEXT NOT NULL,
-                ayar INTEGER DEFAULT 22,
-                gram REAL,
-                maliyet REAL DEFAULT 0.0,
-                satis_fiyati REAL DEFAULT 0.0,
-                stok_adeti INTEGER NOT NULL DEFAULT 1,
-                aciklama TEXT,
-                resim_yolu TEXT,
-                eklenme_tarihi DATE NOT NULL
-            )
-        """)
-
-        # Mevcut hareketler tablosu
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS hareketler (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                urun_id INTEGER NOT NULL,
-                tip TEXT NOT NULL,
-                adet INTEGER NOT NULL,
-                birim_fiyat REAL NOT NULL,
-                toplam_tutar REAL NOT NULL,
-                tarih TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (urun_id) REFERENCES urunler (id) ON DELETE CASCADE
-            )
-        """)
-
-        # --- EKSİK OLAN KISIM BURASI ---
-        # Yeni tamirler tablosunu oluşturan SQL komutu
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tamirler (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                musteri_ad_soyad TEXT NOT NULL,
-                musteri_telefon TEXT,
-                urun_aciklamasi TEXT NOT NULL,
-                hasar_tespiti TEXT,
-                alinan_tarih DATE NOT NULL,
-                tahmini_teslim_tarihi DATE,
-                tamir_ucreti REAL,
-                durum TEXT NOT NULL DEFAULT 'Beklemede',
-                notlar TEXT
-            )
-        """)
-        # --------------------------------
+    tablolarını, eğer mevcut değillerse, oluşturur. Ardından bekleyen şema
+    geçişlerini uygular. Şema güncelse hiçbir işlem yapmaz.
+    """
+    try:
+        with pooled_connection() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+                return
+
+            cursor = conn.cursor()
+
+            print("Veritabanı tabloları kontrol ediliyor/oluşturuluyor...")
+
+            # Mevcut urunler tablosu
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS urunler (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    urun_kodu TEXT NOT NULL UNIQUE,
+                    cins TEXT NOT NULL,
+                    ayar INTEGER DEFAULT 22,
+                    gram REAL,
+                    maliyet REAL DEFAULT 0.0,
+                    satis_fiyati REAL DEFAULT 0.0,
+                    stok_adeti INTEGER NOT NULL DEFAULT 1,
+                    aciklama TEXT,
+                    resim_yolu TEXT,
+                    eklenme_tarihi DATE NOT NULL
+                )
+            """)
+
+            # Mevcut hareketler tablosu
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS hareketler (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    urun_id INTEGER NOT NULL,
+                    tip TEXT NOT NULL,
+                    adet INTEGER NOT NULL,
+                    birim_fiyat REAL NOT NULL,
+                    toplam_tutar REAL NOT NULL,
+                    tarih TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (urun_id) REFERENCES urunler (id) ON DELETE CASCADE
+                )
+            """)
+
+            # --- EKSİK OLAN KISIM BURASI ---
+            # Yeni tamirler tablosunu oluşturan SQL komutu
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS tamirler (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    musteri_ad_soyad TEXT NOT NULL,
+                    musteri_telefon TEXT,
+                    urun_aciklamasi TEXT NOT NULL,
+                    hasar_tespiti TEXT,
+                    alinan_tarih DATE NOT NULL,
+                    tahmini_teslim_tarihi DATE,
+                    tamir_ucreti REAL,
+                    durum TEXT NOT NULL DEFAULT 'Beklemede',
+                    notlar TEXT
+                )
+            """)
+            # --------------------------------
+            conn.commit()
+
+            apply_migrations(conn)
 
-        conn.commit()
         print("Tüm tablolar başarıyla kontrol edildi/oluşturuldu.")
 
     except sqlite3.Error as e:
         print(f"Veritabanı hatası (create_table): {e}")
-    finally:
-        if conn:
-            conn.close()
 
-def add_product(urun: Urun):
+@traced
+def rebuild_daily_rollup() -> bool:
+    """
+    gunluk_ozet tablosunu hareketler tablosundan baştan hesaplar. Eski veritabanlarında
+    veya özetin hareketlerle uyuşmadığından şüphelenildiğinde kullanılır.
+    Cins/ayar ve maliyet hareketlerin kayıt anındaki değerlerinden alınır; ürünlerde
+    sonradan yapılan değişiklikler geçmiş özetleri değiştirmez.
+    """
+    try:
+        with pooled_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            _rebuild_daily_rollup(conn)
+            _record_change(data_changes.MOVEMENT_LOGGED)
+        return True
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (rebuild_daily_rollup): {e}")
+        return False
+
+
+# Artımlı toplanan REAL değerlerde yuvarlama farkı sapma sayılmaz
+_INVENTORY_TOTALS_TOLERANCE = 0.01
+
 
-    conn = None
+@traced
+def verify_inventory_totals(rebuild_on_drift: bool = False) -> list[str] | None:
+    """
+    envanter_ozet tablosunu urunler tablosundan yeniden hesaplanan değerlerle karşılaştırır
+    ve uyuşmayan cinslerin listesini döndürür (boş liste: sapma yok). rebuild_on_drift
+    verilirse sapma bulunduğunda tablo aynı işlem içinde baştan hesaplanır.
+    Veritabanı hatasında None döner.
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        sql = """INSERT INTO urunler (urun_kodu, cins, ayar, gram, maliyet, satis_fiyati, stok_adeti, aciklama, resim_yolu, eklenme_tarihi)
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
-        cursor.execute(sql, (
-            urun.urun_kodu, urun.cins, urun.ayar, urun.gram, urun.maliyet,
-            urun.satis_fiyati, urun.stok_adeti, urun.aciklama, urun.resim_yolu,
-            urun.eklenme_tarihi.strftime('%Y-%m-%d')
-        ))
-        conn.commit()
-        return cursor.lastrowid
+        with pooled_connection() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE" if rebuild_on_drift else "BEGIN")
+            actual = {row[0]: tuple(row[1:]) for row in conn.execute(_INVENTORY_TOTALS_SQL)}
+            stored = {row[0]: tuple(row[1:]) for row in conn.execute(
+                "SELECT cins, urun_sayisi, stok_adeti, toplam_maliyet, toplam_gram FROM envanter_ozet")}
+
+            drifted = []
+            for cins in sorted(actual.keys() | stored.keys()):
+                a, b = actual.get(cins), stored.get(cins)
+                if a is None or b is None or a[:2] != b[:2] or any(
+                        abs(x - y) > _INVENTORY_TOTALS_TOLERANCE for x, y in zip(a[2:], b[2:])):
+                    drifted.append(cins)
+
+            if drifted and rebuild_on_drift:
+                print(f"Envanter özetinde sapma bulundu, yeniden hesaplanıyor: {', '.join(drifted)}")
+                _rebuild_inventory_totals(conn)
+                _record_change(data_changes.PRODUCT_UPSERTED)
+        return drifted
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (verify_inventory_totals): {e}")
+        return None
+
+
+@traced
+def rebuild_inventory_totals() -> bool:
+    """envanter_ozet tablosunu urunler tablosundan baştan hesaplar."""
+    try:
+        with pooled_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            _rebuild_inventory_totals(conn)
+            _record_change(data_changes.PRODUCT_UPSERTED)
+        return True
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (rebuild_inventory_totals): {e}")
+        return False
+
+
+# --- Hareket arşivi ---
+# Kapanmış yılların hareketleri ve günlük özetleri veritabanı klasöründeki yıllık arşiv
+# dosyalarına taşınır. Dönem sorguları, istenen aralık arşivlenmiş bir yıla denk gelirse
+# o yılın dosyasını bağlantıya ATTACH eder; güncel yıl sorguları yalnızca ana dosyayı okur.
+ARCHIVE_FILE_TEMPLATE = "stokgold_archive_{year}.db"
+
+
+def get_archive_path(year: int) -> str:
+    return os.path.join(os.path.dirname(DATABASE_PATH), ARCHIVE_FILE_TEMPLATE.format(year=year))
+
+
+def _archive_sources(conn: sqlite3.Connection, start_key: int, end_key: int) -> list[tuple[str, str]]:
+    """gun aralığına (iki uç dahil) denk gelen arşivlenmiş yılların (şema adı, dosya yolu) listesi."""
+    sources = []
+    for yil, dosya in conn.execute("SELECT yil, dosya FROM arsiv_yillari WHERE yil BETWEEN ? AND ? ORDER BY yil",
+                                   (start_key // 10000, end_key // 10000)):
+        path = os.path.join(os.path.dirname(DATABASE_PATH), dosya)
+        # ATTACH olmayan dosyayı boş olarak oluşturacağı için önce kontrol edilir
+        if not os.path.exists(path):
+            print(f"Arşiv dosyası bulunamadı, {yil} yılı atlanıyor: {path}")
+            continue
+        sources.append((f"arsiv_{yil}", path))
+    return sources
+
+
+def _attach_archives(conn: sqlite3.Connection, sources: list[tuple[str, str]]) -> list[str]:
+    """
+    Arşivleri bağlantıya bağlar (bağlı değillerse) ve ['main', şemalar...] döndürür. Arşivler
+    bağlantı açık kaldıkça bağlı kalır; bağlanabilecek veritabanı sayısı dolarsa, açık işlem
+    yoksa, bu çağrıda gerekmeyen arşivler ayrılır.
+    """
+    attached = {row[1] for row in conn.execute("PRAGMA database_list") if row[1].startswith("arsiv_")}
+    needed = {schema for schema, _ in sources}
+    if len(attached | needed) > conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) and not conn.in_transaction:
+        for schema in attached - needed:
+            conn.execute(f"DETACH DATABASE {schema}")
+    for schema, path in sources:
+        if schema not in attached:
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+    return ['main'] + [schema for schema, _ in sources]
+
+
+def _archive_schema_groups(conn: sqlite3.Connection, start_key: int, end_key: int):
+    """
+    gun aralığının okunacağı şemaları, aynı anda bağlanabilecek veritabanı sınırına sığan
+    gruplar halinde üretir; ilk grup 'main' ile başlar. Çoğu aralık tek gruptur. Her grup
+    üretilmeden hemen önce bağlanır; bir sonraki grup istenmeden önce sorgu bitirilmelidir.
+    """
+    sources = _archive_sources(conn, start_key, end_key)
+    size = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    for index in range(0, len(sources) or 1, size):
+        schemas = _attach_archives(conn, sources[index:index + size])
+        yield schemas if index == 0 else schemas[1:]
+
+
+def _union_all(schemas: list[str], select_sql: str) -> str:
+    """select_sql'deki {schema} yer tutucusunu her şema için doldurup UNION ALL ile birleştirir."""
+    return "\n UNION ALL \n".join(select_sql.format(schema=schema) for schema in schemas)
+
+
+@traced
+def get_archived_years() -> list[int]:
+    """Arşiv dosyasına taşınmış yılları artan sırada döndürür."""
+    try:
+        with pooled_connection() as conn:
+            return [row[0] for row in conn.execute("SELECT yil FROM arsiv_yillari ORDER BY yil")]
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (get_archived_years): {e}")
+        return []
+
+
+@traced
+def get_archivable_years() -> list[int]:
+    """Ana veritabanında hareketi bulunan, kapanmış (bu yıldan önceki) yılları döndürür."""
+    years = []
+    try:
+        with pooled_connection() as conn:
+            # Her yıl için gun indeksinde tek bir arama yapılır; tüm hareketler taranmaz
+            gun = conn.execute("SELECT MIN(gun) FROM hareketler").fetchone()[0]
+            while gun is not None and gun // 10000 < date.today().year:
+                years.append(gun // 10000)
+                gun = conn.execute("SELECT MIN(gun) FROM hareketler WHERE gun > ?",
+                                   (gun // 10000 * 10000 + 1231,)).fetchone()[0]
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (get_archivable_years): {e}")
+    return years
+
+
+@traced
+def archive_year(year: int, vacuum: bool = True) -> int | None:
+    """
+    Kapanmış bir yılın hareketlerini ve günlük özet satırlarını ARCHIVE_FILE_TEMPLATE adlı
+    dosyaya taşır ve taşınan hareket sayısını döndürür; veritabanı hatasında None döner.
+    Bu yıl, gelecek yıllar veya zaten arşivlenmiş bir yıl için ValueError fırlatır.
+    vacuum verilirse ana dosya küçültülür (büyük veritabanlarında birkaç saniye sürebilir).
+
+    İşlem iki aşamalıdır: önce arşiv dosyası doldurulup commit edilir, sonra hareketler ana
+    veritabanından silinip yıl arsiv_yillari'na yazılır. WAL modunda birden fazla dosyaya
+    yayılan bir işlem dosyalar arasında atomik olmadığı için tek işlem kullanılmaz; ikinci
+    aşamadan önce kesilen bir denemede yıl kayıtlı olmadığından arşiv dosyası okunmaz ve
+    sonraki deneme dosyayı baştan doldurur.
+    """
+    if year >= date.today().year:
+        raise ValueError("Yalnızca kapanmış (geçmiş) yıllar arşivlenebilir.")
+    start_key, end_key = year * 10000 + 101, year * 10000 + 1231
+    schema = f"arsiv_{year}"
+    file_name = ARCHIVE_FILE_TEMPLATE.format(year=year)
+
+    try:
+        with pooled_connection() as conn:
+            if conn.execute("SELECT 1 FROM arsiv_yillari WHERE yil = ?", (year,)).fetchone():
+                raise ValueError(f"{year} yılı zaten arşivlenmiş.")
+            if schema in {row[1] for row in conn.execute("PRAGMA database_list")}:
+                conn.execute(f"DETACH DATABASE {schema}")
+            _attach_archives(conn, [(schema, get_archive_path(year))])
+        try:
+            # 1. aşama: arşiv dosyası. Yıl kayıtlı olmadığından dosyada kalan veri yarım kalmış
+            # bir denemeye aittir ve silinir.
+            with pooled_connection() as conn:
+                conn.execute(f"DROP TABLE IF EXISTS {schema}.hareketler")
+                conn.execute(f"DROP TABLE IF EXISTS {schema}.gunluk_ozet")
+                conn.execute(f"""
+                    CREATE TABLE {schema}.hareketler (
+                        id INTEGER PRIMARY KEY,
+                        urun_id INTEGER NOT NULL,
+                        tip TEXT NOT NULL,
+                        adet INTEGER NOT NULL,
+                        birim_fiyat REAL NOT NULL,
+                        toplam_tutar REAL NOT NULL,
+                        tarih TIMESTAMP,
+                        gun INTEGER,
+                        cins TEXT,
+                        ayar INTEGER,
+                        birim_maliyet REAL
+                    )
+                """)
+                conn.execute(f"""
+                    CREATE TABLE {schema}.gunluk_ozet (
+                        tip TEXT NOT NULL,
+                        gun INTEGER NOT NULL,
+                        cins TEXT NOT NULL,
+                        ayar INTEGER NOT NULL,
+                        islem_sayisi INTEGER NOT NULL DEFAULT 0,
+                        adet INTEGER NOT NULL DEFAULT 0,
+                        tutar REAL NOT NULL DEFAULT 0.0,
+                        maliyet REAL NOT NULL DEFAULT 0.0,
+                        PRIMARY KEY (tip, gun, cins, ayar)
+                    ) WITHOUT ROWID
+                """)
+                moved = conn.execute(f"""
+                    INSERT INTO {schema}.hareketler (id, urun_id, tip, adet, birim_fiyat, toplam_tutar, tarih, gun,
+                                                     cins, ayar, birim_maliyet)
+                    SELECT id, urun_id, tip, adet, birim_fiyat, toplam_tutar, tarih, gun, cins, ayar, birim_maliyet
+                    FROM main.hareketler WHERE gun BETWEEN ? AND ?
+                """, (start_key, end_key)).rowcount
+                conn.execute(f"""
+                    INSERT INTO {schema}.gunluk_ozet
+                    SELECT tip, gun, cins, ayar, islem_sayisi, adet, tutar, maliyet
+                    FROM main.gunluk_ozet WHERE gun BETWEEN ? AND ?
+                """, (start_key, end_key))
+                # Arşivde ana veritabanındaki dönem sorgularının kullandığı indeksler
+                conn.execute(f"CREATE INDEX {schema}.idx_hareketler_gun ON hareketler (gun)")
+                conn.execute(f"""
+                    CREATE INDEX {schema}.idx_hareketler_tip_gun_urun
+                    ON hareketler (tip, gun, urun_id, adet, toplam_tutar)
+                """)
+
+            # 2. aşama: ana veritabanı
+            with pooled_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                remaining = conn.execute("SELECT COUNT(*) FROM main.hareketler WHERE gun BETWEEN ? AND ?",
+                                         (start_key, end_key)).fetchone()[0]
+                if remaining != moved:
+                    raise sqlite3.OperationalError(
+                        f"{year} yılına arşivleme sırasında yeni hareket eklendi; işlem tekrar denenmeli.")
+                # Silme trigger'ı gunluk_ozet'i her satır için günceller ve tarar; yılın özeti
+                # zaten arşive kopyalandığı için silme süresince kaldırılıp aynı haliyle geri kurulur.
+                conn.execute("DROP TRIGGER trg_hareketler_ozet_sil")
+                conn.execute("DELETE FROM main.hareketler WHERE gun BETWEEN ? AND ?", (start_key, end_key))
+                conn.execute(f"""
+                    CREATE TRIGGER trg_hareketler_ozet_sil AFTER DELETE ON hareketler
+                    BEGIN {_ROLLUP_REMOVE_SQL} END
+                """)
+                conn.execute("DELETE FROM main.gunluk_ozet WHERE gun BETWEEN ? AND ?", (start_key, end_key))
+                conn.execute(
+                    "INSERT INTO arsiv_yillari (yil, dosya, hareket_sayisi, arsivlenme_tarihi) VALUES (?, ?, ?, ?)",
+                    (year, file_name, moved, date.today().isoformat())
+                )
+        finally:
+            with pooled_connection() as conn:
+                conn.execute(f"DETACH DATABASE {schema}")
+
+        if vacuum and moved:
+            with pooled_connection() as conn:
+                conn.execute("VACUUM")
+                _record_schema_write()
+            checkpoint_wal()
+        return moved
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (archive_year): {e}")
+        return None
+
+
+@traced
+def add_product(urun: Urun, log_opening: bool = False):
+    """
+    Ürünü ekler ve yeni ID'sini döndürür. log_opening verilirse başlangıç stoğu
+    maliyet fiyatından bir 'Alış' hareketi olarak aynı işlemde kaydedilir; ürün
+    eklenip hareketi yarım kalamaz.
+    """
+    try:
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            sql = """INSERT INTO urunler (urun_kodu, cins, ayar, gram, maliyet, satis_fiyati, stok_adeti, aciklama, resim_yolu, eklenme_tarihi, min_stok)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+            cursor.execute(sql, (
+                urun.urun_kodu, urun.cins, urun.ayar, urun.gram, urun.maliyet,
+                urun.satis_fiyati, urun.stok_adeti, urun.aciklama, urun.resim_yolu,
+                urun.eklenme_tarihi.strftime('%Y-%m-%d'), urun.min_stok
+            ))
+            urun_id = cursor.lastrowid
+            _record_change(data_changes.PRODUCT_UPSERTED, urun_id)
+            if log_opening and urun.stok_adeti > 0:
+                conn.execute(
+                    """INSERT INTO hareketler (urun_id, tip, adet, birim_fiyat, toplam_tutar, gun, cins, ayar, birim_maliyet)
+                       VALUES (?, 'Alış', ?, ?, ?, ?, ?, ?, ?)""",
+                    (urun_id, urun.stok_adeti, urun.maliyet, urun.stok_adeti * urun.maliyet,
+                     _day_key(date.today()), urun.cins, urun.ayar, urun.maliyet)
+                )
+                _record_change(data_changes.MOVEMENT_LOGGED, urun_id)
+            return urun_id
     except sqlite3.Error as e:
         print(f"Veritabanı hatası (add_product): {e}")
         return None
-    finally:
-        if conn:
-            conn.close()
 
 
+# SQLite'ın tek sorguda kabul ettiği parametre sayısı sınırının altında kalmak için parça boyutu
+_IN_CHUNK_SIZE = 500
+
+
+@traced
+def add_products_bulk(urunler) -> tuple[list[int], list[tuple[int, str, str]]]:
+    """
+    Çok sayıda ürünü ve her birinin açılış 'Alış' hareketini tek bir işlemde
+    (tek commit) executemany ile ekler. Katalog aktarımı ve yeni mağaza kurulumu için.
+
+    Mevcut ya da aynı parti içinde tekrar eden urun_kodu değerleri partiyi durdurmaz;
+    o satırlar atlanır ve hata listesinde raporlanır.
+
+    (eklenen ürün ID'leri, [(sıra no, urun_kodu, hata mesajı), ...]) döndürür.
+    """
+    urunler = list(urunler)
+    errors = []
+    candidates = {}
+    for index, urun in enumerate(urunler):
+        if not urun.urun_kodu or not urun.cins:
+            errors.append((index, urun.urun_kodu, "Ürün kodu ve cins boş bırakılamaz."))
+        elif urun.urun_kodu in candidates:
+            errors.append((index, urun.urun_kodu, "Ürün kodu aynı aktarımda birden fazla kez geçiyor."))
+        else:
+            candidates[urun.urun_kodu] = (index, urun)
+
+    gun = _day_key(date.today())
+    try:
+        with pooled_connection() as conn:
+            # Kod kontrolü ile ekleme arasında başka bir yazıcı araya girmesin diye yazma kilidi baştan alınır
+            conn.execute("BEGIN IMMEDIATE")
+
+            codes = list(candidates)
+            for start in range(0, len(codes), _IN_CHUNK_SIZE):
+                chunk = codes[start:start + _IN_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                for (kod,) in conn.execute(f"SELECT urun_kodu FROM urunler WHERE urun_kodu IN ({placeholders})", chunk):
+                    index, _ = candidates.pop(kod)
+                    errors.append((index, kod, "Bu ürün kodu veritabanında zaten mevcut."))
+
+            conn.executemany(
+                """INSERT INTO urunler (urun_kodu, cins, ayar, gram, maliyet, satis_fiyati, stok_adeti, aciklama, resim_yolu, eklenme_tarihi, min_stok)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                ((urun.urun_kodu, urun.cins, urun.ayar, urun.gram, urun.maliyet,
+                  urun.satis_fiyati, urun.stok_adeti, urun.aciklama, urun.resim_yolu,
+                  urun.eklenme_tarihi.strftime('%Y-%m-%d'), urun.min_stok) for _, urun in candidates.values())
+            )
+
+            codes = list(candidates)
+            ids_by_code = {}
+            for start in range(0, len(codes), _IN_CHUNK_SIZE):
+                chunk = codes[start:start + _IN_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                ids_by_code.update(conn.execute(
+                    f"SELECT urun_kodu, id FROM urunler WHERE urun_kodu IN ({placeholders})", chunk))
+
+            conn.executemany(
+                """INSERT INTO hareketler (urun_id, tip, adet, birim_fiyat, toplam_tutar, gun, cins, ayar, birim_maliyet)
+                   VALUES (?, 'Alış', ?, ?, ?, ?, ?, ?, ?)""",
+                ((ids_by_code[kod], urun.stok_adeti, urun.maliyet, urun.stok_adeti * urun.maliyet, gun,
+                  urun.cins, urun.ayar, urun.maliyet)
+                 for kod, (_, urun) in candidates.items())
+            )
+            _record_change(data_changes.PRODUCT_UPSERTED, *ids_by_code.values())
+            _record_change(data_changes.MOVEMENT_LOGGED, *ids_by_code.values())
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (add_products_bulk): {e}")
+        return [], [(index, urun.urun_kodu, str(e)) for index, urun in enumerate(urunler)]
+
+    errors.sort()
+    return [ids_by_code[kod] for kod in candidates], errors
+
+
+# Modellerin from_db_row kurucularının beklediği sırada sütun listeleri
+_URUN_SELECT = ", ".join(URUN_COLUMNS)
+_URUN_SELECT_U = ", ".join(f"u.{column}" for column in URUN_COLUMNS)
+_TAMIR_SELECT = ", ".join(TAMIR_COLUMNS)
+
+
+def _fetch_models(conn: sqlite3.Connection, model, sql: str, params=()) -> list:
+    """
+    Sorgu satırlarını sqlite3.Row yerine düz tuple olarak okur ve modelin
+    doğrulama yapmayan from_db_row kurucusuyla nesneye çevirir.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return list(map(model.from_db_row, cursor.execute(sql, params)))
+
+
+@traced
 def get_all_products():
 
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM urunler ORDER BY id DESC")
-        rows = cursor.fetchall()
-
-        urunler = []
-        for row in rows:
-
-            tarih_objesi = datetime.strptime(row['eklenme_tarihi'], '%Y-%m-%d').date() if row[
-                'eklenme_tarihi'] else None
-
-            urunler.append(Urun(
-                id=row['id'],
-                urun_kodu=row['urun_kodu'],
-                cins=row['cins'],
-                ayar=row['ayar'],
-                gram=row['gram'],
-                maliyet=row['maliyet'],
-                satis_fiyati=row['satis_fiyati'],
-                stok_adeti=row['stok_adeti'],
-                aciklama=row['aciklama'],
-                resim_yolu=row['resim_yolu'],
-                eklenme_tarihi=tarih_objesi
-            ))
-        return urunler
+    try:
+        with pooled_connection() as conn:
+            return _fetch_models(conn, Urun, f"SELECT {_URUN_SELECT} FROM urunler ORDER BY id DESC")
     except sqlite3.Error as e:
         print(f"Veritabanı hatası (get_all_products): {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
 
 
 
+@traced
+def get_products_by_ids(product_ids) -> list[Urun] | None:
+    """
+    Verilen ID'lere sahip ürünleri döndürür; bulunamayan ID'ler atlanır.
+    Veritabanı hatasında, "ürün yok" ile karışmaması için None döner.
+    """
+    product_ids = list(product_ids)
+    urunler = []
+    try:
+        with pooled_connection() as conn:
+            for start in range(0, len(product_ids), _IN_CHUNK_SIZE):
+                chunk = product_ids[start:start + _IN_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                urunler.extend(_fetch_models(
+                    conn, Urun, f"SELECT {_URUN_SELECT} FROM urunler WHERE id IN ({placeholders})", chunk))
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (get_products_by_ids): {e}")
+        return None
+    return urunler
+
+
+# get_products_page'in sıralayabileceği sütunlar; hepsi indekslidir (id zaten rowid'dir).
+PRODUCT_SORT_COLUMNS = ('id', 'urun_kodu', 'stok_adeti', 'eklenme_tarihi')
+# get_products_page'e verilebilecek filtreler ve karşılık gelen SQL koşulları
+PRODUCT_PAGE_FILTERS = {
+    'cins': "cins = ?",
+    'ayar': "ayar = ?",
+    'max_stok': "stok_adeti <= ?",
+}
+
+
+@traced
+def get_products_page(after_key: tuple = None, limit: int = 100, sort: str = '-id', filters: dict = None):
+    """
+    Ürünleri keyset (anahtar tabanlı) sayfalama ile getirir; OFFSET kullanmadığı için
+    her sayfa katalog büyüklüğünden bağımsız olarak indeks üzerinden okunur.
+
+    sort: PRODUCT_SORT_COLUMNS'tan bir sütun; azalan sıra için başına '-' eklenir.
+    after_key: bir önceki çağrının döndürdüğü anahtar; ilk sayfa için None.
+    filters: PRODUCT_PAGE_FILTERS anahtarlarından oluşan sözlük, örn. {'cins': 'Bilezik'}.
+
+    (ürün listesi, sonraki sayfanın anahtarı) döndürür; son sayfada anahtar None olur.
+    """
+    descending = sort.startswith('-')
+    column = sort.lstrip('-')
+    if column not in PRODUCT_SORT_COLUMNS:
+        raise ValueError(f"Geçersiz sıralama sütunu: {column}")
+
+    conditions, params = [], []
+    for name, value in (filters or {}).items():
+        if name not in PRODUCT_PAGE_FILTERS:
+            raise ValueError(f"Geçersiz filtre: {name}")
+        conditions.append(PRODUCT_PAGE_FILTERS[name])
+        params.append(value)
+
+    direction = "DESC" if descending else "ASC"
+    comparison = "<" if descending else ">"
+    if column == 'id':
+        order_by = f"id {direction}"
+        if after_key is not None:
+            conditions.append(f"id {comparison} ?")
+            params.append(after_key[-1])
+    else:
+        # Aynı değere sahip satırlar id ile ayrıştırılır; (sütun, id) karşılaştırması indeksi kullanır.
+        order_by = f"{column} {direction}, id {direction}"
+        if after_key is not None:
+            conditions.append(f"({column}, id) {comparison} (?, ?)")
+            params.extend(after_key)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    # Sonraki sayfanın olup olmadığını anlamak için bir satır fazla okunur
+    sql = f"SELECT {_URUN_SELECT} FROM urunler {where} ORDER BY {order_by} LIMIT ?"
+    params.append(limit + 1)
+
+    try:
+        with pooled_connection() as conn:
+            urunler = _fetch_models(conn, Urun, sql, params)
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (get_products_page): {e}")
+        return [], None
+
+    next_key = None
+    if len(urunler) > limit:
+        urunler = urunler[:limit]
+        last = urunler[-1]
+        value = getattr(last, column)
+        # Tarih, veritabanındaki gibi 'YYYY-MM-DD' metniyle karşılaştırılmalıdır
+        if isinstance(value, date):
+            value = value.isoformat()
+        next_key = (last.id,) if column == 'id' else (value, last.id)
+    return urunler, next_key
+
+
+@traced
 def delete_product(product_id: int):
 
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM urunler WHERE id = ?", (product_id,))
-        conn.commit()
+        with pooled_connection() as conn:
+            conn.execute("DELETE FROM urunler WHERE id = ?", (product_id,))
+            _record_change(data_changes.PRODUCT_DELETED, product_id)
         return True
     except sqlite3.Error as e:
         print(f"Veritabanı hatası (delete_product): {e}")
         return False
-    finally:
-        if conn:
-            conn.close()
 
+@traced
 def update_product(urun: Urun):
 
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        sql = """UPDATE urunler SET
-                    urun_kodu = ?,
-                    cins = ?,
-                    ayar = ?,
-                    gram = ?,
-                    maliyet = ?,
-                    satis_fiyati = ?,
-                    stok_adeti = ?,
-                    aciklama = ?,
-                    resim_yolu = ?
-                 WHERE id = ?"""
-        cursor.execute(sql, (
-            urun.urun_kodu, urun.cins, urun.ayar, urun.gram, urun.maliyet,
-            urun.satis_fiyati, urun.stok_adeti, urun.aciklama, urun.resim_yolu,
-            urun.id
-        ))
-        conn.commit()
+    try:
+        with pooled_connection() as conn:
+            sql = """UPDATE urunler SET
+                        urun_kodu = ?,
+                        cins = ?,
+                        ayar = ?,
+                        gram = ?,
+                        maliyet = ?,
+                        satis_fiyati = ?,
+                        stok_adeti = ?,
+                        aciklama = ?,
+                        resim_yolu = ?,
+                        min_stok = ?
+                     WHERE id = ?"""
+            conn.execute(sql, (
+                urun.urun_kodu, urun.cins, urun.ayar, urun.gram, urun.maliyet,
+                urun.satis_fiyati, urun.stok_adeti, urun.aciklama, urun.resim_yolu,
+                urun.min_stok, urun.id
+            ))
+            _record_change(data_changes.PRODUCT_UPSERTED, urun.id)
         return True
     except sqlite3.Error as e:
         print(f"Veritabanı hatası (update_product): {e}")
         return False
-    finally:
-        if conn:
-            conn.close()
 
+# search_products'ın döndüreceği en fazla sonuç sayısı
+SEARCH_RESULT_LIMIT = 200
 
 
-def search_products(search_term: str):
+@traced
+def search_products(search_term: str, limit: int = SEARCH_RESULT_LIMIT):
     """
-    Tüm ürünleri veritabanından çeker ve ardından Python içinde
-    Türkçe karakter uyumlu, büyük/küçük harf duyarsız filtreleme yapar.
+    Ürün kodu, cins ve açıklama üzerinde FTS5 (trigram) indeksiyle arama yapar.
+    Türkçe büyük/küçük harf duyarsızdır (I/ı, İ/i). Sonuçlar alakaya göre
+    sıralanır ve en fazla 'limit' kadar ürün döner. Terim boşsa tüm ürünler döner.
     """
-    # 1. Önce veritabanından TÜM ürünleri çekiyoruz.
-    # Bu fonksiyonu zaten daha önce yazmıştık.
-    all_products = get_all_products()
-
     # Eğer arama kutusu boşsa, tüm listeyi geri döndür.
-    if not search_term:
-        return all_products
-
-    # 2. Arama terimini Python'da küçük harfe çeviriyoruz.
-    # Python'un .lower() metodu Türkçe karakterleri doğru bir şekilde işler.
-    search_term_lower = search_term.lower()
-
-    # 3. Filtrelemeyi veritabanı yerine Python'da yapıyoruz.
-    filtered_list = []
-    for urun in all_products:
-        # Her ürünün kodunu ve cinsini de küçük harfe çevirip karşılaştırıyoruz.
-        kod_lower = urun.urun_kodu.lower()
-        cins_lower = urun.cins.lower()
-
-        if search_term_lower in kod_lower or search_term_lower in cins_lower:
-            filtered_list.append(urun)
+    if not search_term or not search_term.strip():
+        return get_all_products()
+
+    term = _tr_fold(search_term.strip())
+    if len(term) >= 3:
+        # Trigram indeksi terimi ifade (phrase) olarak, yani alt metin olarak eşleştirir.
+        sql = f"""SELECT {_URUN_SELECT_U} FROM urunler_fts f
+                 JOIN urunler u ON u.id = f.rowid
+                 WHERE urunler_fts MATCH ?
+                 ORDER BY f.rank
+                 LIMIT ?"""
+        params = ('"' + term.replace('"', '""') + '"', limit)
+    else:
+        # Trigram 3 karakterden kısa terimleri MATCH ile arayamaz; indeks tablosu üzerinde LIKE kullanılır.
+        pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        sql = f"""SELECT {_URUN_SELECT_U} FROM urunler_fts f
+                 JOIN urunler u ON u.id = f.rowid
+                 WHERE f.urun_kodu LIKE ?1 ESCAPE '\\' OR f.cins LIKE ?1 ESCAPE '\\' OR f.aciklama LIKE ?1 ESCAPE '\\'
+                 ORDER BY u.id DESC
+                 LIMIT ?2"""
+        params = (pattern, limit)
 
-    return filtered_list
+    try:
+        with pooled_connection() as conn:
+            return _fetch_models(conn, Urun, sql, params)
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (search_products): {e}")
+        return []
 
 
+@traced
 def get_total_inventory_value():
 
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        sql = "SELECT SUM(maliyet * stok_adeti) FROM urunler"
-        cursor.execute(sql)
-
-        result = cursor.fetchone()[0]
-
-
-        return result if result is not None else 0.0
+        with pooled_connection() as conn:
+            # Trigger ile güncel tutulan cins özetlerinin toplamı; urunler taranmaz
+            return conn.execute("SELECT TOTAL(toplam_maliyet) FROM envanter_ozet").fetchone()[0]
 
     except sqlite3.Error as e:
         print(f"Veritabanı hatası (get_total_inventory_value): {e}")
         return 0.0
-    finally:
-        if conn:
-            conn.close()
 
 
+@traced
 def get_product_counts_by_type():
 
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-
-        sql = """SELECT cins, SUM(stok_adeti) as toplam_stok 
-                 FROM urunler 
-                 GROUP BY cins 
-                 ORDER BY toplam_stok DESC"""
-        cursor.execute(sql)
-
-        return cursor.fetchall()
+        with pooled_connection() as conn:
+            sql = """SELECT cins, stok_adeti AS toplam_stok
+                     FROM envanter_ozet
+                     ORDER BY toplam_stok DESC"""
+            return conn.execute(sql).fetchall()
 
     except sqlite3.Error as e:
         print(f"Veritabanı hatası (get_product_counts_by_type): {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
 
 
+@traced
 def get_total_grams():
 
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-
-        sql = "SELECT SUM(gram * stok_adeti) FROM urunler"
-        cursor.execute(sql)
-
-        result = cursor.fetchone()[0]
-        return result if result is not None else 0.0
+        with pooled_connection() as conn:
+            return conn.execute("SELECT TOTAL(toplam_gram) FROM envanter_ozet").fetchone()[0]
 
     except sqlite3.Error as e:
         print(f"Veritabanı hatası (get_total_grams): {e}")
         return 0.0
-    finally:
-        if conn:
-            conn.close()
 
 
+@traced
 def update_stock(product_id: int, quantity_change: int):
 
-
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-
-
-        sql = "UPDATE urunler SET stok_adeti = stok_adeti + ? WHERE id = ?"
-
-        cursor.execute(sql, (quantity_change, product_id))
-        conn.commit()
-
-
-        return cursor.rowcount > 0
+        with pooled_connection() as conn:
+            row = conn.execute(
+                f"""UPDATE urunler SET stok_adeti = stok_adeti + ? WHERE id = ?
+                    RETURNING stok_adeti, COALESCE(min_stok, {DEFAULT_MIN_STOK})""",
+                (quantity_change, product_id)
+            ).fetchone()
+            _record_change(data_changes.PRODUCT_UPSERTED, product_id)
+            if row is not None:
+                _check_low_stock_reached(product_id, row[0] - quantity_change, row[0], row[1])
+
+        return row is not None
 
     except sqlite3.Error as e:
         print(f"Veritabanı hatası (update_stock): {e}")
         return False
-    finally:
-        if conn:
-            conn.close()
 
 
+@traced
 def log_transaction(urun_id: int, tip: str, adet: int, birim_fiyat: float):
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
     toplam_tutar = adet * birim_fiyat
-    sql = """INSERT INTO hareketler (urun_id, tip, adet, birim_fiyat, toplam_tutar)
-             VALUES (?, ?, ?, ?, ?)"""
+    sql = """INSERT INTO hareketler (urun_id, tip, adet, birim_fiyat, toplam_tutar, gun, cins, ayar, birim_maliyet)
+             SELECT ?1, ?2, ?3, ?4, ?5, ?6, u.cins, u.ayar, u.maliyet
+             FROM (SELECT 1) LEFT JOIN urunler u ON u.id = ?1"""
     try:
-        cursor.execute(sql, (urun_id, tip, adet, birim_fiyat, toplam_tutar))
-        conn.commit()
+        with pooled_connection() as conn:
+            conn.execute(sql, (urun_id, tip, adet, birim_fiyat, toplam_tutar, _day_key(date.today())))
+            _record_change(data_changes.MOVEMENT_LOGGED, urun_id)
     except sqlite3.Error as e:
         print(f"Hareket loglama hatası: {e}")
-    finally:
-        conn.close()
 
 
-def get_daily_summary(selected_date: str):
+def _check_low_stock_reached(urun_id: int, old_stock: int, new_stock: int, threshold: int):
+    """Stok bu değişiklikle kritik eşiğe indiyse (önceden üstündeyken) LOW_STOCK_REACHED not edilir."""
+    if new_stock <= threshold < old_stock:
+        _record_change(data_changes.LOW_STOCK_REACHED, urun_id)
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    summary = {'alis': 0.0, 'satis': 0.0}
-    try:
 
-        sql_alis = "SELECT SUM(toplam_tutar) FROM hareketler WHERE tip = 'Alış' AND date(tarih) = ?"
-        cursor.execute(sql_alis, (selected_date,))
-        result_alis = cursor.fetchone()[0]
-        if result_alis:
-            summary['alis'] = result_alis
+# Hareket tipine göre stok değişiminin işareti
+MOVEMENT_SIGNS = {'Alış': 1, 'Satış': -1}
 
 
-        sql_satis = "SELECT SUM(toplam_tutar) FROM hareketler WHERE tip = 'Satış' AND date(tarih) = ?"
-        cursor.execute(sql_satis, (selected_date,))
-        result_satis = cursor.fetchone()[0]
-        if result_satis:
-            summary['satis'] = result_satis
+def _apply_movement(conn: sqlite3.Connection, urun_id: int, tip: str, adet: int, birim_fiyat: float) -> int:
+    """
+    Stok kontrolü, stok güncellemesi ve hareket kaydını verilen bağlantının açık
+    işlemi içinde yapar; işlemi başlatmak ve bitirmek çağırana aittir.
+    """
+    if tip not in MOVEMENT_SIGNS:
+        raise ValueError(f"Geçersiz hareket tipi: {tip}")
+    if adet <= 0:
+        raise ValueError("Hareket adedi pozitif olmalıdır.")
+
+    change = MOVEMENT_SIGNS[tip] * adet
+    row = conn.execute(
+        f"""UPDATE urunler SET stok_adeti = stok_adeti + ?1
+            WHERE id = ?2 AND stok_adeti + ?1 >= 0
+            RETURNING stok_adeti, COALESCE(min_stok, {DEFAULT_MIN_STOK}), cins, ayar, maliyet""",
+        (change, urun_id)
+    ).fetchone()
+
+    if row is None:
+        current = conn.execute("SELECT stok_adeti FROM urunler WHERE id = ?", (urun_id,)).fetchone()
+        if current is None:
+            raise ValueError(f"Ürün bulunamadı (ID: {urun_id}).")
+        raise ValueError(f"Stok yeterli değil. Mevcut stok: {current[0]}")
+
+    conn.execute(
+        """INSERT INTO hareketler (urun_id, tip, adet, birim_fiyat, toplam_tutar, gun, cins, ayar, birim_maliyet)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (urun_id, tip, adet, birim_fiyat, adet * birim_fiyat, _day_key(date.today()), row[2], row[3], row[4])
+    )
+    _record_change(data_changes.MOVEMENT_LOGGED, urun_id)
+    _check_low_stock_reached(urun_id, row[0] - change, row[0], row[1])
+    return row[0]
+
+
+@traced
+def record_movement(urun_id: int, tip: str, adet: int, birim_fiyat: float) -> int | None:
+    """
+    Stok kontrolünü, stok güncellemesini ve hareket kaydını tek bir BEGIN IMMEDIATE
+    işleminde, tek commit ile yapar; ikisinden biri yazılıp diğeri yarım kalamaz.
+    Ürünün yeni stok adedini döndürür. Ürün bulunamazsa ya da satış için stok
+    yetersizse ValueError, veritabanı hatasında None döner.
+    """
+    if tip not in MOVEMENT_SIGNS:
+        raise ValueError(f"Geçersiz hareket tipi: {tip}")
+    if adet <= 0:
+        raise ValueError("Hareket adedi pozitif olmalıdır.")
 
+    try:
+        with pooled_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            return _apply_movement(conn, urun_id, tip, adet, birim_fiyat)
     except sqlite3.Error as e:
-        print(f"Günlük özet alınırken hata: {e}")
-    finally:
-        conn.close()
-    return summary
+        print(f"Veritabanı hatası (record_movement): {e}")
+        return None
 
 
-def get_transactions_for_date(selected_date: str):
+class MovementWriteQueue:
+    """
+    Yoğun satış anları için isteğe bağlı, arka planda çalışan toplu yazma kuyruğu.
+
+    submit() ile gelen stok hareketleri tek bir yazıcı thread'de toplanır ve
+    max_delay_ms süre dolduğunda ya da max_batch hareket biriktiğinde tek bir
+    işlemde (tek fsync) commit edilir. submit() bir Future döndürür; Future yalnızca
+    hareket commit edildikten sonra yeni stok adediyle tamamlanır. Stok yetersizliği
+    gibi hatalar yalnızca ilgili hareketin Future'ına düşer, partideki diğer
+    hareketleri etkilemez. Commit başarısız olursa partideki tüm Future'lar hata alır.
+    """
 
+    def __init__(self, max_batch: int = 64, max_delay_ms: int = 20):
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="StokGoldMovementWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, urun_id: int, tip: str, adet: int, birim_fiyat: float) -> Future:
+        """Hareketi kuyruğa ekler; commit edildiğinde yeni stok adediyle tamamlanan bir Future döndürür."""
+        if self._closed:
+            raise RuntimeError("Yazma kuyruğu kapatılmış.")
+        future = Future()
+        self._queue.put((future, (urun_id, tip, adet, birim_fiyat)))
+        return future
+
+    def flush(self, timeout: float = None):
+        """O ana kadar kuyruğa eklenmiş tüm hareketler commit edilene kadar bekler."""
+        marker = Future()
+        self._queue.put((marker, None))
+        marker.result(timeout)
+
+    def close(self):
+        """Bekleyen hareketleri commit eder ve yazıcı thread'i durdurur."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit_batch(batch)
+        close_thread_connection()
+
+    def _commit_batch(self, batch: list):
+        results = []
+        try:
+            with pooled_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for future, args in batch:
+                    if args is None:
+                        results.append((future, None, None))
+                        continue
+                    # Her hareket kendi savepoint'inde: biri başarısız olursa sadece o geri alınır
+                    conn.execute("SAVEPOINT hareket")
+                    try:
+                        results.append((future, _apply_movement(conn, *args), None))
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO hareket")
+                        results.append((future, None, e))
+                    conn.execute("RELEASE hareket")
+        except sqlite3.Error as e:
+            print(f"Veritabanı hatası (MovementWriteQueue): {e}")
+            for future, _ in batch:
+                future.set_exception(e)
+            return
+
+        # Future'lar ancak commit tamamlandıktan sonra sonuçlandırılır
+        for future, value, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+
+_movement_queue = None
+_movement_queue_lock = threading.Lock()
+
+
+def get_movement_queue() -> MovementWriteQueue:
+    """Uygulama genelinde paylaşılan yazma kuyruğunu döndürür, yoksa başlatır."""
+    global _movement_queue
+    with _movement_queue_lock:
+        if _movement_queue is None:
+            _movement_queue = MovementWriteQueue()
+        return _movement_queue
+
+
+@traced
+def get_summaries_for_range(start_date: str, end_date: str) -> dict:
+    """
+    Verilen tarih aralığındaki (iki uç dahil) her gün için toplam alış ve satış
+    tutarlarını tek bir sorguyla döndürür: {'YYYY-MM-DD': {'alis': ..., 'satis': ...}}.
+    Hareket olmayan günler sözlükte yer almaz.
+    """
+    summaries = {}
+    try:
+        with pooled_connection() as conn:
+            start_key, end_key = _day_key(start_date), _day_key(end_date)
+            rows = []
+            for schemas in _archive_schema_groups(conn, start_key, end_key):
+                movements = _union_all(schemas, """
+                    SELECT gun, tip, toplam_tutar FROM {schema}.hareketler WHERE gun BETWEEN ?1 AND ?2""")
+                rows += conn.execute(f"SELECT gun, tip, SUM(toplam_tutar) FROM ({movements}) GROUP BY gun, tip",
+                                     (start_key, end_key)).fetchall()
+
+        for gun, tip, toplam in rows:
+            summary = summaries.setdefault(_day_str(gun), {'alis': 0.0, 'satis': 0.0})
+            if tip == 'Alış':
+                summary['alis'] += toplam or 0.0
+            elif tip == 'Satış':
+                summary['satis'] += toplam or 0.0
 
-    conn = get_db_connection()
+    except sqlite3.Error as e:
+        print(f"Günlük özetler alınırken hata: {e}")
+    return summaries
 
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+
+@traced
+def get_daily_summary(selected_date: str):
+
+    return get_summaries_for_range(selected_date, selected_date).get(selected_date, {'alis': 0.0, 'satis': 0.0})
 
 
-    sql = """SELECT 
+@traced
+def get_transactions_for_date(selected_date: str):
+
+    select_sql = """SELECT 
                 h.tip, 
                 h.adet, 
                 h.birim_fiyat, 
@@ -385,248 +1738,391 @@ def get_transactions_for_date(selected_date: str):
                 u.cins,
                 u.ayar,
                 u.gram
-             FROM hareketler h
-             JOIN urunler u ON h.urun_id = u.id
-             WHERE date(h.tarih) = ?
-             ORDER BY h.tarih DESC"""
+             FROM {schema}.hareketler h
+             JOIN main.urunler u ON h.urun_id = u.id
+             WHERE h.gun = ?1"""
 
     try:
-        cursor.execute(sql, (selected_date,))
-
-        return [dict(row) for row in cursor.fetchall()]
+        with pooled_connection() as conn:
+            gun = _day_key(selected_date)
+            # Tek gün en fazla bir arşiv yılına denk gelir
+            schemas = next(_archive_schema_groups(conn, gun, gun))
+            sql = _union_all(schemas, select_sql) + " ORDER BY tarih DESC"
+            return [dict(row) for row in conn.execute(sql, (gun,)).fetchall()]
     except sqlite3.Error as e:
         print(f"Günlük hareketler alınırken hata: {e}")
         return []
-    finally:
-        conn.close()
+@traced
 def get_statistics_for_period(start_date: str, end_date: str):
-    conn = get_db_connection()
-    cursor = conn.cursor()
     stats = {
         'total_sales': 0.0,
         'total_cogs': 0.0,  # Cost of Goods Sold (Satılan Malın Maliyeti)
         'net_profit': 0.0
     }
 
-    try:
-
-        sql_sales = """SELECT SUM(toplam_tutar) FROM hareketler 
-                       WHERE tip = 'Satış' AND date(tarih) BETWEEN ? AND ?"""
-        cursor.execute(sql_sales, (start_date, end_date))
-        total_sales_result = cursor.fetchone()[0]
-        if total_sales_result:
-            stats['total_sales'] = total_sales_result
-
-
-        sql_cogs = """SELECT SUM(h.adet * u.maliyet) 
-                      FROM hareketler h
-                      JOIN urunler u ON h.urun_id = u.id
-                      WHERE h.tip = 'Satış' AND date(h.tarih) BETWEEN ? AND ?"""
-        cursor.execute(sql_cogs, (start_date, end_date))
-        total_cogs_result = cursor.fetchone()[0]
-        if total_cogs_result:
-            stats['total_cogs'] = total_cogs_result
+    # Ham hareketler yerine trigger'larla güncel tutulan günlük özetten okunur;
+    # çok yıllık aralıklar da gün başına birkaç satır taranarak hesaplanır.
+    # Arşivlenmiş yılların özeti kendi arşiv dosyalarındadır.
+    select_sql = """SELECT tutar, maliyet FROM {schema}.gunluk_ozet
+                    WHERE tip = 'Satış' AND gun BETWEEN ?1 AND ?2"""
 
+    try:
+        with pooled_connection() as conn:
+            start_key, end_key = _day_key(start_date), _day_key(end_date)
+            for schemas in _archive_schema_groups(conn, start_key, end_key):
+                total_sales_result, total_cogs_result = conn.execute(
+                    f"SELECT SUM(tutar), SUM(maliyet) FROM ({_union_all(schemas, select_sql)})",
+                    (start_key, end_key)).fetchone()
+                if total_sales_result:
+                    stats['total_sales'] += total_sales_result
+                if total_cogs_result:
+                    stats['total_cogs'] += total_cogs_result
 
         stats['net_profit'] = stats['total_sales'] - stats['total_cogs']
 
     except sqlite3.Error as e:
         print(f"İstatistik hesaplama hatası: {e}")
-    finally:
-        if conn:
-            conn.close()
 
     return stats
 
-def get_low_stock_products(threshold: int):
-    """Stoğu verilen eşik değerinin altında olan ürünleri döndürür (0 dahil)."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    sql = """SELECT urun_kodu, cins, stok_adeti FROM urunler 
-             WHERE stok_adeti < ? 
-             ORDER BY stok_adeti ASC"""
-
+@traced
+def get_low_stock_products(threshold: int = None):
+    """
+    Kritik stoktaki ürünleri (urun_kodu, cins, stok_adeti, kritik_esik) olarak, stoğu en az
+    olan önce döndürür. threshold verilmezse her ürün kendi eşiğine (min_stok, yoksa
+    DEFAULT_MIN_STOK) göre değerlendirilir ve yalnızca kritik ürünleri içeren kısmi indeks
+    okunur. threshold verilirse stoğu bu değerin altında olan (0 dahil) tüm ürünler döner.
+    """
     try:
-        cursor.execute(sql, (threshold,))
-        return cursor.fetchall()
+        with pooled_connection() as conn:
+            return conn.execute(*_low_stock_query(threshold)).fetchall()
     except sqlite3.Error as e:
         print(f"Düşük stok sorgusu hatası: {e}")
         return []
-    finally:
-        conn.close()
 
 
+@traced
 def get_product_variety_count():
     """Veritabanındaki toplam benzersiz ürün çeşidi sayısını döndürür."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute("SELECT COUNT(id) FROM urunler")
-        count = cursor.fetchone()[0]
-        return count if count is not None else 0
-    finally:
-        conn.close()
+        with pooled_connection() as conn:
+            return conn.execute("SELECT COALESCE(SUM(urun_sayisi), 0) FROM envanter_ozet").fetchone()[0]
+    except sqlite3.Error as e:
+        print(f"Ürün çeşidi sayısı sorgusu hatası: {e}")
+        return 0
 
+@traced
 def get_latest_products(limit: int = 5):
     """Veritabanına en son eklenen ürünleri belirli bir limitte döndürür."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
     # ID'ye göre tersten sıralayıp ilk 'limit' kadarını alıyoruz.
     sql = "SELECT cins, urun_kodu FROM urunler ORDER BY id DESC LIMIT ?"
     try:
-        cursor.execute(sql, (limit,))
-        # Sonuçları [('Cins', 'Kod'), ...] formatında liste olarak döndürür
-        return cursor.fetchall()
+        with pooled_connection() as conn:
+            # Sonuçları [('Cins', 'Kod'), ...] formatında liste olarak döndürür
+            return conn.execute(sql, (limit,)).fetchall()
     except sqlite3.Error as e:
         print(f"Son eklenen ürünler sorgusu hatası: {e}")
         return []
-    finally:
-        conn.close()
 
+def _low_stock_query(threshold: int = None) -> tuple[str, tuple]:
+    columns = f"urun_kodu, cins, stok_adeti, COALESCE(min_stok, {DEFAULT_MIN_STOK}) AS kritik_esik"
+    if threshold is None:
+        return f"SELECT {columns} FROM urunler WHERE {_LOW_STOCK_CONDITION} ORDER BY stok_adeti ASC", ()
+    return f"SELECT {columns} FROM urunler WHERE stok_adeti < ? ORDER BY stok_adeti ASC", (threshold,)
+
+
+def _top_profitable_query(limit: int) -> tuple[str, tuple]:
+    return f"""
+        SELECT cins, {_POTENTIAL_PROFIT_EXPR} AS potansiyel_kar, urun_kodu, id AS urun_id
+        FROM urunler
+        WHERE {_POTENTIAL_PROFIT_CONDITION}
+        ORDER BY {_POTENTIAL_PROFIT_EXPR} DESC
+        LIMIT ?
+    """, (limit,)
+
+
+# get_best_selling_products için sıralama ölçütleri
+BEST_SELLER_SORT_COLUMNS = {
+    'tutar': "satis_tutari DESC, satilan_adet DESC",
+    'adet': "satilan_adet DESC, satis_tutari DESC",
+}
+
+
+def _best_sellers_query(conn: sqlite3.Connection, start_date, end_date, limit: int,
+                        by: str = 'tutar') -> tuple[str, tuple]:
+    if by not in BEST_SELLER_SORT_COLUMNS:
+        raise ValueError(f"Geçersiz sıralama ölçütü: {by}")
+    order = BEST_SELLER_SORT_COLUMNS[by]
+    start_key, end_key = _day_key(start_date), _day_key(end_date)
+    sales_sql = """
+                SELECT urun_id, adet, toplam_tutar FROM {schema}.hareketler
+                WHERE tip = 'Satış' AND gun BETWEEN ?1 AND ?2"""
+    sources = _archive_sources(conn, start_key, end_key)
+    if len(sources) <= conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED):
+        sales = _union_all(_attach_archives(conn, sources), sales_sql)
+    else:
+        # Aralık aynı anda bağlanamayacak kadar çok arşiv yılı kapsıyor: grupların ürün toplamları
+        # birleştirilip geçici tabloya yazılır ve aşağıdaki sorgu oradan okur. Tablo, gruplar
+        # arasında arşivleri ayırabilmek için (açık işlem olmamalı) en sonda doldurulur.
+        totals = {}
+        for schemas in _archive_schema_groups(conn, start_key, end_key):
+            for urun_id, adet, tutar in conn.execute(f"""
+                SELECT urun_id, SUM(adet), SUM(toplam_tutar) FROM ({_union_all(schemas, sales_sql)}) GROUP BY urun_id
+            """, (start_key, end_key)):
+                total = totals.setdefault(urun_id, [0, 0.0])
+                total[0] += adet
+                total[1] += tutar
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS donem_satislari (urun_id INTEGER, adet INTEGER, toplam_tutar REAL)")
+        conn.execute("DELETE FROM temp.donem_satislari")
+        conn.executemany("INSERT INTO temp.donem_satislari VALUES (?, ?, ?)",
+                         ((urun_id, adet, tutar) for urun_id, (adet, tutar) in totals.items()))
+        sales = "SELECT urun_id, adet, toplam_tutar FROM temp.donem_satislari"
+    # İç sorgu yalnızca idx_hareketler_tip_gun_urun'u okur; ürün bilgisi ilk N satır için eklenir
+    return f"""
+        SELECT s.urun_id, u.urun_kodu, u.cins, s.satilan_adet, s.satis_tutari
+        FROM (
+            SELECT urun_id, SUM(adet) AS satilan_adet, SUM(toplam_tutar) AS satis_tutari
+            FROM ({sales})
+            GROUP BY urun_id
+            ORDER BY {order}
+            LIMIT ?3
+        ) s
+        LEFT JOIN main.urunler u ON u.id = s.urun_id
+        ORDER BY {order}
+    """, (start_key, end_key, limit)
+
+
+# Kontrol paneli özeti hata durumunda bu değerlerle döner
+_EMPTY_DASHBOARD_SNAPSHOT = {
+    'daily_summary': {'alis': 0.0, 'satis': 0.0},
+    'variety_count': 0,
+    'total_value': 0.0,
+    'total_grams': 0.0,
+    'low_stock_items': [],
+    'latest_products': [],
+    'best_sellers': [],
+    'top_profitable': [],
+}
+
+
+@traced
+def get_dashboard_snapshot(low_stock_threshold: int = None, latest_limit: int = 5, top_limit: int = 5,
+                           best_seller_days: int = 30, use_cache: bool = True) -> dict:
+    """
+    Kontrol paneli ve asistanın envanter özeti için tüm göstergeleri tek bağlantıda, tek
+    okuma işleminde (tutarlı bir anlık görüntüden) döndürür: daily_summary (bugün),
+    variety_count, total_value, total_grams, low_stock_items, latest_products,
+    best_sellers (son best_seller_days günün en çok satanları) ve top_profitable.
+
+    Sonuç thread başına önbelleğe alınır ve veritabanı değişmedikçe (PRAGMA data_version,
+    bu süreçteki commit sayısı ve gün aynı kaldıkça) sorgu çalıştırılmadan döndürülür.
+    Döndürülen sözlükteki listeler paylaşılır, değiştirilmemelidir.
+    """
+    today = date.today()
+    try:
+        with pooled_connection() as conn:
+            cache_key = (conn.execute("PRAGMA data_version").fetchone()[0], data_changes.local_commit_count(),
+                         today, low_stock_threshold, latest_limit, top_limit, best_seller_days)
+            cached = getattr(_thread_local, 'dashboard_snapshot', None)
+            if use_cache and cached is not None and cached[0] is conn and cached[1] == cache_key:
+                return dict(cached[2])
+
+            # Açık bir işlem yoksa okuma işlemi başlatılır; tüm sorgular aynı anlık görüntüyü görür
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            gun = _day_key(today)
+            variety_count, total_value, total_grams, alis, satis = conn.execute(
+                """SELECT COALESCE(SUM(urun_sayisi), 0), TOTAL(toplam_maliyet), TOTAL(toplam_gram),
+                          (SELECT TOTAL(tutar) FROM gunluk_ozet WHERE tip = 'Alış' AND gun = ?1),
+                          (SELECT TOTAL(tutar) FROM gunluk_ozet WHERE tip = 'Satış' AND gun = ?1)
+                   FROM envanter_ozet""",
+                (gun,)
+            ).fetchone()
+            snapshot = {
+                'daily_summary': {'alis': alis, 'satis': satis},
+                'variety_count': variety_count,
+                'total_value': total_value,
+                'total_grams': total_grams,
+                'low_stock_items': conn.execute(*_low_stock_query(low_stock_threshold)).fetchall(),
+                'latest_products': conn.execute(
+                    "SELECT cins, urun_kodu FROM urunler ORDER BY id DESC LIMIT ?", (latest_limit,)
+                ).fetchall(),
+                'best_sellers': conn.execute(*_best_sellers_query(
+                    conn, today - timedelta(days=best_seller_days - 1), today, top_limit)).fetchall(),
+                'top_profitable': conn.execute(*_top_profitable_query(top_limit)).fetchall(),
+            }
+        _thread_local.dashboard_snapshot = (conn, cache_key, snapshot)
+        return dict(snapshot)
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (get_dashboard_snapshot): {e}")
+        return dict(_EMPTY_DASHBOARD_SNAPSHOT)
+
+
+@traced
 def get_top_profitable_products(limit: int = 1):
     """
-    Potansiyel kârı (mevcut stok ve fiyatlara göre) en yüksek olan ürünleri döndürür.
+    Potansiyel kârı (mevcut stok ve fiyatlara göre) en yüksek olan ürünleri
+    (cins, potansiyel_kar, urun_kodu, urun_id) olarak döndürür. İfade indeksi sayesinde
+    katalog büyüklüğünden bağımsız olarak yalnızca ilk limit kadar indeks girdisi okunur.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
     # Not: Bu sorgu, satılmış kârı değil, mevcut stok satılırsa elde edilecek potansiyel kârı hesaplar.
-    sql = """
-        SELECT cins, (satis_fiyati - maliyet) * stok_adeti AS potansiyel_kar
-        FROM urunler
-        WHERE satis_fiyati > 0 AND maliyet > 0 AND stok_adeti > 0
-        ORDER BY potansiyel_kar DESC
-        LIMIT ?
-    """
     try:
-        cursor.execute(sql, (limit,))
-        return cursor.fetchall()
+        with pooled_connection() as conn:
+            return conn.execute(*_top_profitable_query(limit)).fetchall()
     except sqlite3.Error as e:
         print(f"En karlı ürün sorgusu hatası: {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
 
 
+@traced
+def get_best_selling_products(start_date: str, end_date: str, limit: int = 5, by: str = 'tutar'):
+    """
+    İki tarih (dahil, 'YYYY-MM-DD') arasında en çok satan ürünleri (urun_id, urun_kodu, cins,
+    satilan_adet, satis_tutari) olarak döndürür. by: 'tutar' (satış tutarı) veya 'adet'.
+    Yalnızca dönemdeki satış hareketlerinin indeks girdileri okunur; ürün tablosunun
+    büyüklüğü sorgu süresini etkilemez. Sonradan silinmiş bir ürünün satışları da
+    listelenir; bu satırlarda urun_kodu ve cins None olur.
+    """
+    try:
+        with pooled_connection() as conn:
+            return conn.execute(*_best_sellers_query(conn, start_date, end_date, limit, by)).fetchall()
+    except sqlite3.Error as e:
+        print(f"En çok satanlar sorgusu hatası: {e}")
+        return []
+
+
+@traced
 def add_tamir(tamir: Tamir) -> int | None:
     """Veritabanına yeni bir Tamir nesnesi ekler ve yeni kaydın ID'sini döndürür."""
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        sql = """INSERT INTO tamirler (
-                    musteri_ad_soyad, musteri_telefon, urun_aciklamasi, hasar_tespiti,
-                    alinan_tarih, tahmini_teslim_tarihi, tamir_ucreti, durum, notlar
-                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
-
-        alinan_tarih_str = tamir.alinan_tarih.strftime('%Y-%m-%d') if tamir.alinan_tarih else None
-        teslim_tarihi_str = tamir.tahmini_teslim_tarihi.strftime('%Y-%m-%d') if tamir.tahmini_teslim_tarihi else None
-
-        cursor.execute(sql, (
-            tamir.musteri_ad_soyad, tamir.musteri_telefon, tamir.urun_aciklamasi,
-            tamir.hasar_tespiti, alinan_tarih_str, teslim_tarihi_str,
-            tamir.tamir_ucreti, tamir.durum, tamir.notlar
-        ))
-        conn.commit()
+    try:
+        with pooled_connection() as conn:
+            sql = """INSERT INTO tamirler (
+                        musteri_ad_soyad, musteri_telefon, urun_aciklamasi, hasar_tespiti,
+                        alinan_tarih, tahmini_teslim_tarihi, tamir_ucreti, durum, notlar
+                     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+            alinan_tarih_str = tamir.alinan_tarih.strftime('%Y-%m-%d') if tamir.alinan_tarih else None
+            teslim_tarihi_str = tamir.tahmini_teslim_tarihi.strftime('%Y-%m-%d') if tamir.tahmini_teslim_tarihi else None
+
+            cursor = conn.execute(sql, (
+                tamir.musteri_ad_soyad, tamir.musteri_telefon, tamir.urun_aciklamasi,
+                tamir.hasar_tespiti, alinan_tarih_str, teslim_tarihi_str,
+                tamir.tamir_ucreti, tamir.durum, tamir.notlar
+            ))
+            _record_change(data_changes.REPAIR_CHANGED, cursor.lastrowid)
         print(f"Başarılı: Yeni tamir kaydı eklendi (ID: {cursor.lastrowid})")
         return cursor.lastrowid
     except sqlite3.Error as e:
         print(f"Veritabanı hatası (add_tamir): {e}")
         return None
-    finally:
-        if conn:
-            conn.close()
 
 
+@traced
 def get_all_tamirler() -> list[Tamir]:
     """Veritabanındaki tüm tamir kayıtlarını getirir."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM tamirler ORDER BY alinan_tarih DESC, id DESC")
-    rows = cursor.fetchall()
-    conn.close()
-
-    tamirler = []
-    for row in rows:
-        tamirler.append(Tamir(
-            id=row['id'],
-            musteri_ad_soyad=row['musteri_ad_soyad'],
-            musteri_telefon=row['musteri_telefon'],
-            urun_aciklamasi=row['urun_aciklamasi'],
-            hasar_tespiti=row['hasar_tespiti'],
-            alinan_tarih=datetime.strptime(row['alinan_tarih'], '%Y-%m-%d').date() if row['alinan_tarih'] else None,
-            tahmini_teslim_tarihi=datetime.strptime(row['tahmini_teslim_tarihi'], '%Y-%m-%d').date() if row[
-                'tahmini_teslim_tarihi'] else None,
-            tamir_ucreti=row['tamir_ucreti'],
-            durum=row['durum'],
-            notlar=row['notlar']
-        ))
-    return tamirler
+    try:
+        with pooled_connection() as conn:
+            return _fetch_models(conn, Tamir, f"SELECT {_TAMIR_SELECT} FROM tamirler ORDER BY alinan_tarih DESC, id DESC")
+    except sqlite3.Error as e:
+        print(f"Tamir kayıtları getirilirken hata: {e}")
+        return []
 
 
+@traced
 def update_tamir(tamir: Tamir) -> bool:
     """Mevcut bir tamir kaydını günceller."""
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        sql = """UPDATE tamirler SET
-                    musteri_ad_soyad = ?, musteri_telefon = ?, urun_aciklamasi = ?, 
-                    hasar_tespiti = ?, alinan_tarih = ?, tahmini_teslim_tarihi = ?, 
-                    tamir_ucreti = ?, durum = ?, notlar = ?
-                 WHERE id = ?"""
-
-        alinan_tarih_str = tamir.alinan_tarih.strftime('%Y-%m-%d') if tamir.alinan_tarih else None
-        teslim_tarihi_str = tamir.tahmini_teslim_tarihi.strftime('%Y-%m-%d') if tamir.tahmini_teslim_tarihi else None
-
-        cursor.execute(sql, (
-            tamir.musteri_ad_soyad, tamir.musteri_telefon, tamir.urun_aciklamasi,
-            tamir.hasar_tespiti, alinan_tarih_str, teslim_tarihi_str,
-            tamir.tamir_ucreti, tamir.durum, tamir.notlar, tamir.id
-        ))
-        conn.commit()
+    try:
+        with pooled_connection() as conn:
+            sql = """UPDATE tamirler SET
+                        musteri_ad_soyad = ?, musteri_telefon = ?, urun_aciklamasi = ?, 
+                        hasar_tespiti = ?, alinan_tarih = ?, tahmini_teslim_tarihi = ?, 
+                        tamir_ucreti = ?, durum = ?, notlar = ?
+                     WHERE id = ?"""
+
+            alinan_tarih_str = tamir.alinan_tarih.strftime('%Y-%m-%d') if tamir.alinan_tarih else None
+            teslim_tarihi_str = tamir.tahmini_teslim_tarihi.strftime('%Y-%m-%d') if tamir.tahmini_teslim_tarihi else None
+
+            conn.execute(sql, (
+                tamir.musteri_ad_soyad, tamir.musteri_telefon, tamir.urun_aciklamasi,
+                tamir.hasar_tespiti, alinan_tarih_str, teslim_tarihi_str,
+                tamir.tamir_ucreti, tamir.durum, tamir.notlar, tamir.id
+            ))
+            _record_change(data_changes.REPAIR_CHANGED, tamir.id)
         print(f"Başarılı: Tamir kaydı güncellendi (ID: {tamir.id})")
         return True
     except sqlite3.Error as e:
         print(f"Veritabanı hatası (update_tamir): {e}")
         return False
-    finally:
-        if conn:
-            conn.close()
 
 
+@traced
 def delete_tamir(tamir_id: int) -> bool:
     """Verilen ID'ye sahip tamir kaydını siler."""
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM tamirler WHERE id = ?", (tamir_id,))
-        conn.commit()
+        with pooled_connection() as conn:
+            conn.execute("DELETE FROM tamirler WHERE id = ?", (tamir_id,))
+            _record_change(data_changes.REPAIR_CHANGED, tamir_id)
         print(f"Başarılı: Tamir kaydı silindi (ID: {tamir_id})")
         return True
     except sqlite3.Error as e:
         print(f"Veritabanı hatası (delete_tamir): {e}")
         return False
-    finally:
-        if conn:
-            conn.close()
 
 
-def search_repairs(search_term: str) -> list[Tamir]:
-    """Müşteri adı veya ürün açıklamasına göre tamir kayıtlarını arar."""
-    all_repairs = get_all_tamirler()
-    if not search_term:
-        return all_repairs
+def _repair_search_sql(search_term: str) -> tuple[str, tuple]:
+    """
+    Arama terimine uyan tamir ID'lerini seçen SQL'i ve parametrelerini üretir.
+    Metin alanları FTS5 indeksinde, telefon ise rakamlara indirgenip önek olarak aranır.
+    """
+    term = _tr_fold(search_term.strip())
+    if len(term) >= 3:
+        queries = ["SELECT rowid FROM tamirler_fts WHERE tamirler_fts MATCH ?"]
+        params = ['"' + term.replace('"', '""') + '"']
+    else:
+        pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        queries = ["""SELECT rowid FROM tamirler_fts
+                      WHERE musteri_ad_soyad LIKE ?1 ESCAPE '\\' OR urun_aciklamasi LIKE ?1 ESCAPE '\\'
+                         OR hasar_tespiti LIKE ?1 ESCAPE '\\' OR notlar LIKE ?1 ESCAPE '\\'"""]
+        params = [pattern]
+
+    # Terim bir telefon numarası gibi görünüyorsa (rakam ve ayraçlardan oluşuyorsa) önek araması ekle
+    digits = ''.join(ch for ch in term if ch.isdigit())
+    if digits and all(ch.isdigit() or ch in ' -().+/' for ch in term):
+        upper_bound = digits[:-1] + chr(ord(digits[-1]) + 1)
+        queries.append(f"SELECT id FROM tamirler WHERE telefon_rakam >= ?{len(params) + 1} AND telefon_rakam < ?{len(params) + 2}")
+        params += [digits, upper_bound]
+
+    return " UNION ".join(queries), tuple(params)
+
+
+@traced
+def search_repair_ids(search_term: str) -> set[int]:
+    """
+    Müşteri adı, telefon (rakam öneki), ürün, hasar tespiti ve notlar üzerinde arama
+    yapar ve yalnızca eşleşen tamir kayıtlarının ID'lerini döndürür.
+    """
+    sql, params = _repair_search_sql(search_term)
+    try:
+        with pooled_connection() as conn:
+            return {row[0] for row in conn.execute(sql, params)}
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (search_repair_ids): {e}")
+        return set()
 
-    search_term_lower = search_term.lower()
-    filtered_list = []
-    for tamir in all_repairs:
-        musteri_lower = tamir.musteri_ad_soyad.lower()
-        urun_lower = tamir.urun_aciklamasi.lower()
 
-        if search_term_lower in musteri_lower or search_term_lower in urun_lower:
-            filtered_list.append(tamir)
+@traced
+def search_repairs(search_term: str) -> list[Tamir]:
+    """Müşteri, telefon, ürün, hasar veya notlara göre tamir kayıtlarını arar."""
+    if not search_term or not search_term.strip():
+        return get_all_tamirler()
 
-    return filtered_list
\ No newline at end of file
+    sql, params = _repair_search_sql(search_term)
+    try:
+        with pooled_connection() as conn:
+            return _fetch_models(
+                conn, Tamir,
+                f"SELECT {_TAMIR_SELECT} FROM tamirler WHERE id IN ({sql}) ORDER BY alinan_tarih DESC, id DESC", params
+            )
+    except sqlite3.Error as e:
+        print(f"Veritabanı hatası (search_repairs): {e}")
+        return []
@@ -0,0 +1,114 @@
+# MIT License
+# Copyright (c) 2025 Aykut Yahya Ay
+# See LICENSE file for full license details.
+
+"""
+app.database fonksiyonlarının asyncio uyumlu (await edilebilir) sürümleri.
+
+Okumalar küçük bir okuyucu thread havuzunda, yazmalar ise tek bir yazıcı thread'de
+çalışır. Her thread veritabanı havuzundaki kendi bağlantısını kullanır; WAL modunda
+okuyucular yazıcıyı beklemez, yazmalar ise tek thread'de sıraya girdiği için
+birbiriyle kilit yarışına girmez ve geliş sırasıyla uygulanır.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import database
+
+READER_THREADS = 2
+
+_executor_lock = threading.Lock()
+_reader_executor = None
+_writer_executor = None
+
+
+def _get_executors() -> tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+    """Okuyucu ve yazıcı executor'larını döndürür, yoksa başlatır."""
+    global _reader_executor, _writer_executor
+    with _executor_lock:
+        if _reader_executor is None:
+            _reader_executor = ThreadPoolExecutor(READER_THREADS, thread_name_prefix="StokGoldDbReader")
+            _writer_executor = ThreadPoolExecutor(1, thread_name_prefix="StokGoldDbWriter")
+        return _reader_executor, _writer_executor
+
+
+async def run_read(fn, *args, **kwargs):
+    """Senkron bir okuma fonksiyonunu okuyucu thread'lerinden birinde çalıştırıp sonucunu bekler."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executors()[0], functools.partial(fn, *args, **kwargs))
+
+
+async def run_write(fn, *args, **kwargs):
+    """Senkron bir yazma fonksiyonunu tek yazıcı thread'de, sırasıyla çalıştırıp sonucunu bekler."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executors()[1], functools.partial(fn, *args, **kwargs))
+
+
+def _reader(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_read(fn, *args, **kwargs)
+    return wrapper
+
+
+def _writer(fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_write(fn, *args, **kwargs)
+    return wrapper
+
+
+def shutdown():
+    """
+    Bekleyen işleri bitirip executor thread'lerini durdurur. Thread'lerin açtığı
+    bağlantılar database.close_all() ile kapatılır.
+    """
+    global _reader_executor, _writer_executor
+    with _executor_lock:
+        executors = (_reader_executor, _writer_executor)
+        _reader_executor = _writer_executor = None
+    for executor in executors:
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# --- Okuma ---
+get_all_products = _reader(database.get_all_products)
+get_products_page = _reader(database.get_products_page)
+search_products = _reader(database.search_products)
+get_total_inventory_value = _reader(database.get_total_inventory_value)
+get_product_counts_by_type = _reader(database.get_product_counts_by_type)
+get_total_grams = _reader(database.get_total_grams)
+get_low_stock_products = _reader(database.get_low_stock_products)
+get_product_variety_count = _reader(database.get_product_variety_count)
+get_latest_products = _reader(database.get_latest_products)
+get_dashboard_snapshot = _reader(database.get_dashboard_snapshot)
+get_top_profitable_products = _reader(database.get_top_profitable_products)
+get_best_selling_products = _reader(database.get_best_selling_products)
+get_daily_summary = _reader(database.get_daily_summary)
+get_summaries_for_range = _reader(database.get_summaries_for_range)
+get_transactions_for_date = _reader(database.get_transactions_for_date)
+get_statistics_for_period = _reader(database.get_statistics_for_period)
+get_all_tamirler = _reader(database.get_all_tamirler)
+search_repairs = _reader(database.search_repairs)
+search_repair_ids = _reader(database.search_repair_ids)
+get_archived_years = _reader(database.get_archived_years)
+get_archivable_years = _reader(database.get_archivable_years)
+
+# --- Yazma ---
+add_product = _writer(database.add_product)
+add_products_bulk = _writer(database.add_products_bulk)
+update_product = _writer(database.update_product)
+delete_product = _writer(database.delete_product)
+update_stock = _writer(database.update_stock)
+log_transaction = _writer(database.log_transaction)
+record_movement = _writer(database.record_movement)
+add_tamir = _writer(database.add_tamir)
+update_tamir = _writer(database.update_tamir)
+delete_tamir = _writer(database.delete_tamir)
+rebuild_daily_rollup = _writer(database.rebuild_daily_rollup)
+rebuild_inventory_totals = _writer(database.rebuild_inventory_totals)
+archive_year = _writer(database.archive_year)
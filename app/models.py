@@ -6,7 +6,10 @@ from dataclasses import dataclass, field
 from datetime import date
 from typing import Optional # Optional'ı import et
 
-@dataclass
+# min_stok girilmemiş ürünler stok bu değere (dahil) indiğinde kritik sayılır
+DEFAULT_MIN_STOK = 4
+
+@dataclass(slots=True)
 class Urun:
 
     id: int = None
@@ -21,6 +24,8 @@ class Urun:
     aciklama: str = ""
     resim_yolu: str = None
     eklenme_tarihi: date = field(default_factory=date.today)
+    # Ürüne özel kritik stok eşiği; None ise DEFAULT_MIN_STOK kullanılır
+    min_stok: Optional[int] = None
 
     def __post_init__(self):
 
@@ -28,3 +33,28 @@ class Urun:
             raise ValueError("Gram değeri pozitif bir sayı olmalıdır.")
         if not isinstance(self.stok_adeti, int) or self.stok_adeti < 0:
             raise ValueError("Stok adeti pozitif bir tam sayı olmalıdır.")
+        if self.min_stok is not None and (not isinstance(self.min_stok, int) or self.min_stok < 0):
+            raise ValueError("Minimum stok pozitif bir tam sayı olmalıdır.")
+
+    @property
+    def kritik_esik(self) -> int:
+        """Bu ürünün kritik stok eşiği (stok bu değere indiğinde kritik sayılır)."""
+        return self.min_stok if self.min_stok is not None else DEFAULT_MIN_STOK
+
+    @classmethod
+    def from_db_row(cls, row: tuple) -> "Urun":
+        """
+        Veritabanından gelen, URUN_COLUMNS sırasındaki satırdan doğrulama yapmadan
+        Urun oluşturur. Veriler zaten uygulamanın kendi yazdığı kayıtlar olduğu için
+        __init__/__post_init__ atlanır; kullanıcı girdisi için normal kurucu kullanılmalıdır.
+        """
+        urun = object.__new__(cls)
+        (urun.id, urun.urun_kodu, urun.cins, urun.ayar, urun.gram, urun.maliyet,
+         urun.satis_fiyati, urun.stok_adeti, urun.aciklama, urun.resim_yolu, eklenme_tarihi, urun.min_stok) = row
+        urun.eklenme_tarihi = date.fromisoformat(eklenme_tarihi) if eklenme_tarihi else None
+        return urun
+
+
+# from_db_row'un beklediği sütun sırası
+URUN_COLUMNS = ('id', 'urun_kodu', 'cins', 'ayar', 'gram', 'maliyet', 'satis_fiyati',
+                'stok_adeti', 'aciklama', 'resim_yolu', 'eklenme_tarihi', 'min_stok')
@@ -0,0 +1,241 @@
+# MIT License
+# Copyright (c) 2025 Aykut Yahya Ay
+# See LICENSE file for full license details.
+
+import bisect
+import threading
+
+from . import data_changes, database
+from .database import _tr_fold
+from .models import Urun
+
+
+class ProductRepository:
+    """
+    Uygulama genelinde paylaşılan, bellekteki tek ürün kümesi.
+
+    Ürünler tüm kümeye ihtiyaç duyan ilk okumada (all, get, count) bir kez veritabanından
+    yüklenir; sonra id ve urun_kodu indeksleri üzerinden bellekten okunur. Küme henüz
+    yüklenmemişken page ve search tamamını yüklemez, veritabanının keyset sayfalamasını ve
+    FTS5 aramasını kullanır; açılışta ilk sayfa tüm katalog okunmadan gelir. Depo data_changes aboneliğiyle güncel tutulur:
+    hangi yoldan yapılırsa yapılsın (bu sınıf, yazma kuyruğu, database_async) her commit'te
+    etkilenen kayıtlar eskimiş olarak işaretlenir ve bir sonraki okumada, okuyan thread'de
+    yeniden okunur; bildirim commit eden thread'de (arayüz ya da yazma kuyruğu) sorgu
+    çalıştırmaz. Dış değişiklikte tüm küme geçersiz kılınır.
+
+    Döndürülen Urun nesneleri paylaşılır ve değiştirilmemelidir; bir kayıt güncellendiğinde
+    bellekteki nesne yerinde değiştirilmez, yenisiyle değiştirilir.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._by_id = {}
+        self._by_kod = {}
+        # Arama için Türkçe katlanmış "kod \n cins \n açıklama" metni
+        self._search_text = {}
+        # Yeni eklenen en üstte: -id'ye göre artan sırada tutulur (bisect için)
+        self._neg_ids = []
+        self._order_dirty = False
+        # Commit edilmiş ama henüz yeniden okunmamış kayıtların ID'leri
+        self._stale_ids = set()
+        # Her bildirimde artar; yükleme sürerken gelen bir değişiklik yüklemeyi tekrarlatır
+        self._change_count = 0
+        data_changes.subscribe(self._on_data_changed)
+
+    # --- Yükleme ve önbellek yönetimi ---
+    def _ensure_loaded(self):
+        while not self._loaded:
+            change_count = self._change_count
+            urunler = database.get_all_products()
+            with self._lock:
+                if self._loaded:
+                    return
+                if self._change_count != change_count:
+                    continue
+                self._fill(urunler)
+        if self._stale_ids:
+            with self._lock:
+                stale_ids, self._stale_ids = self._stale_ids, set()
+            if stale_ids:
+                self._refresh(stale_ids)
+
+    def _fill(self, urunler: list[Urun]):
+        self._by_id.clear()
+        self._by_kod.clear()
+        self._search_text.clear()
+        self._stale_ids.clear()
+        for urun in urunler:
+            self._put(urun)
+        self._order_dirty = True
+        self._loaded = True
+
+    def _put(self, urun: Urun):
+        previous = self._by_id.get(urun.id)
+        if previous is not None and self._by_kod.get(previous.urun_kodu) is previous:
+            del self._by_kod[previous.urun_kodu]
+        self._by_id[urun.id] = urun
+        self._by_kod[urun.urun_kodu] = urun
+        self._search_text[urun.id] = _tr_fold("\n".join((urun.urun_kodu or "", urun.cins or "", urun.aciklama or "")))
+        if previous is None:
+            self._order_dirty = True
+
+    def _remove(self, urun_id: int):
+        urun = self._by_id.pop(urun_id, None)
+        if urun is None:
+            return
+        if self._by_kod.get(urun.urun_kodu) is urun:
+            del self._by_kod[urun.urun_kodu]
+        self._search_text.pop(urun_id, None)
+        self._order_dirty = True
+
+    def _ordered_ids(self) -> list[int]:
+        if self._order_dirty:
+            self._neg_ids = sorted(-urun_id for urun_id in self._by_id)
+            self._order_dirty = False
+        return self._neg_ids
+
+    def _refresh(self, product_ids):
+        """Verilen kayıtları veritabanından yeniden okur; artık olmayanları bellekten çıkarır."""
+        product_ids = list(product_ids)
+        change_count = self._change_count
+        urunler = database.get_products_by_ids(product_ids)
+        if urunler is None:
+            # Okunamadıysa bellekteki kopyaya güvenilmez; sonraki okumada tamamı yüklenir
+            self.invalidate()
+            return
+        with self._lock:
+            if not self._loaded:
+                return
+            found = set()
+            for urun in urunler:
+                self._put(urun)
+                found.add(urun.id)
+            for urun_id in product_ids:
+                if urun_id not in found:
+                    self._remove(urun_id)
+            # Okuma sürerken yeni commit geldiyse okunan kopya ondan eski olabilir;
+            # kayıtlar bir sonraki okumada tekrar okunur
+            if self._change_count != change_count:
+                self._stale_ids.update(product_ids)
+
+    def invalidate(self, product_ids=None):
+        """
+        Bellekteki kopyayı geçersiz kılar. ID verilirse yalnızca o kayıtlar, verilmezse
+        tüm küme bir sonraki okumada veritabanından yeniden okunur.
+        """
+        with self._lock:
+            if product_ids is None:
+                self._loaded = False
+            elif self._loaded:
+                self._stale_ids.update(product_ids)
+
+    def _on_data_changed(self, changes: dict):
+        # Commit eden thread'de çağrılır; silinenler bellekten çıkarılır, diğerleri yalnızca işaretlenir
+        deleted = changes.get(data_changes.PRODUCT_DELETED, set())
+        changed = (changes.get(data_changes.PRODUCT_UPSERTED, set())
+                   | changes.get(data_changes.MOVEMENT_LOGGED, set())) - deleted
+        with self._lock:
+            self._change_count += 1
+            if data_changes.EXTERNAL_CHANGE in changes:
+                self._loaded = False
+            if not self._loaded:
+                return
+            for urun_id in deleted:
+                self._remove(urun_id)
+            self._stale_ids -= deleted
+            self._stale_ids |= changed
+
+    # --- Okuma ---
+    def all(self) -> list[Urun]:
+        """Tüm ürünleri, en son eklenen en üstte olacak şekilde döndürür."""
+        self._ensure_loaded()
+        with self._lock:
+            return [self._by_id[-neg_id] for neg_id in self._ordered_ids()]
+
+    def get(self, urun_id: int) -> Urun | None:
+        self._ensure_loaded()
+        with self._lock:
+            return self._by_id.get(urun_id)
+
+    def get_by_kod(self, urun_kodu: str) -> Urun | None:
+        self._ensure_loaded()
+        with self._lock:
+            return self._by_kod.get(urun_kodu)
+
+    def count(self) -> int:
+        self._ensure_loaded()
+        with self._lock:
+            return len(self._by_id)
+
+    def page(self, after_key: tuple = None, limit: int = 100) -> tuple[list[Urun], tuple | None]:
+        """
+        database.get_products_page(sort='-id') ile aynı sözleşme: (ürünler, sonraki anahtar);
+        anahtar (son_id,) biçimindedir ve son sayfada None olur. Küme yüklenmemişse sayfa
+        doğrudan veritabanından okunur; anahtarlar iki yolda da aynıdır.
+        """
+        if not self._loaded:
+            return database.get_products_page(after_key=after_key, limit=limit)
+        self._ensure_loaded()
+        with self._lock:
+            neg_ids = self._ordered_ids()
+            start = bisect.bisect_right(neg_ids, -after_key[-1]) if after_key is not None else 0
+            window = neg_ids[start:start + limit + 1]
+            urunler = [self._by_id[-neg_id] for neg_id in window[:limit]]
+        next_key = (urunler[-1].id,) if len(window) > limit else None
+        return urunler, next_key
+
+    def search(self, search_term: str, limit: int = database.SEARCH_RESULT_LIMIT) -> list[Urun]:
+        """
+        Ürün kodu, cins veya açıklamasında terimi (Türkçe büyük/küçük harf duyarsız)
+        içeren ürünleri, en yeniler önce olacak şekilde döndürür. Küme yüklenmemişse
+        database.search_products'ın FTS5 araması kullanılır; sonuçlar alakaya göre sıralanır.
+        """
+        term = _tr_fold(search_term.strip())
+        if not self._loaded:
+            if not term:
+                return self.page(limit=limit)[0]
+            return database.search_products(search_term, limit)
+        if not term:
+            return self.all()[:limit]
+        self._ensure_loaded()
+        results = []
+        with self._lock:
+            search_text = self._search_text
+            for neg_id in self._ordered_ids():
+                if term in search_text[-neg_id]:
+                    results.append(self._by_id[-neg_id])
+                    if len(results) >= limit:
+                        break
+        return results
+
+    # --- Yazma ---
+    # Bellekteki kopya commit sonrası _on_data_changed ile güncellenir; bu metotlar
+    # sayfaların tek bir nesne üzerinden çalışabilmesi içindir.
+    def add(self, urun: Urun, log_opening: bool = False) -> int | None:
+        return database.add_product(urun, log_opening)
+
+    def add_bulk(self, urunler) -> tuple[list[int], list[tuple[int, str, str]]]:
+        return database.add_products_bulk(urunler)
+
+    def update(self, urun: Urun) -> bool:
+        return database.update_product(urun)
+
+    def delete(self, urun_id: int) -> bool:
+        return database.delete_product(urun_id)
+
+    def record_movement(self, urun_id: int, tip: str, adet: int, birim_fiyat: float) -> int | None:
+        return database.record_movement(urun_id, tip, adet, birim_fiyat)
+
+
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def get_product_repository() -> ProductRepository:
+    """Uygulama genelinde paylaşılan ürün deposunu döndürür."""
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = ProductRepository()
+        return _repository
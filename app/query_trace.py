@@ -0,0 +1,207 @@
+# MIT License
+# Copyright (c) 2025 Aykut Yahya Ay
+# See LICENSE file for full license details.
+
+"""
+İsteğe bağlı sorgu izleme.
+
+Açıkken (config.ini [Tracing] enabled = true ya da database.set_query_tracing(True))
+@traced ile işaretli her veritabanı fonksiyonunun süresi ve döndürdüğü satır sayısı
+toplanır. slow_ms eşiğini aşan çağrılar, o çağrı sırasında çalışan SQL ifadeleri ve
+bunların EXPLAIN QUERY PLAN çıktısıyla birlikte dönen bir günlük dosyasına yazılır.
+Kapalıyken fonksiyon başına tek bir bayrak kontrolü dışında ek maliyet yoktur.
+"""
+
+import configparser
+import functools
+import logging
+import os
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from .utils import APP_DATA_PATH, CONFIG_PATH, get_base_path
+
+DEFAULT_SLOW_MS = 100
+SLOW_QUERY_LOG_PATH = os.path.join(APP_DATA_PATH, "slow_queries.log")
+SLOW_QUERY_LOG_MAX_BYTES = 1_000_000
+SLOW_QUERY_LOG_BACKUPS = 3
+
+# Trigger içi ifadeler ("-- TRIGGER ...") ve işlem kontrol komutları plana dahil edilmez
+_EXPLAINABLE_PREFIXES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+# FTS5'in kendi gölge tablolarına attığı iç sorgular şemayı tırnaklı yazar ('main'.'...');
+# uygulamanın kendi SQL'i bu biçimi kullanmaz
+_INTERNAL_STATEMENT_MARKER = "'main'."
+
+_enabled = False
+_slow_ms = DEFAULT_SLOW_MS
+_stats_lock = threading.Lock()
+_stats = {}
+_local = threading.local()
+_logger = None
+
+
+def load_tracing_config() -> tuple[bool, float]:
+    """config.ini'deki [Tracing] bölümünden (enabled, slow_ms) değerlerini okur."""
+    parser = configparser.ConfigParser()
+    parser.read([os.path.join(get_base_path(), "config.ini"), CONFIG_PATH], encoding="utf-8")
+    enabled = parser.getboolean("Tracing", "enabled", fallback=False)
+    slow_ms = parser.getfloat("Tracing", "slow_ms", fallback=DEFAULT_SLOW_MS)
+    return enabled, slow_ms
+
+
+def configure(enabled: bool, slow_ms: float = None):
+    """
+    İzlemeyi açar/kapatır. SQL ifadelerini yakalayan trace callback bağlantı açılırken
+    kurulduğundan, çalışan bir uygulamada database.set_query_tracing() kullanılmalıdır.
+    """
+    global _enabled, _slow_ms
+    _enabled = enabled
+    if slow_ms is not None:
+        _slow_ms = slow_ms
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def statement_hook(sql: str):
+    """sqlite3 trace callback'i: izlenen bir çağrı sürerken çalışan SQL ifadelerini kaydeder."""
+    frames = getattr(_local, 'frames', None)
+    if frames:
+        for statements in frames:
+            statements.append(sql)
+
+
+def _count_rows(result) -> int:
+    if result is None or result is False:
+        return 0
+    # get_products_page gibi (satırlar, sonraki_anahtar) döndüren fonksiyonlar
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return len(result[0])
+    if isinstance(result, (list, set, dict)):
+        return len(result)
+    return 1
+
+
+def _get_logger() -> logging.Logger:
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger("stokgold.slow_queries")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = RotatingFileHandler(SLOW_QUERY_LOG_PATH, maxBytes=SLOW_QUERY_LOG_MAX_BYTES,
+                                      backupCount=SLOW_QUERY_LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+
+def _explain(statements: list) -> list[tuple[str, list[str]]]:
+    """Her ifade için EXPLAIN QUERY PLAN satırlarını döndürür."""
+    # database bu modülü import ettiği için burada geç import edilir
+    from .database import pooled_connection
+
+    plans = []
+    seen = set()
+    with pooled_connection() as conn:
+        for sql in statements:
+            sql = sql.strip()
+            if (sql in seen or not sql.upper().startswith(_EXPLAINABLE_PREFIXES)
+                    or _INTERNAL_STATEMENT_MARKER in sql):
+                continue
+            seen.add(sql)
+            try:
+                rows = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+                plans.append((sql, [row[3] for row in rows]))
+            except Exception as e:
+                plans.append((sql, [f"(plan alınamadı: {e})"]))
+    return plans
+
+
+def _record(name: str, elapsed_ms: float, rows: int, plans: list = None):
+    with _stats_lock:
+        entry = _stats.get(name)
+        if entry is None:
+            entry = _stats[name] = {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0,
+                                    'slow_calls': 0, 'full_scans': 0, 'last_slow_plan': None}
+        entry['calls'] += 1
+        entry['total_ms'] += elapsed_ms
+        entry['rows'] += rows
+        if elapsed_ms > entry['max_ms']:
+            entry['max_ms'] = elapsed_ms
+        if plans is not None:
+            entry['slow_calls'] += 1
+            entry['last_slow_plan'] = plans
+            if any(_is_full_scan(detail) for _, details in plans for detail in details):
+                entry['full_scans'] += 1
+
+
+def _is_full_scan(detail: str) -> bool:
+    # "SCAN urunler" tam tarama, "SCAN urunler USING INDEX ..." ise indeks üzerinden gezinmedir
+    return detail.startswith("SCAN ") and " USING " not in detail and "VIRTUAL TABLE" not in detail
+
+
+def _log_slow_call(name: str, elapsed_ms: float, rows: int, plans: list):
+    lines = [f"YAVAŞ {name}: {elapsed_ms:.1f} ms, {rows} satır"]
+    for sql, details in plans:
+        marker = "  [TAM TARAMA]" if any(_is_full_scan(d) for d in details) else ""
+        lines.append(f"  SQL: {' '.join(sql.split())}{marker}")
+        lines.extend(f"    {detail}" for detail in details)
+    try:
+        _get_logger().info("\n".join(lines))
+    except OSError as e:
+        print(f"Yavaş sorgu günlüğü yazılamadı: {e}")
+
+
+def traced(fn):
+    """Veritabanı fonksiyonunu izleme açıkken süre, satır sayısı ve yavaşsa plan kaydıyla sarar."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return fn(*args, **kwargs)
+
+        frames = getattr(_local, 'frames', None)
+        if frames is None:
+            frames = _local.frames = []
+        statements = []
+        frames.append(statements)
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            frames.pop()
+
+        rows = _count_rows(result)
+        if elapsed_ms >= _slow_ms and not frames:
+            # Plan yalnızca en dıştaki çağrı için alınır; iç içe çağrının ifadeleri zaten dahildir
+            plans = _explain(statements)
+            _record(name, elapsed_ms, rows, plans)
+            _log_slow_call(name, elapsed_ms, rows, plans)
+        else:
+            _record(name, elapsed_ms, rows)
+        return result
+
+    return wrapper
+
+
+def get_query_stats() -> list[dict]:
+    """Fonksiyon bazında toplanmış istatistikleri toplam süreye göre azalan sırada döndürür."""
+    with _stats_lock:
+        snapshot = [dict(entry, name=name) for name, entry in _stats.items()]
+    for entry in snapshot:
+        entry['avg_ms'] = entry['total_ms'] / entry['calls']
+    snapshot.sort(key=lambda e: e['total_ms'], reverse=True)
+    return snapshot
+
+
+def reset_query_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+configure(*load_tracing_config())
@@ -6,7 +6,7 @@ from dataclasses import dataclass, field
 from datetime import date
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class Tamir:
     """
     Bir tamir kaydını temsil eden veri sınıfı.
@@ -20,4 +20,23 @@ class Tamir:
     tahmini_teslim_tarihi: Optional[date] = None
     tamir_ucreti: Optional[float] = None
     durum: str = "Beklemede"
-    notlar: Optional[str] = None
\ No newline at end of file
+    notlar: Optional[str] = None
+
+    @classmethod
+    def from_db_row(cls, row: tuple) -> "Tamir":
+        """
+        Veritabanından gelen, TAMIR_COLUMNS sırasındaki satırdan Tamir oluşturur.
+        Tarihler date.fromisoformat ile çevrilir ve __init__ atlanır.
+        """
+        tamir = object.__new__(cls)
+        (tamir.id, tamir.musteri_ad_soyad, tamir.musteri_telefon, tamir.urun_aciklamasi,
+         tamir.hasar_tespiti, alinan_tarih, tahmini_teslim_tarihi, tamir.tamir_ucreti,
+         tamir.durum, tamir.notlar) = row
+        tamir.alinan_tarih = date.fromisoformat(alinan_tarih) if alinan_tarih else None
+        tamir.tahmini_teslim_tarihi = date.fromisoformat(tahmini_teslim_tarihi) if tahmini_teslim_tarihi else None
+        return tamir
+
+
+# from_db_row'un beklediği sütun sırası
+TAMIR_COLUMNS = ('id', 'musteri_ad_soyad', 'musteri_telefon', 'urun_aciklamasi', 'hasar_tespiti',
+                 'alinan_tarih', 'tahmini_teslim_tarihi', 'tamir_ucreti', 'durum', 'notlar')
\ No newline at end of file
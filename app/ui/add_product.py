@@ -11,7 +11,7 @@ from PySide6.QtWidgets import (
     QDialogButtonBox, QSpinBox, QHBoxLayout, QLabel, QFileDialog
 )
 from PySide6.QtGui import QDoubleValidator
-from app.models import Urun
+from app.models import Urun, DEFAULT_MIN_STOK
 from datetime import date
 import barcode
 from barcode.writer import ImageWriter
@@ -53,12 +53,20 @@ class AddProductDialog(QDialog):
         self.stok_adeti_input.setMaximum(99999)
         self.stok_adeti_input.setValue(1)
 
+        # En küçük değer (-1) "eşik girilmedi" anlamına gelir; 0 geçerli bir eşiktir
+        self.min_stok_input = QSpinBox()
+        self.min_stok_input.setRange(-1, 99999)
+        self.min_stok_input.setSpecialValueText(f"Varsayılan ({DEFAULT_MIN_STOK})")
+        self.min_stok_input.setValue(-1)
+        self.min_stok_input.setToolTip("Stok bu değere indiğinde ürün kritik stok listesine girer.")
+
         form_layout.addRow("Ürün Kodu:", self.urun_kodu_input)
         form_layout.addRow("Cins:", self.cins_input)
         form_layout.addRow("Ayar:", self.ayar_input)
         form_layout.addRow("Gram:", self.gram_input)
         form_layout.addRow("Maliyet (TL):", self.maliyet_input)
         form_layout.addRow("Stok Adeti:", self.stok_adeti_input)
+        form_layout.addRow("Kritik Stok Eşiği:", self.min_stok_input)
 
         image_layout = QHBoxLayout()
         self.image_path_label = QLabel("Resim Seçilmedi")
@@ -98,6 +106,8 @@ class AddProductDialog(QDialog):
         self.cins_input.setText(self.urun_to_edit.cins)
         self.ayar_input.setValue(self.urun_to_edit.ayar)
         self.stok_adeti_input.setValue(self.urun_to_edit.stok_adeti)
+        if self.urun_to_edit.min_stok is not None:
+            self.min_stok_input.setValue(self.urun_to_edit.min_stok)
 
         gram_degeri = self.urun_to_edit.gram
         self.gram_input.setText(str(gram_degeri).replace('.', ',') if gram_degeri is not None else "")
@@ -128,6 +138,7 @@ class AddProductDialog(QDialog):
         urun.cins = self.cins_input.text()
         urun.ayar = self.ayar_input.value()
         urun.stok_adeti = self.stok_adeti_input.value()
+        urun.min_stok = self.min_stok_input.value() if self.min_stok_input.value() >= 0 else None
 
         gram_text = self.gram_input.text().strip().replace(',', '.')
         urun.gram = float(gram_text) if gram_text else None
@@ -11,6 +11,7 @@ from PySide6.QtGui import QStandardItemModel, QStandardItem, QFont
 from PySide6.QtCore import Qt
 
 from app.database import get_transactions_for_date
+from .query_runner import QueryRunner
 
 
 class DailyDetailDialog(QDialog):
@@ -71,6 +72,7 @@ class DailyDetailDialog(QDialog):
     def __init__(self, selected_date, parent=None):
         super().__init__(parent)
         self.selected_date = selected_date
+        self.query_runner = QueryRunner(self)
 
         self.setWindowTitle("Günlük İşlem Detayları")
         self.setMinimumSize(900, 650)
@@ -137,10 +139,13 @@ class DailyDetailDialog(QDialog):
         return frame
 
     def _load_details(self):
-        """Veritabanından o günün işlemlerini çeker, tabloları ve özet alanını doldurur."""
+        """O günün işlemlerini arka planda çeker; tablolar sonuç gelince doldurulur."""
         date_str = self.selected_date.toString("yyyy-MM-dd")
-        transactions = get_transactions_for_date(date_str)
+        self.query_runner.submit('transactions', get_transactions_for_date, date_str,
+                                 on_result=self._show_details)
 
+    def _show_details(self, transactions: list):
+        """İşlemlerle tabloları ve özet alanını doldurur."""
         sales_model = QStandardItemModel()
         sales_model.setHorizontalHeaderLabels(['Saat', 'Ürün Kodu', 'Cins', 'Adet', 'Birim Fiyat', 'Toplam Tutar'])
 
@@ -181,3 +186,8 @@ class DailyDetailDialog(QDialog):
         # Özet etiketlerini güncelle
         self.total_sales_label.setText(f"Toplam Satış: {total_sales:,.2f} TL")
         self.total_purchases_label.setText(f"Toplam Alış: {total_purchases:,.2f} TL")
+
+    def done(self, result):
+        # Diyalog kapanırken bekleyen sorgunun sonucu kapanmış pencereye teslim edilmez
+        self.query_runner.cancel()
+        super().done(result)
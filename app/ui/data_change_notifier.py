@@ -0,0 +1,74 @@
+# MIT License
+# Copyright (c) 2025 Aykut Yahya Ay
+# See LICENSE file for full license details.
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from .. import data_changes
+from ..database import check_external_changes
+from ..product_repository import get_product_repository
+
+# Art arda gelen bildirimler (toplu aktarım, yazma kuyruğu) bu süre içinde tek sinyalde birleştirilir
+COALESCE_MS = 50
+# Başka bir süreçten gelen değişiklikleri kontrol etme aralığı
+EXTERNAL_CHECK_INTERVAL_MS = 2000
+
+_notifier = None
+
+
+class DataChangeNotifier(QObject):
+    """
+    data_changes yayınlarını arayüz thread'ine taşır. Yayın hangi thread'den gelirse
+    gelsin data_changed sinyali arayüz thread'inde, kısa aralıklarla birleştirilmiş
+    {tür: ID kümesi} sözlüğüyle yayılır. Dış değişiklikler için veritabanını
+    periyodik olarak kontrol eder.
+    """
+    data_changed = Signal(object)
+    # Kritik stok eşiğine yeni inen ürünlerin ID kümesi
+    low_stock_reached = Signal(object)
+    # Yayın thread'inden arayüz thread'ine geçiş için (kuyruklu bağlantı)
+    _published = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = {}
+
+        self._coalesce_timer = QTimer(self)
+        self._coalesce_timer.setSingleShot(True)
+        self._coalesce_timer.setInterval(COALESCE_MS)
+        self._coalesce_timer.timeout.connect(self._emit_pending)
+
+        self._external_timer = QTimer(self)
+        self._external_timer.setInterval(EXTERNAL_CHECK_INTERVAL_MS)
+        self._external_timer.timeout.connect(check_external_changes)
+        self._external_timer.start()
+
+        self._published.connect(self._collect)
+        # Ürün deposu bildirime bizden önce abone olmalı: sayfalar sinyali aldığında depo güncel olur
+        get_product_repository()
+        data_changes.subscribe(self._published.emit)
+
+    def _collect(self, changes: dict):
+        data_changes.merge(self._pending, changes)
+        if not self._coalesce_timer.isActive():
+            self._coalesce_timer.start()
+
+    def _emit_pending(self):
+        changes, self._pending = self._pending, {}
+        if changes:
+            self.data_changed.emit(changes)
+        if changes.get(data_changes.LOW_STOCK_REACHED):
+            self.low_stock_reached.emit(changes[data_changes.LOW_STOCK_REACHED])
+
+
+def get_change_notifier() -> DataChangeNotifier:
+    """Uygulama genelindeki bildirim nesnesini döndürür; ilk çağrı arayüz thread'inden yapılmalıdır."""
+    global _notifier
+    if _notifier is None:
+        _notifier = DataChangeNotifier()
+    return _notifier
+
+
+def affects(changes: dict, *kinds: str) -> bool:
+    """Değişikliklerden en az biri verilen türlerden mi (dış değişiklik her şeyi etkiler)?"""
+    return data_changes.EXTERNAL_CHANGE in changes or any(kind in changes for kind in kinds)
@@ -15,6 +15,8 @@ from PySide6.QtCore import QSize, QPropertyAnimation, QEasingCurve, QParallelAni
 # Yerel modül importları
 from app.utils import get_icon_path
 from app.agent.agent_core import StokGoldAgent
+from app.product_repository import get_product_repository
+from .data_change_notifier import get_change_notifier
 from .pages.dashboard_page import DashboardPage
 from .pages.inventory_page import InventoryPage
 from .pages.report_page import ReportPage
@@ -27,6 +29,8 @@ class MainApplicationWindow(QMainWindow):
     """
     Uygulamanın ana çerçevesi. Tüm sayfaları yönetir ve aralarındaki geçişi sağlar.
     """
+    # Kritik stok uyarısının durum çubuğunda kalma süresi
+    LOW_STOCK_MESSAGE_MS = 15000
 
     def __init__(self):
         super().__init__()
@@ -110,6 +114,9 @@ class MainApplicationWindow(QMainWindow):
         # Araç çubuğundaki Geri butonuna basıldığında kontrol paneline dön
         self.back_action.triggered.connect(self.go_to_dashboard)
 
+        # Bir satış ürünü kritik stok seviyesine indirdiğinde uyar
+        get_change_notifier().low_stock_reached.connect(self._show_low_stock_warning)
+
     def _animate_transition(self, old_widget: QWidget, new_widget: QWidget, direction: str):
         """İki sayfa arasında yumuşak bir kayma animasyonu uygular."""
         width = self.frameGeometry().width()
@@ -152,12 +159,19 @@ class MainApplicationWindow(QMainWindow):
         """Kontrol paneline geri doğru animasyonla döner."""
         current_widget = self.stacked_widget.currentWidget()
         if current_widget != self.dashboard_page:
-            # Dashboard'a dönmeden önce onun da verilerini yenile
-            if hasattr(self.dashboard_page, 'update_dashboard_data'):
-                self.dashboard_page.update_dashboard_data()
+            # Dashboard verileri değiştiyse kendi showEvent'inde yenilenir
             self._animate_transition(current_widget, self.dashboard_page, direction='backward')
         self.toolbar.setVisible(False)
 
+    def _show_low_stock_warning(self, product_ids: set):
+        """Kritik stok seviyesine yeni inen ürünleri durum çubuğunda gösterir."""
+        repository = get_product_repository()
+        urunler = [urun for urun in map(repository.get, sorted(product_ids)) if urun is not None]
+        if not urunler:
+            return
+        detay = ", ".join(f"{urun.cins} ({urun.urun_kodu}): {urun.stok_adeti} adet" for urun in urunler)
+        self.statusBar().showMessage(f"Kritik stok seviyesine inen ürün: {detay}", self.LOW_STOCK_MESSAGE_MS)
+
     def _open_assistant_dialog(self):
         """Akıllı Asistan sohbet diyalogunu açar."""
         try:
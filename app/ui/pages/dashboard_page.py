@@ -13,12 +13,10 @@ from PySide6.QtGui import QFont, QPixmap, QIcon, QColor
 from PySide6.QtCore import Qt, Signal, QSize
 
 from app.utils import get_icon_path
-from app.database import (
-    get_daily_summary,
-    get_low_stock_products,
-    get_latest_products,
-    get_product_variety_count
-)
+from app.database import get_dashboard_snapshot
+from app.data_changes import PRODUCT_UPSERTED, PRODUCT_DELETED, MOVEMENT_LOGGED
+from app.ui.query_runner import QueryRunner
+from app.ui.data_change_notifier import get_change_notifier, affects
 
 
 class DashboardPage(QWidget):
@@ -93,13 +91,34 @@ class DashboardPage(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.query_runner = QueryRunner(self)
+        # Kartlar en son yüklendiğinden beri veri değişti mi; gizliyken gelen değişiklikler burada birikir
+        self._stale = True
+        self._loaded_day = None
         self.setStyleSheet(self.Styles.PAGE_BACKGROUND)
         self._setup_ui()
         self._connect_signals()
 
     def showEvent(self, event):
         super().showEvent(event)
-        self.update_dashboard_data()
+        # "Bugünkü satış" kartı gün dönünce veri değişmese de yenilenmeli
+        if self._stale or self._loaded_day != date.today():
+            self.update_dashboard_data()
+
+    def hideEvent(self, event):
+        # Sayfadan çıkılınca bekleyen sorgunun sonucuna artık gerek yok
+        if self.query_runner.is_pending('dashboard'):
+            self._stale = True
+        self.query_runner.cancel()
+        super().hideEvent(event)
+
+    def _on_data_changed(self, changes: dict):
+        if not affects(changes, PRODUCT_UPSERTED, PRODUCT_DELETED, MOVEMENT_LOGGED):
+            return
+        if self.isVisible():
+            self.update_dashboard_data()
+        else:
+            self._stale = True
 
     def _setup_ui(self):
         main_layout = QHBoxLayout(self)
@@ -192,11 +211,15 @@ class DashboardPage(QWidget):
         self.product_variety_card = self._create_kpi_card("Toplam Ürün Çeşidi", "inventory.png")
         self.low_stock_card = self._create_kpi_card("Kritik Stoktaki Ürünler", "stock_alert.png", is_list=True)
         self.recent_products_card = self._create_kpi_card("Son Eklenenler", "recent.png", is_list=True)
+        self.best_sellers_card = self._create_kpi_card("Son 30 Günün En Çok Satanları", "sale.png", is_list=True)
+        self.top_profitable_card = self._create_kpi_card("Kâr Potansiyeli En Yüksek Ürünler", "report.png", is_list=True)
 
         kpi_layout.addWidget(self.daily_sales_card, 0, 0)
         kpi_layout.addWidget(self.product_variety_card, 0, 1)
         kpi_layout.addWidget(self.low_stock_card, 1, 0)
         kpi_layout.addWidget(self.recent_products_card, 1, 1)
+        kpi_layout.addWidget(self.best_sellers_card, 2, 0)
+        kpi_layout.addWidget(self.top_profitable_card, 2, 1)
         return kpi_layout
 
     def _create_kpi_card(self, title: str, icon_name: str, is_list=False) -> QFrame:
@@ -226,7 +249,7 @@ class DashboardPage(QWidget):
             data_widget.setStyleSheet(self.Styles.KPI_VALUE_STYLE)
 
         variable_name = title.lower().replace(' ', '_').replace('ı', 'i').replace('ö', 'o').replace('ü', 'u').replace(
-            'ç', 'c').replace('ş', 's').replace('ğ', 'g')
+            'ç', 'c').replace('ş', 's').replace('ğ', 'g').replace('â', 'a')
         setattr(self, f"{variable_name}_data", data_widget)
 
         layout.addWidget(title_label)
@@ -241,6 +264,7 @@ class DashboardPage(QWidget):
         return button
 
     def _connect_signals(self):
+        get_change_notifier().data_changed.connect(self._on_data_changed)
         self.refresh_button.clicked.connect(self.update_dashboard_data)
         self.purchase_button.clicked.connect(self.purchase_button_clicked.emit)
         self.sale_button.clicked.connect(self.sale_button_clicked.emit)
@@ -252,12 +276,20 @@ class DashboardPage(QWidget):
 
     def update_dashboard_data(self):
         print("Kontrol Paneli verileri yenileniyor...")
+        self._stale = False
+        self._loaded_day = date.today()
+        self.query_runner.submit(
+            'dashboard', get_dashboard_snapshot,
+            on_result=self._show_dashboard_data,
+            on_error=lambda message: print(f"Dashboard verileri güncellenirken hata: {message}")
+        )
+
+    def _show_dashboard_data(self, data: dict):
         try:
-            today_str = date.today().strftime("%Y-%m-%d")
-            daily_summary = get_daily_summary(today_str)
+            daily_summary = data['daily_summary']
             self.bugunku_satis_tutari_data.setText(f"{daily_summary.get('satis', 0.0):,.2f} TL")
 
-            low_stock_items = get_low_stock_products(threshold=5)
+            low_stock_items = data['low_stock_items']
             if low_stock_items:
                 low_stock_html = "<ul style='margin:0; padding-left:15px; list-style-type: none;'>" + "".join([
                                                                                                                   f"<li style='margin-bottom:6px;'>&#8226; {row['cins']} (<b style=color:#D9534F>{row['stok_adeti']}</b>)</li>"
@@ -269,16 +301,37 @@ class DashboardPage(QWidget):
                 self.kritik_stoktaki_urunler_data.setHtml(
                     "<p style='color: #16A34A; font-weight:bold; font-size:14px;'>Kritik seviyede ürün yok.</p>")
 
-            variety_count = get_product_variety_count()
+            variety_count = data['variety_count']
             self.toplam_urun_cesidi_data.setText(str(variety_count))
 
-            latest_products = get_latest_products(limit=5)
+            latest_products = data['latest_products']
             if latest_products:
                 latest_html = "<ul style='margin:0; padding-left:15px; list-style-type: none;'>" + "".join(
                     [f"<li style='margin-bottom:6px;'>&#8226; {cins}</li>" for cins, kod in latest_products]) + "</ul>"
                 self.son_eklenenler_data.setHtml(latest_html)
             else:
                 self.son_eklenenler_data.setHtml("<p style='color: #9CA3AF;'>Veritabanına henüz ürün eklenmemiş.</p>")
+
+            best_sellers = data['best_sellers']
+            if best_sellers:
+                best_sellers_html = "<ul style='margin:0; padding-left:15px; list-style-type: none;'>" + "".join(
+                    [f"<li style='margin-bottom:6px;'>&#8226; {row['cins'] or 'Silinmiş ürün'} "
+                     f"({row['satilan_adet']} adet, <b>{row['satis_tutari']:,.2f} TL</b>)</li>"
+                     for row in best_sellers]) + "</ul>"
+                self.son_30_gunun_en_cok_satanlari_data.setHtml(best_sellers_html)
+            else:
+                self.son_30_gunun_en_cok_satanlari_data.setHtml("<p style='color: #9CA3AF;'>Son 30 günde satış yapılmamış.</p>")
+
+            top_profitable = data['top_profitable']
+            if top_profitable:
+                top_profitable_html = "<ul style='margin:0; padding-left:15px; list-style-type: none;'>" + "".join(
+                    [f"<li style='margin-bottom:6px;'>&#8226; {row['cins']} ({row['urun_kodu']}): "
+                     f"<b style=color:#16A34A>{row['potansiyel_kar']:,.2f} TL</b></li>"
+                     for row in top_profitable]) + "</ul>"
+                self.kar_potansiyeli_en_yuksek_urunler_data.setHtml(top_profitable_html)
+            else:
+                self.kar_potansiyeli_en_yuksek_urunler_data.setHtml(
+                    "<p style='color: #9CA3AF;'>Fiyat ve maliyet bilgisi girilmiş stoklu ürün yok.</p>")
         except Exception as e:
             print(f"Dashboard verileri güncellenirken hata: {e}")
 
@@ -7,19 +7,23 @@ import traceback
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QLabel, QFrame, QSizePolicy, QFileDialog, QMessageBox,
-    QGraphicsDropShadowEffect
+    QGraphicsDropShadowEffect, QComboBox, QCheckBox, QProgressBar
 )
 from PySide6.QtGui import QFont, QIcon, QColor
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, Signal
 
 from ...utils import get_icon_path
 from app.backup_manager import backup_database, restore_database
+from app.database import archive_year, get_archivable_years, get_archived_years
+from ..query_runner import QueryRunner, get_query_pool
 
 
 class DataManagementPage(QWidget):
     """
     Veritabanı yedekleme ve geri yükleme işlemlerinin yapıldığı modern ve estetik arayüz sayfası.
     """
+    # Yedekleme thread'inden (kopyalanan, toplam) sayfa sayısı; arayüz thread'ine kuyrukla taşınır
+    backup_progress = Signal(int, int)
 
     class Styles:
         """Tüm arayüz stillerini merkezi olarak yöneten sınıf."""
@@ -50,6 +54,25 @@ class DataManagementPage(QWidget):
             QPushButton:hover { background-color: #D97706; }
             QPushButton:pressed { background-color: #B45309; }
         """
+        ARCHIVE_BUTTON = """
+            QPushButton {
+                background-color: #6366F1; color: white; border: none;
+                padding: 12px 20px; border-radius: 8px; font-weight: bold; font-size: 15px;
+            }
+            QPushButton:hover { background-color: #4F46E5; }
+            QPushButton:pressed { background-color: #4338CA; }
+            QPushButton:disabled { background-color: #A5B4FC; }
+        """
+        YEAR_COMBO = "padding: 8px; border: 1px solid #D1D5DB; border-radius: 6px; font-size: 14px; min-width: 100px;"
+        ARCHIVED_LABEL = "font-size: 13px; color: #374151;"
+        COMPACT_CHECKBOX = "font-size: 13px; color: #374151;"
+        PROGRESS_BAR = """
+            QProgressBar {
+                border: 1px solid #D1D5DB; border-radius: 6px; background-color: #F3F4F6;
+                text-align: center; font-size: 12px; height: 18px; padding: 0px;
+            }
+            QProgressBar::chunk { background-color: #10B981; border-radius: 6px; }
+        """
         WARNING_LABEL = "color: #EF4444; font-weight: bold; font-size: 13px;"
 
     def __init__(self, parent=None):
@@ -88,11 +111,14 @@ class DataManagementPage(QWidget):
         cards_layout.addWidget(restore_card)
 
         content_layout.addLayout(cards_layout)
+        content_layout.addWidget(self._create_archive_card())
         content_layout.addStretch()
 
         main_layout.addWidget(content_widget)
 
+        self.query_runner = QueryRunner(self)
         self._connect_signals()
+        self._load_archive_years()
 
     def _apply_shadow(self, widget: QWidget):
         """Widget'a standart bir gölge efekti uygular."""
@@ -124,8 +150,16 @@ class DataManagementPage(QWidget):
         self.backup_button.setIconSize(QSize(20, 20))
         self.backup_button.setStyleSheet(self.Styles.BACKUP_BUTTON)
 
+        self.compact_checkbox = QCheckBox("Sıkıştırılmış yedek (boş alanı atar, daha yavaş)")
+        self.compact_checkbox.setStyleSheet(self.Styles.COMPACT_CHECKBOX)
+
+        self.backup_progress_bar = QProgressBar()
+        self.backup_progress_bar.setStyleSheet(self.Styles.PROGRESS_BAR)
+        self.backup_progress_bar.hide()
+
         layout.addWidget(title)
         layout.addWidget(description)
+        layout.addWidget(self.compact_checkbox)
         layout.addStretch()
 
         button_layout = QHBoxLayout()
@@ -133,6 +167,7 @@ class DataManagementPage(QWidget):
         button_layout.addWidget(self.backup_button)
         button_layout.addStretch()
         layout.addLayout(button_layout)
+        layout.addWidget(self.backup_progress_bar)
 
         return card
 
@@ -172,20 +207,138 @@ class DataManagementPage(QWidget):
 
         return card
 
+    def _create_archive_card(self) -> QFrame:
+        """Geçmiş yılların hareketlerini arşivleme bölümünü oluşturan kartı döndürür."""
+        card = QFrame()
+        card.setStyleSheet(self.Styles.CARD_STYLE)
+        self._apply_shadow(card)
+        layout = QVBoxLayout(card)
+
+        title = QLabel("Hareket Arşivi")
+        title.setStyleSheet(self.Styles.TITLE_LABEL)
+
+        description = QLabel(
+            "Kapanmış bir yılın alış/satış hareketlerini ayrı bir arşiv dosyasına taşıyarak ana veritabanını "
+            "küçük ve hızlı tutun. Arşivlenen yıllar raporlarda görünmeye devam eder.\n"
+            "Arşiv dosyaları veritabanıyla aynı klasörde tutulur ve yedeklemeye dahildir."
+        )
+        description.setStyleSheet(self.Styles.DESCRIPTION_LABEL)
+        description.setWordWrap(True)
+
+        self.archive_year_combo = QComboBox()
+        self.archive_year_combo.setStyleSheet(self.Styles.YEAR_COMBO)
+
+        self.archive_button = QPushButton(" Seçili Yılı Arşivle")
+        self.archive_button.setIcon(QIcon(get_icon_path("save.png")))
+        self.archive_button.setIconSize(QSize(20, 20))
+        self.archive_button.setStyleSheet(self.Styles.ARCHIVE_BUTTON)
+        self.archive_button.setEnabled(False)
+
+        self.archived_years_label = QLabel()
+        self.archived_years_label.setStyleSheet(self.Styles.ARCHIVED_LABEL)
+        self.archived_years_label.setWordWrap(True)
+
+        layout.addWidget(title)
+        layout.addWidget(description)
+
+        controls_layout = QHBoxLayout()
+        controls_layout.addStretch()
+        controls_layout.addWidget(self.archive_year_combo)
+        controls_layout.addWidget(self.archive_button)
+        controls_layout.addStretch()
+        layout.addLayout(controls_layout)
+        layout.addWidget(self.archived_years_label)
+
+        return card
+
     def _connect_signals(self):
         """Butonların tıklanma olaylarını ilgili fonksiyonlara bağlar."""
         self.backup_button.clicked.connect(self._handle_backup)
         self.restore_button.clicked.connect(self._handle_restore)
+        self.archive_button.clicked.connect(self._handle_archive)
+        self.backup_progress.connect(self._show_backup_progress)
+
+    def _load_archive_years(self):
+        """Arşivlenebilir ve arşivlenmiş yılları arka planda okur."""
+        self.query_runner.submit('archive_years', lambda: (get_archivable_years(), get_archived_years()),
+                                 on_result=self._show_archive_years)
+
+    def _show_archive_years(self, result):
+        archivable, archived = result
+        self.archive_year_combo.clear()
+        for year in archivable:
+            self.archive_year_combo.addItem(str(year), year)
+        self.archive_button.setEnabled(bool(archivable))
+        if archived:
+            self.archived_years_label.setText(f"Arşivlenmiş yıllar: {', '.join(map(str, archived))}")
+        else:
+            self.archived_years_label.setText("Henüz arşivlenmiş yıl yok.")
+
+    def _handle_archive(self):
+        """Seçili yılı onay aldıktan sonra arka planda arşivler."""
+        year = self.archive_year_combo.currentData()
+        if year is None:
+            return
+        reply = QMessageBox.question(
+            self,
+            "Arşivleme Onayı",
+            f"{year} yılının tüm hareketleri arşiv dosyasına taşınacak. İşlem veritabanının büyüklüğüne göre "
+            "biraz sürebilir.\n\nDevam etmek istiyor musunuz?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        self.archive_button.setEnabled(False)
+        self.archive_button.setText(" Arşivleniyor...")
+        self.query_runner.submit('archive', archive_year, year,
+                                 on_result=lambda moved: self._archive_finished(year, moved),
+                                 on_error=self._archive_failed)
+
+    def _archive_finished(self, year: int, moved):
+        self.archive_button.setText(" Seçili Yılı Arşivle")
+        if moved is None:
+            QMessageBox.critical(self, "Hata", f"{year} yılı arşivlenirken bir veritabanı hatası oluştu.")
+        else:
+            QMessageBox.information(self, "Başarılı", f"{year} yılına ait {moved} hareket arşive taşındı.")
+        self._load_archive_years()
+
+    def _archive_failed(self, message: str):
+        self.archive_button.setText(" Seçili Yılı Arşivle")
+        QMessageBox.warning(self, "Uyarı", message)
+        self._load_archive_years()
 
     def _handle_backup(self):
-        """Kullanıcıya yedekleme konumu seçtirir ve yedekleme işlemini başlatır."""
+        """Kullanıcıya yedekleme konumu seçtirir ve yedekleme işlemini arka planda başlatır."""
         directory = QFileDialog.getExistingDirectory(self, "Yedekleme Klasörünü Seçin")
         if directory:
-            success, message = backup_database(directory)
-            if success:
-                QMessageBox.information(self, "Başarılı", message)
-            else:
-                QMessageBox.critical(self, "Hata", message)
+            self.backup_button.setEnabled(False)
+            self.restore_button.setEnabled(False)
+            self.backup_progress_bar.setRange(0, 100)
+            self.backup_progress_bar.setValue(0)
+            self.backup_progress_bar.show()
+            self.query_runner.submit('backup', backup_database, directory,
+                                     compact=self.compact_checkbox.isChecked(),
+                                     progress=self.backup_progress.emit,
+                                     on_result=self._backup_finished)
+
+    def _show_backup_progress(self, done: int, total: int):
+        if total == 0:
+            # Sıkıştırılmış yedekte ilerleme bilinmiyor: meşgul göstergesi
+            self.backup_progress_bar.setRange(0, 0)
+        else:
+            self.backup_progress_bar.setRange(0, total)
+            self.backup_progress_bar.setValue(done)
+
+    def _backup_finished(self, result):
+        success, message = result
+        self.backup_progress_bar.hide()
+        self.backup_button.setEnabled(True)
+        self.restore_button.setEnabled(True)
+        if success:
+            QMessageBox.information(self, "Başarılı", message)
+        else:
+            QMessageBox.critical(self, "Hata", message)
 
     def _handle_restore(self):
         """Kullanıcıya yedek dosyasını seçtirir ve geri yükleme işlemini başlatır."""
@@ -206,8 +359,13 @@ class DataManagementPage(QWidget):
             )
 
             if reply == QMessageBox.StandardButton.Yes:
+                # Geri yükleme havuzdaki bağlantıları kapatır; sorgu thread'lerinde çalışan
+                # işler (başka sayfaların sorguları, arşivleme) önce bitsin
+                self.query_runner.cancel()
+                get_query_pool().waitForDone()
                 success, message = restore_database(source_path)
                 if success:
+                    self._load_archive_years()
                     QMessageBox.information(self, "Başarılı", message)
                 else:
                     QMessageBox.critical(self, "Hata", message)
\ No newline at end of file
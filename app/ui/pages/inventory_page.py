@@ -18,10 +18,10 @@ from ...utils import BARCODE_DIR, get_icon_path
 from ..transaction_dialog import TransactionDialog
 from ...models import Urun
 from ..add_product import AddProductDialog
-from ...database import (
-    add_product, get_all_products, delete_product,
-    update_product, search_products, update_stock, log_transaction
-)
+from ..query_runner import QueryRunner
+from ..data_change_notifier import get_change_notifier, affects
+from ...data_changes import PRODUCT_UPSERTED, PRODUCT_DELETED, MOVEMENT_LOGGED, EXTERNAL_CHANGE
+from ...product_repository import get_product_repository
 
 
 class NumericSortProxyModel(QSortFilterProxyModel):
@@ -42,6 +42,9 @@ class NumericSortProxyModel(QSortFilterProxyModel):
 class InventoryPage(QWidget):
     """Ürün envanterini gösteren ve yöneten, modern tasarımlı ana sayfa."""
 
+    # Tablo sonuna yaklaşıldıkça veritabanından bir seferde çekilecek ürün sayısı
+    PAGE_SIZE = 500
+
     class Styles:
         """Tüm arayüz stillerini merkezi olarak yöneten sınıf."""
         PAGE_BACKGROUND = "background-color: #F4F7FC;"
@@ -114,7 +117,11 @@ class InventoryPage(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._urunler_cache = {}
+        self.repository = get_product_repository()
+        self._next_page_key = None
+        # Sayfa gizliyken gelen ürün değişiklikleri; görünür olunca tablo yeniden yüklenir
+        self._stale = False
+        self.query_runner = QueryRunner(self)
         self.setStyleSheet(self.Styles.PAGE_BACKGROUND)
 
         main_hbox_layout = QHBoxLayout(self)
@@ -250,6 +257,8 @@ class InventoryPage(QWidget):
         self.export_excel_button.clicked.connect(self._export_to_excel)
         self.product_table.selectionModel().selectionChanged.connect(self._on_selection_changed)
         self.search_input.textChanged.connect(self.filter_products)
+        self.product_table.verticalScrollBar().valueChanged.connect(self._on_table_scrolled)
+        get_change_notifier().data_changed.connect(self._on_data_changed)
 
     def _on_selection_changed(self):
         """Tabloda seçim değiştiğinde çağrılır. Çoklu seçimi yönetir."""
@@ -304,74 +313,86 @@ class InventoryPage(QWidget):
             self.barcode_image_label.clear()
             self.barcode_image_label.setPixmap(QPixmap())
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._stale:
+            self._reload_view()
+
+    def _reload_view(self):
+        """Tabloyu arama kutusundaki filtreyi koruyarak baştan yükler."""
+        self._stale = False
+        self.filter_products(self.search_input.text())
+
+    def _on_data_changed(self, changes: dict):
+        if not affects(changes, PRODUCT_UPSERTED, PRODUCT_DELETED, MOVEMENT_LOGGED):
+            return
+        if not self.isVisible():
+            self._stale = True
+            return
+        if EXTERNAL_CHANGE in changes:
+            self._reload_view()
+            return
+
+        # Tabloda görünen ürünler yerinde güncellenir; kaydırma konumu ve seçim korunur
+        deleted = changes.get(PRODUCT_DELETED, set())
+        changed = (changes.get(PRODUCT_UPSERTED, set()) | changes.get(MOVEMENT_LOGGED, set())) - deleted
+        self._remove_rows(deleted)
+        not_shown = self._update_rows(changed)
+        # Tabloda olmayan yeni/düzenlenmiş bir ürünün listedeki yeri bilinmez; görünüm yeniden yüklenir
+        if not_shown & changes.get(PRODUCT_UPSERTED, set()):
+            self._reload_view()
+        else:
+            self._on_selection_changed()
+
     def load_all_products(self):
-        self._populate_table(get_all_products())
+        # Tüm katalog yerine ilk sayfa yüklenir; kalanı kullanıcı aşağı kaydırdıkça gelir.
+        # Sayfalar ortak ürün deposundan okunur; depo ilk kullanımda yükleneceği için çağrı
+        # arka planda çalışır. Yükleme ve arama aynı anahtarı paylaştığından yalnızca en son
+        # isteğin sonucu tabloya yazılır.
+        self.query_runner.cancel('next_page')
+        self._next_page_key = None
+        self.query_runner.submit('products', self.repository.page, limit=self.PAGE_SIZE,
+                                 on_result=self._on_first_page_loaded)
+
+    def _on_first_page_loaded(self, result: tuple):
+        urunler, self._next_page_key = result
+        self._populate_table(urunler)
         self.update_button_states()
 
     def filter_products(self, text: str):
         if not text:
             self.load_all_products()
         else:
-            self._populate_table(search_products(text))
+            self.query_runner.cancel('next_page')
+            self._next_page_key = None
+            self.query_runner.submit('products', self.repository.search, text,
+                                     on_result=self._on_search_results)
+
+    def _on_search_results(self, urunler: list):
+        self._populate_table(urunler)
         self.update_button_states()
 
+    def _on_table_scrolled(self, value: int):
+        """Kaydırma çubuğu sona yaklaştığında bir sonraki ürün sayfasını tabloya ekler."""
+        scroll_bar = self.product_table.verticalScrollBar()
+        if self._next_page_key is None or value < scroll_bar.maximum() - 5:
+            return
+        if self.query_runner.is_pending('products') or self.query_runner.is_pending('next_page'):
+            return
+        self.query_runner.submit('next_page', self.repository.page, after_key=self._next_page_key,
+                                 limit=self.PAGE_SIZE, on_result=self._on_next_page_loaded)
+
+    def _on_next_page_loaded(self, result: tuple):
+        urunler, self._next_page_key = result
+        self._append_rows(urunler)
+
     def _populate_table(self, urunler_listesi: list):
         self.source_model.clear()
-        self._urunler_cache.clear()
         self.source_model.setHorizontalHeaderLabels(
             ['ID', 'Ürün Kodu', 'Cins', 'Ayar', 'Gram', 'Maliyet', 'Stok', 'Eklenme Tarihi']
         )
 
-        warning_icon = self.style().standardIcon(QStyle.StandardPixmap.SP_MessageBoxWarning)
-
-        for urun in urunler_listesi:
-            self._urunler_cache[urun.id] = urun
-
-            item_id = QStandardItem(str(urun.id))
-            item_kod = QStandardItem(str(urun.urun_kodu or ''))
-            item_cins = QStandardItem(str(urun.cins or ''))
-
-            item_tarih = QStandardItem(
-                urun.eklenme_tarihi.strftime('%d-%m-%Y') if urun.eklenme_tarihi else ""
-            )
-
-            item_ayar = QStandardItem()
-            item_ayar.setData(urun.ayar, Qt.UserRole)
-            item_ayar.setData(str(urun.ayar), Qt.DisplayRole)
-            item_ayar.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-            item_gram = QStandardItem()
-            if urun.gram is not None:
-                item_gram.setData(urun.gram, Qt.UserRole)
-                item_gram.setData(f"{urun.gram:.2f}", Qt.DisplayRole)
-            item_gram.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-
-            item_maliyet = QStandardItem()
-            item_maliyet.setData(urun.maliyet, Qt.UserRole)
-            item_maliyet.setData(f"{urun.maliyet:,.2f} TL", Qt.DisplayRole)
-            item_maliyet.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-
-            item_stok = QStandardItem()
-            item_stok.setData(urun.stok_adeti, Qt.UserRole)
-            item_stok.setData(str(urun.stok_adeti), Qt.DisplayRole)
-            item_stok.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-
-            row_items = [item_id, item_kod, item_cins, item_ayar, item_gram, item_maliyet, item_stok, item_tarih]
-
-            # Stok durumu rengi ve ikon
-            stok_adeti = urun.stok_adeti
-            if stok_adeti == 0:
-                color = QColor("#D9534F")  # kırmızı
-                for item in row_items:
-                    item.setForeground(color)
-                item_stok.setIcon(warning_icon)
-            elif 0 < stok_adeti < 5:
-                color = QColor("#F0AD4E")  # turuncu
-                for item in row_items:
-                    item.setForeground(color)
-                item_stok.setIcon(warning_icon)
-
-            self.source_model.appendRow(row_items)
+        self._append_rows(urunler_listesi)
 
         # Satır yüksekliği: her satır için değil, tüm tablo için tek seferde sabitle
         self.product_table.verticalHeader().setDefaultSectionSize(30)
@@ -384,6 +405,85 @@ class InventoryPage(QWidget):
         # ID sütununu gizle
         self.product_table.setColumnHidden(0, True)
 
+    def _append_rows(self, urunler_listesi: list):
+        """Verilen ürünleri mevcut satırları silmeden tablonun sonuna ekler."""
+        warning_icon = self.style().standardIcon(QStyle.StandardPixmap.SP_MessageBoxWarning)
+        for urun in urunler_listesi:
+            self.source_model.appendRow(self._create_row_items(urun, warning_icon))
+
+    def _update_rows(self, product_ids: set) -> set:
+        """Tabloda görünen ürünlerin satırlarını depodaki güncel halleriyle değiştirir; tabloda olmayan ID'leri döndürür."""
+        remaining = set(product_ids)
+        if not remaining:
+            return remaining
+        warning_icon = self.style().standardIcon(QStyle.StandardPixmap.SP_MessageBoxWarning)
+        for row in range(self.source_model.rowCount()):
+            product_id = int(self.source_model.item(row, 0).text())
+            if product_id not in remaining:
+                continue
+            remaining.discard(product_id)
+            urun = self.repository.get(product_id)
+            if urun is not None:
+                for column, item in enumerate(self._create_row_items(urun, warning_icon)):
+                    self.source_model.setItem(row, column, item)
+            if not remaining:
+                break
+        return remaining
+
+    def _remove_rows(self, product_ids: set):
+        if not product_ids:
+            return
+        for row in reversed(range(self.source_model.rowCount())):
+            if int(self.source_model.item(row, 0).text()) in product_ids:
+                self.source_model.removeRow(row)
+
+    def _create_row_items(self, urun: Urun, warning_icon: QIcon) -> list[QStandardItem]:
+        item_id = QStandardItem(str(urun.id))
+        item_kod = QStandardItem(str(urun.urun_kodu or ''))
+        item_cins = QStandardItem(str(urun.cins or ''))
+
+        item_tarih = QStandardItem(
+            urun.eklenme_tarihi.strftime('%d-%m-%Y') if urun.eklenme_tarihi else ""
+        )
+
+        item_ayar = QStandardItem()
+        item_ayar.setData(urun.ayar, Qt.UserRole)
+        item_ayar.setData(str(urun.ayar), Qt.DisplayRole)
+        item_ayar.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        item_gram = QStandardItem()
+        if urun.gram is not None:
+            item_gram.setData(urun.gram, Qt.UserRole)
+            item_gram.setData(f"{urun.gram:.2f}", Qt.DisplayRole)
+        item_gram.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+
+        item_maliyet = QStandardItem()
+        item_maliyet.setData(urun.maliyet, Qt.UserRole)
+        item_maliyet.setData(f"{urun.maliyet:,.2f} TL", Qt.DisplayRole)
+        item_maliyet.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+
+        item_stok = QStandardItem()
+        item_stok.setData(urun.stok_adeti, Qt.UserRole)
+        item_stok.setData(str(urun.stok_adeti), Qt.DisplayRole)
+        item_stok.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+
+        row_items = [item_id, item_kod, item_cins, item_ayar, item_gram, item_maliyet, item_stok, item_tarih]
+
+        # Stok durumu rengi ve ikon
+        stok_adeti = urun.stok_adeti
+        if stok_adeti == 0:
+            color = QColor("#D9534F")  # kırmızı
+            for item in row_items:
+                item.setForeground(color)
+            item_stok.setIcon(warning_icon)
+        elif stok_adeti <= urun.kritik_esik:
+            color = QColor("#F0AD4E")  # turuncu
+            for item in row_items:
+                item.setForeground(color)
+            item_stok.setIcon(warning_icon)
+
+        return row_items
+
     def _get_selected_product(self, proxy_index=None) -> Urun | None:
         if not proxy_index:
             indexes = self.product_table.selectionModel().selectedRows()
@@ -391,7 +491,7 @@ class InventoryPage(QWidget):
             proxy_index = indexes[0]
         source_index = self.proxy_model.mapToSource(proxy_index)
         product_id = int(self.source_model.item(source_index.row(), 0).text())
-        return self._urunler_cache.get(product_id)
+        return self.repository.get(product_id)
 
     def open_add_product_dialog(self):
         dialog = AddProductDialog(parent=self)
@@ -399,12 +499,9 @@ class InventoryPage(QWidget):
             yeni_urun = dialog.get_product_data()
             if not yeni_urun.urun_kodu or not yeni_urun.cins: QMessageBox.warning(self, "Eksik Bilgi",
                                                                                   "Ürün Kodu ve Cins alanları boş bırakılamaz."); return
-            yeni_urun_id = add_product(yeni_urun)
+            yeni_urun_id = self.repository.add(yeni_urun, log_opening=True)
             if yeni_urun_id:
-                log_transaction(urun_id=yeni_urun_id, tip='Alış', adet=yeni_urun.stok_adeti,
-                                birim_fiyat=yeni_urun.maliyet)
                 QMessageBox.information(self, "Başarılı", f"'{yeni_urun.cins}' başarıyla eklendi.");
-                self.load_all_products()
             else:
                 QMessageBox.critical(self, "Veritabanı Hatası", "Ürün eklenirken bir hata oluştu.")
 
@@ -414,9 +511,8 @@ class InventoryPage(QWidget):
         dialog = AddProductDialog(urun_to_edit=secili_urun, parent=self)
         if dialog.exec():
             guncellenmis_urun = dialog.get_product_data()
-            if update_product(guncellenmis_urun):
+            if self.repository.update(guncellenmis_urun):
                 QMessageBox.information(self, "Başarılı", f"'{guncellenmis_urun.cins}' başarıyla güncellendi.");
-                self.load_all_products()
             else:
                 QMessageBox.critical(self, "Veritabanı Hatası", "Ürün güncellenirken bir hata oluştu.")
 
@@ -448,24 +544,23 @@ class InventoryPage(QWidget):
         if cevap == QMessageBox.StandardButton.Yes:
             silinen_sayisi, basarisiz_sayisi = 0, 0
             for urun in urun_to_delete_list:
-                if delete_product(urun.id):
+                if self.repository.delete(urun.id):
                     self._delete_associated_files(urun); silinen_sayisi += 1
                 else:
                     basarisiz_sayisi += 1
             QMessageBox.information(self, "İşlem Tamamlandı",
                                     f"{silinen_sayisi} adet ürün başarıyla silindi.\n{basarisiz_sayisi} adet ürün silinirken hata oluştu.")
-            self.load_all_products()
 
     def _open_purchase_dialog(self):
-        dialog = TransactionDialog(mode='alış', parent=self);
-        if dialog.exec(): self.load_all_products()
+        dialog = TransactionDialog(mode='alış', parent=self)
+        dialog.exec()
 
     def _open_sale_dialog(self):
         dialog = TransactionDialog(mode='satış', parent=self)
-        if dialog.exec(): self.load_all_products()
+        dialog.exec()
 
     def _export_to_excel(self):
-        urunler = get_all_products()
+        urunler = self.repository.all()
         if not urunler: QMessageBox.information(self, "Bilgi", "Aktarılacak ürün bulunmuyor."); return
         default_filename = f"Stok_Raporu_{datetime.now().strftime('%Y-%m-%d_%H%M')}.xlsx"
         save_path, _ = QFileDialog.getSaveFileName(self, "Excel Dosyasını Kaydet", default_filename,
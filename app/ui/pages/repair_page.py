@@ -15,8 +15,11 @@ from PySide6.QtCore import Qt, QSize, QRect, QEvent, Signal
 from ...utils import get_icon_path
 from app.tamir_model import Tamir
 from ..add_repair_dialog import AddRepairDialog
+from ..query_runner import QueryRunner
+from ..data_change_notifier import get_change_notifier, affects
+from ...data_changes import REPAIR_CHANGED
 from ...database import (
-    get_all_tamirler, add_tamir, update_tamir, delete_tamir, search_repairs
+    get_all_tamirler, add_tamir, update_tamir, delete_tamir, search_repair_ids
 )
 
 
@@ -96,6 +99,9 @@ class RepairPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.all_repairs = []
+        # Sayfa gizliyken tamir kayıtları değiştiyse görünür olunca yeniden yüklenir
+        self._stale = False
+        self.query_runner = QueryRunner(self)
         self.setStyleSheet(self.Styles.PAGE_BACKGROUND)
         main_hbox_layout = QHBoxLayout(self)
         main_hbox_layout.setContentsMargins(0, 0, 0, 0);
@@ -195,6 +201,7 @@ class RepairPage(QWidget):
         return self.repair_table
 
     def _connect_signals(self):
+        get_change_notifier().data_changed.connect(self._on_data_changed)
         self.add_repair_button.clicked.connect(self.open_add_repair_dialog)
         self.delete_repair_button.clicked.connect(self.delete_selected_repair)
         self.repair_table.clicked.connect(self.on_table_click)
@@ -203,18 +210,41 @@ class RepairPage(QWidget):
         self.search_input.textChanged.connect(self.filter_repairs)
         self.status_delegate.status_changed.connect(self.on_status_changed)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._stale:
+            self.load_all_repairs()
+
+    def _on_data_changed(self, changes: dict):
+        # Kendi yaptığımız ekleme/güncelleme/silme de tabloya bu yoldan yansır
+        if not affects(changes, REPAIR_CHANGED):
+            return
+        if self.isVisible():
+            self.load_all_repairs()
+        else:
+            self._stale = True
+
     def load_all_repairs(self):
-        """Veritabanından tüm tamir kayıtlarını çeker ve tabloyu doldurur."""
+        """Tüm tamir kayıtlarını arka planda çeker; sonuç gelince tabloyu doldurur."""
+        self._stale = False
         current_selection_id = None
         if self.repair_table.selectionModel() and self.repair_table.selectionModel().hasSelection():
             current_selection_id = self._get_selected_repair_id()
 
+        self.query_runner.submit(
+            'repairs', get_all_tamirler,
+            on_result=lambda tamirler: self._populate_repairs(tamirler, current_selection_id)
+        )
+
+    def _populate_repairs(self, tamirler: list, current_selection_id: int | None):
         self.repair_model.clear()
         self.repair_model.setHorizontalHeaderLabels(['Müşteri Adı Soyadı', 'Ürün', 'Alınan Tarih', 'Durum'])
-        self.all_repairs = get_all_tamirler()
+        self.all_repairs = tamirler
 
         new_selection_row = -1
         for i, tamir in enumerate(self.all_repairs):
+            if tamir.id == current_selection_id:
+                new_selection_row = i
             row = [
                 QStandardItem(str(tamir.musteri_ad_soyad or '')),
                 QStandardItem(str(tamir.urun_aciklamasi or '')),
@@ -236,17 +266,25 @@ class RepairPage(QWidget):
         if new_selection_row != -1:
             self.repair_table.selectRow(new_selection_row)
 
+        # Yeni satırlara arama kutusundaki filtre yeniden uygulanır
+        if self.search_input.text().strip():
+            self.filter_repairs(self.search_input.text())
+
         self.update_button_states()
 
     def filter_repairs(self, text: str):
-        filtered_data = search_repairs(text)
-        self.load_all_repairs()  # Önce tümünü yükle
-        # Sonra filtreye uymayanları gizle
-        all_ids = {tamir.id for tamir in filtered_data}
+        # Tablo yeniden yüklenmez; yalnızca eşleşen ID'ler sorgulanır ve diğer satırlar gizlenir.
+        # Hızlı yazarken her tuş önceki aramayı geçersiz kılar, yalnızca son aramanın sonucu uygulanır.
+        if not text.strip():
+            self.query_runner.cancel('search')
+            self._apply_repair_filter(None)
+            return
+        self.query_runner.submit('search', search_repair_ids, text, on_result=self._apply_repair_filter)
+
+    def _apply_repair_filter(self, matching_ids: set | None):
         for row in range(self.repair_model.rowCount()):
             tamir_id = self.repair_model.item(row, 0).data(Qt.ItemDataRole.UserRole)
-            if tamir_id not in all_ids:
-                self.repair_table.setRowHidden(row, True)
+            self.repair_table.setRowHidden(row, matching_ids is not None and tamir_id not in matching_ids)
 
     def _on_selection_changed(self, selected, deselected):
         self.update_button_states()
@@ -297,7 +335,6 @@ class RepairPage(QWidget):
             next_index = (current_index + 1) % len(self.STATUS_ORDER)
             tamir.durum = self.STATUS_ORDER[next_index]
             update_tamir(tamir)
-            self.load_all_repairs()
         except ValueError:
             print(f"'{tamir.durum}' durumu listede bulunamadı.")
 
@@ -310,7 +347,6 @@ class RepairPage(QWidget):
                                     "Müşteri Adı Soyadı ve Ürün Açıklaması alanları boş bırakılamaz.")
                 return
             add_tamir(yeni_tamir_kaydi)
-            self.load_all_repairs()
             self.repair_table.clearSelection()
 
     def open_edit_repair_dialog(self, index):
@@ -322,7 +358,6 @@ class RepairPage(QWidget):
         if dialog.exec():
             guncellenmis_kayit = dialog.get_tamir_data()
             update_tamir(guncellenmis_kayit)
-            self.load_all_repairs()
             self.clear_selection()
 
 
@@ -338,7 +373,6 @@ class RepairPage(QWidget):
         if cevap == QMessageBox.StandardButton.Yes:
             if delete_tamir(selected_tamir.id):
                 QMessageBox.information(self, "Başarılı", "Tamir kaydı başarıyla silindi.")
-                self.load_all_repairs()
                 self.clear_selection()
             else:
                 QMessageBox.critical(self, "Hata", "Kayıt silinirken bir veritabanı hatası oluştu.")
@@ -356,7 +390,6 @@ class RepairPage(QWidget):
             if tamir_to_update:
                 tamir_to_update.durum = new_status
                 update_tamir(tamir_to_update)
-                self.load_all_repairs()  # Tabloyu yenile
                 self.clear_selection()  # Seçimi temizle
         except Exception as e:
             print(f"Durum değiştirilirken hata: {e}")
\ No newline at end of file
@@ -11,13 +11,21 @@ from PySide6.QtGui import QStandardItemModel, QStandardItem, QFont, QIcon
 from PySide6.QtCore import Qt, QDate, QSize, QEvent
 
 from ..daily_detail_dialog import DailyDetailDialog
+from ..query_runner import QueryRunner
+from ..data_change_notifier import get_change_notifier, affects
+from ...data_changes import PRODUCT_UPSERTED, PRODUCT_DELETED, MOVEMENT_LOGGED
 from ...utils import get_icon_path
 from ...database import (
     get_total_inventory_value, get_product_counts_by_type,
-    get_total_grams, get_daily_summary, get_statistics_for_period
+    get_total_grams, get_statistics_for_period
 )
 
 
+def _fetch_inventory_summary() -> tuple:
+    """Envanter özeti sekmesinin verisini toplar; arka plan thread'inde çalışır."""
+    return get_total_grams(), get_total_inventory_value(), get_product_counts_by_type()
+
+
 class ReportPage(QWidget):
     """Modern bir tasarıma sahip, sekmeli raporlama sayfası."""
 
@@ -88,6 +96,11 @@ class ReportPage(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.query_runner = QueryRunner(self)
+        # Sekmelerin verisi en son yüklendiğinden beri değişti mi
+        self._inventory_stale = True
+        self._statistics_stale = True
+        get_change_notifier().data_changed.connect(self._on_data_changed)
         self.setStyleSheet(self.Styles.PAGE_BACKGROUND)
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(20, 20, 20, 20)
@@ -182,13 +195,15 @@ class ReportPage(QWidget):
 
         calculate_button.clicked.connect(self._calculate_and_show_statistics)
         self.tabs.addTab(tab, "Satış İstatistikleri")
-        self._calculate_and_show_statistics()
 
     def _calculate_and_show_statistics(self):
+        self._statistics_stale = False
         start_date = self.start_date_edit.date().toString("yyyy-MM-dd")
         end_date = self.end_date_edit.date().toString("yyyy-MM-dd")
-        stats = get_statistics_for_period(start_date, end_date)
+        self.query_runner.submit('statistics', get_statistics_for_period, start_date, end_date,
+                                 on_result=self._show_statistics)
 
+    def _show_statistics(self, stats: dict):
         total_sales = stats.get('total_sales', 0.0)
         total_cogs = stats.get('total_cogs', 0.0)
         net_profit = stats.get('net_profit', 0.0)
@@ -235,13 +250,16 @@ class ReportPage(QWidget):
         self.tabs.addTab(tab, "Genel Envanter Özeti")
 
     def _load_inventory_data(self):
-        total_grams = get_total_grams()
+        self._inventory_stale = False
+        self.query_runner.submit('inventory_summary', _fetch_inventory_summary,
+                                 on_result=self._show_inventory_data)
+
+    def _show_inventory_data(self, data: tuple):
+        total_grams, total_value, type_counts = data
         self.total_grams_label.setText(
             f"<p style='color:#6B7280;font-size:11pt;'>Stoktaki Toplam Gram</p><p style='font-size:16pt;font-weight:bold;'>{total_grams:,.2f} gr</p>")
-        total_value = get_total_inventory_value()
         self.total_value_label.setText(
             f"<p style='color:#6B7280;font-size:11pt;'>Stoktaki Toplam Maliyet</p><p style='font-size:16pt;font-weight:bold;'>{total_value:,.2f} TL</p>")
-        type_counts = get_product_counts_by_type()
         self.type_counts_model.clear()
         self.type_counts_model.setHorizontalHeaderLabels(['Ürün Cinsi', 'Toplam Stok Adedi'])
         for cins, toplam_stok in type_counts:
@@ -256,5 +274,27 @@ class ReportPage(QWidget):
 
     def showEvent(self, event):
         super().showEvent(event)
-        self._load_inventory_data()
-        self._calculate_and_show_statistics()
\ No newline at end of file
+        if self._inventory_stale:
+            self._load_inventory_data()
+        if self._statistics_stale:
+            self._calculate_and_show_statistics()
+
+    def hideEvent(self, event):
+        if self.query_runner.is_pending('inventory_summary'):
+            self._inventory_stale = True
+        if self.query_runner.is_pending('statistics'):
+            self._statistics_stale = True
+        self.query_runner.cancel()
+        super().hideEvent(event)
+
+    def _on_data_changed(self, changes: dict):
+        # Stok adetleri hem ürün düzenlemesiyle hem hareketlerle değişir; istatistikler yalnızca hareketlerle
+        if affects(changes, PRODUCT_UPSERTED, PRODUCT_DELETED, MOVEMENT_LOGGED):
+            self._inventory_stale = True
+        if affects(changes, MOVEMENT_LOGGED):
+            self._statistics_stale = True
+        if self.isVisible():
+            if self._inventory_stale:
+                self._load_inventory_data()
+            if self._statistics_stale:
+                self._calculate_and_show_statistics()
\ No newline at end of file
@@ -0,0 +1,129 @@
+# MIT License
+# Copyright (c) 2025 Aykut Yahya Ay
+# See LICENSE file for full license details.
+
+import threading
+import traceback
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+# Sorgu thread'leri veritabanı havuzunda thread başına bir bağlantı tutar; thread
+# sayısını sınırlı ve thread'leri kalıcı tutarak bağlantı sayısı da sabit kalır.
+QUERY_THREAD_COUNT = 2
+
+_query_pool = None
+
+
+def get_query_pool() -> QThreadPool:
+    """Veritabanı sorgularına ayrılmış, uygulama genelindeki thread havuzunu döndürür."""
+    global _query_pool
+    if _query_pool is None:
+        _query_pool = QThreadPool()
+        _query_pool.setMaxThreadCount(QUERY_THREAD_COUNT)
+        _query_pool.setExpiryTimeout(-1)
+    return _query_pool
+
+
+class CancellationToken:
+    """Bir sorgu isteğini iptal etmek için kullanılır; iptal edilen isteğin sonucu teslim edilmez."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+
+class _QueryTask(QRunnable):
+    """Verilen veritabanı fonksiyonunu havuzdaki bir thread'de çalıştırır."""
+
+    def __init__(self, runner: 'QueryRunner', token: CancellationToken, fn, args, kwargs):
+        super().__init__()
+        self.runner = runner
+        self.token = token
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        # Sırada beklerken iptal edilen istek hiç çalıştırılmaz
+        if self.token.cancelled:
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            self.runner.query_failed.emit(self.token, str(e))
+            return
+        self.runner.query_finished.emit(self.token, result)
+
+
+class QueryRunner(QObject):
+    """
+    Sayfaların veritabanı sorgularını arayüz thread'i dışında çalıştırır ve
+    sonucu arayüz thread'indeki callback'e teslim eder.
+
+    Her istek bir anahtarla (key) yapılır. Aynı anahtarla yeni bir istek gelince
+    öncekinin token'ı iptal edilir ve sonucu geldiğinde atılır; böylece hızlı
+    yazarken ya da sayfa değiştirirken eski sonuç yenisinin üzerine yazılmaz.
+    """
+    query_finished = Signal(object, object)
+    query_failed = Signal(object, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = {}
+        # Sinyaller worker thread'den yayınlanır; alıcı arayüz thread'inde olduğu için
+        # Qt bunları kuyruklu bağlantıyla arayüz thread'ine taşır.
+        self.query_finished.connect(self._deliver_result)
+        self.query_failed.connect(self._deliver_error)
+
+    def submit(self, key: str, fn, *args, on_result, on_error=None, **kwargs) -> CancellationToken:
+        """
+        fn(*args, **kwargs) çağrısını arka planda çalıştırır. Sonuç, istek o anahtar
+        için hâlâ en güncel istekse on_result(sonuç) ile teslim edilir.
+        """
+        self.cancel(key)
+        token = CancellationToken(key)
+        self._pending[key] = (token, on_result, on_error)
+        get_query_pool().start(_QueryTask(self, token, fn, args, kwargs))
+        return token
+
+    def cancel(self, key: str = None):
+        """Verilen anahtardaki (anahtar verilmezse tüm) bekleyen istekleri iptal eder."""
+        keys = [key] if key is not None else list(self._pending)
+        for k in keys:
+            entry = self._pending.pop(k, None)
+            if entry is not None:
+                entry[0].cancel()
+
+    def is_pending(self, key: str) -> bool:
+        return key in self._pending
+
+    def _take(self, token: CancellationToken):
+        """Token hâlâ anahtarının en güncel isteğiyse kaydını çıkarıp döndürür, değilse None."""
+        entry = self._pending.get(token.key)
+        if token.cancelled or entry is None or entry[0] is not token:
+            return None
+        del self._pending[token.key]
+        return entry
+
+    @Slot(object, object)
+    def _deliver_result(self, token: CancellationToken, result):
+        entry = self._take(token)
+        if entry is not None:
+            entry[1](result)
+
+    @Slot(object, str)
+    def _deliver_error(self, token: CancellationToken, message: str):
+        entry = self._take(token)
+        if entry is None:
+            return
+        if entry[2] is not None:
+            entry[2](message)
+        else:
+            print(f"Arka plan sorgusu başarısız ({token.key}): {message}")
@@ -13,7 +13,7 @@ from PySide6.QtCore import Qt, QSize
 
 from app.utils import get_icon_path
 from app.models import Urun
-from app.database import get_all_products, update_stock, log_transaction, search_products
+from app.product_repository import get_product_repository
 
 
 class ProductListItem(QWidget):
@@ -138,8 +138,8 @@ class TransactionDialog(QDialog):
             self.product_list_widget.setItemWidget(list_item, custom_widget)
 
     def _load_all_products(self):
-        """Tüm ürünleri veritabanından çeker ve listeyi doldurur."""
-        all_products = get_all_products()
+        """Tüm ürünleri ortak ürün deposundan alır ve listeyi doldurur."""
+        all_products = get_product_repository().all()
         self._populate_list_with_data(all_products)
 
     def _filter_product_list(self, text: str):
@@ -147,7 +147,7 @@ class TransactionDialog(QDialog):
         if not text:
             self._load_all_products()
         else:
-            filtered_products = search_products(text)
+            filtered_products = get_product_repository().search(text)
             self._populate_list_with_data(filtered_products)
 
     def _on_product_selected(self, item: QListWidgetItem):
@@ -173,12 +173,15 @@ class TransactionDialog(QDialog):
                                                 value=default_price, minValue=0, decimals=2, maxValue=10000000)
             if not ok2: return
 
-            quantity_change = quantity if is_purchase else -quantity
+            try:
+                yeni_stok = get_product_repository().record_movement(urun.id, self.mode.capitalize(), quantity, price)
+            except ValueError as e:
+                QMessageBox.warning(self, "Yetersiz Stok", str(e))
+                return
 
-            if update_stock(urun.id, quantity_change):
-                log_transaction(urun.id, self.mode.capitalize(), quantity, price)
+            if yeni_stok is not None:
                 QMessageBox.information(self, "İşlem Başarılı",
-                                        f"'{urun.cins}' ürününün stoğu {quantity} adet {'arttırıldı' if is_purchase else 'azaltıldı'}.")
+                                        f"'{urun.cins}' ürününün stoğu {quantity} adet {'arttırıldı' if is_purchase else 'azaltıldı'}. Yeni stok: {yeni_stok}")
                 self.accept()
             else:
                 QMessageBox.critical(self, "İşlem Başarısız", "Stok güncellenirken bir veritabanı hatası oluştu.")
@@ -0,0 +1,151 @@
+# MIT License
+# Copyright (c) 2025 Aykut Yahya Ay
+# See LICENSE file for full license details.
+
+"""
+MovementWriteQueue için çökme kurtarma kontrolü.
+
+Bir alt süreç yazma kuyruğuna durmadan satış gönderir ve Future'ı tamamlanan (commit
+edildiği bildirilen) her hareketin numarasını stdout'a yazar. Ana süreç rastgele bir
+anda alt süreci bir partinin ortasında öldürür (SIGKILL / TerminateProcess), ardından
+veritabanını yeniden açıp şunları doğrular:
+
+  * commit edildiği bildirilen her hareket veritabanında (dayanıklılık),
+  * stok adedi kayıtlı satışlarla tutarlı (stok ve hareket aynı işlemde),
+  * gunluk_ozet hareketlerden baştan hesaplananla aynı,
+  * PRAGMA integrity_check 'ok'.
+
+Süreç ölümünü sınar, elektrik kesintisini değil: WAL'a yazılmış ama fsync edilmemiş
+veri işletim sistemi önbelleğinde kalır.
+
+Kullanım:
+    python -m benchmarks.crash_recovery --rounds 5
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+START_STOCK = 10 ** 9
+# Her turun hareket numaraları ayrı bir aralıktan başlar: turun kontrolü yalnızca kendi hareketlerine bakar
+ROUND_NUMBER_SPAN = 10 ** 7
+
+
+def _child(first_number: int, max_batch: int, max_delay_ms: int):
+    """Alt süreç: kuyruğa satış gönderir, commit edilenlerin numarasını yazar."""
+    from app import database as db
+
+    queue = db.MovementWriteQueue(max_batch=max_batch, max_delay_ms=max_delay_ms)
+    urun_id = db.get_products_page(limit=1)[0][0].id
+
+    def acknowledge(number):
+        def callback(future):
+            if future.exception() is None:
+                sys.stdout.write(f"{number}\n")
+                sys.stdout.flush()
+        return callback
+
+    number = first_number - 1
+    while True:
+        # Hareketin numarası birim fiyatında saklanır; ana süreç onaylananları böyle arar
+        number += 1
+        queue.submit(urun_id, 'Satış', 1, float(number)).add_done_callback(acknowledge(number))
+        if (number - first_number) % 32 == 0:
+            time.sleep(0.001)
+
+
+def _run_round(data_dir: str, round_index: int, rng: random.Random, max_batch: int, max_delay_ms: int) -> list[str]:
+    """Bir öldürme turu çalıştırır; bulunan tutarsızlıkların listesini döndürür."""
+    first_number = round_index * ROUND_NUMBER_SPAN + 1
+    env = dict(os.environ, LOCALAPPDATA=data_dir)
+    child = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.crash_recovery", "--child", "--first-number", str(first_number),
+         "--max-batch", str(max_batch), "--max-delay-ms", str(max_delay_ms)],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env, text=True,
+    )
+    acknowledged = set()
+    kill_after = rng.randint(100, 3000)
+    while len(acknowledged) < kill_after:
+        line = child.stdout.readline()
+        if not line:
+            break
+        if line.strip().isdigit():
+            acknowledged.add(int(line))
+    child.kill()
+    # Öldürülmeden önce yazılmış ama henüz okunmamış onaylar da commit edilmiştir
+    acknowledged.update(int(word) for word in child.stdout.read().split() if word.isdigit())
+    child.wait()
+
+    from app import database as db
+    errors = []
+    with db.pooled_connection() as conn:
+        committed = {int(row[0]) for row in conn.execute(
+            "SELECT birim_fiyat FROM hareketler WHERE tip = 'Satış' AND birim_fiyat BETWEEN ? AND ?",
+            (first_number, first_number + ROUND_NUMBER_SPAN - 1))}
+        lost = acknowledged - committed
+        if lost:
+            errors.append(f"commit edildiği bildirilen {len(lost)} hareket kayıp (örn. {min(lost)})")
+        stock = conn.execute("SELECT stok_adeti FROM urunler ORDER BY id LIMIT 1").fetchone()[0]
+        sold = conn.execute("SELECT COUNT(*) FROM hareketler WHERE tip = 'Satış'").fetchone()[0]
+        if stock != START_STOCK - sold:
+            errors.append(f"stok adedi {stock}, kayıtlı satışlara göre {START_STOCK - sold} olmalı")
+        rollup = sorted(tuple(row) for row in conn.execute("SELECT * FROM gunluk_ozet"))
+        integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        if integrity != "ok":
+            errors.append(f"integrity_check: {integrity}")
+    db.rebuild_daily_rollup()
+    with db.pooled_connection() as conn:
+        if rollup != sorted(tuple(row) for row in conn.execute("SELECT * FROM gunluk_ozet")):
+            errors.append("gunluk_ozet hareketlerden hesaplananla uyuşmuyor")
+    db.close_all()
+
+    # Kayıtlı olup onaylanmamış hareketler, öldürme anında commit edilmiş ama onayı yazılamamış partidir
+    print(f"öldürüldü: {len(acknowledged):,} onaylı, {len(committed):,} kayıtlı hareket"
+          f" -> {'TAMAM' if not errors else 'HATA'}")
+    for error in errors:
+        print(f"  - {error}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yazma kuyruğunun süreç öldürüldüğünde veri kaybetmediğini doğrular.")
+    parser.add_argument("--rounds", type=int, default=5, help="öldürme turu sayısı")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-delay-ms", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--first-number", type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.first_number, args.max_batch, args.max_delay_ms)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="stokgold-crash-") as data_dir:
+        # app.utils yolları import anında LOCALAPPDATA'dan hesaplar; app'ten önce ayarlanmalı
+        os.environ['LOCALAPPDATA'] = data_dir
+        from app import database as db
+        from app.models import Urun
+
+        db.create_table()
+        db.add_product(Urun(urun_kodu="CRASH-1", cins="Çeyrek Altın", stok_adeti=START_STOCK))
+        db.close_all()
+
+        rng = random.Random(args.seed)
+        failed = 0
+        try:
+            for round_index in range(args.rounds):
+                failed += bool(_run_round(data_dir, round_index, rng, args.max_batch, args.max_delay_ms))
+        finally:
+            # Windows'ta açık bağlantı varken klasör silinemez
+            db.close_all()
+    print(f"{args.rounds - failed}/{args.rounds} tur başarılı")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+# MIT License
+# Copyright (c) 2025 Aykut Yahya Ay
+# See LICENSE file for full license details.
+
+"""
+Performans ölçümleri için gerçekçi, sentetik bir StokGold veritabanı üretir.
+
+Kullanım:
+    python -m benchmarks.generate_dataset --data-dir /tmp/stokgold-10k --scale small
+    python -m benchmarks.generate_dataset --data-dir /tmp/stokgold-custom --products 50000 --movements 2000000
+
+--data-dir, uygulamanın LOCALAPPDATA klasörü yerine geçer; veritabanı
+<data-dir>/StokGold/stokgold.db olarak, uygulamanın kendi şema ve geçişleriyle oluşturulur.
+Aynı --seed ile aynı veri üretilir.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+SCALES = {
+    # isim: (ürün, hareket, tamir)
+    'small': (10_000, 1_000_000, 10_000),
+    'medium': (100_000, 5_000_000, 50_000),
+    'large': (1_000_000, 20_000_000, 100_000),
+}
+
+BATCH_SIZE = 50_000
+# Yükleme sırasında kullanılacak sayfa önbelleği (negatif değer KiB cinsindendir)
+LOAD_CACHE_KIB = -262_144
+
+URUN_TURLERI = [
+    # (cins, ortalama gram, gram sapması, kod öneki)
+    ("Yüzük", 3.5, 0.45, "YZ"), ("Alyans", 4.0, 0.35, "AL"), ("Tektaş Yüzük", 2.5, 0.3, "TT"),
+    ("Bilezik", 15.0, 0.4, "BL"), ("Burma Bilezik", 20.0, 0.35, "BB"), ("Kelepçe", 12.0, 0.4, "KL"),
+    ("Kolye", 6.0, 0.5, "KY"), ("Gerdanlık", 25.0, 0.45, "GR"), ("Zincir", 8.0, 0.5, "ZN"),
+    ("Küpe", 2.8, 0.45, "KP"), ("Bileklik", 5.0, 0.5, "BK"), ("Künye", 9.0, 0.4, "KN"),
+    ("Halhal", 4.5, 0.4, "HH"), ("Broş", 3.0, 0.4, "BR"), ("Set", 35.0, 0.5, "ST"),
+    ("Çeyrek Altın", 1.75, 0.0, "CA"), ("Yarım Altın", 3.5, 0.0, "YA"), ("Tam Altın", 7.0, 0.0, "TA"),
+    ("Cumhuriyet Altını", 7.2, 0.0, "CU"), ("Gram Altın", 1.0, 0.0, "GA"),
+]
+URUN_TURU_AGIRLIKLARI = [14, 8, 4, 9, 4, 3, 10, 2, 5, 12, 8, 3, 1, 1, 2, 6, 3, 2, 1, 4]
+
+SIFATLAR = [
+    "", "", "", "Trabzon Hasır", "Zirkon Taşlı", "İnci", "Şahmeran", "Ajda", "Dorika", "Mega",
+    "Çocuk", "Nazar Boncuklu", "Sonsuzluk", "Kalp", "Çiçek", "Kelebek", "Yıldız", "Damla",
+    "Pırlanta Görünümlü", "Hasır", "Altın Kaplama", "İtalyan", "Ottoman", "Çift Sıra", "Özel Tasarım",
+]
+
+# Altın türüne göre geçerli ayarlar ve ağırlıkları
+AYAR_DAGILIMI = {22: 45, 14: 30, 18: 15, 24: 10}
+SIKKE_TURLERI = {"Çeyrek Altın", "Yarım Altın", "Tam Altın", "Cumhuriyet Altını"}
+
+# Has altın gram fiyatı (TL) ve ayara göre saflık oranı
+HAS_ALTIN_GRAM_FIYATI = 3200.0
+AYAR_SAFLIK = {8: 0.333, 14: 0.585, 18: 0.750, 22: 0.916, 24: 0.995}
+
+# Mevsimsellik: düğün sezonu (Mayıs-Eylül), Sevgililer Günü, Anneler Günü ve yılbaşı etkisi
+AY_CARPANI = {1: 0.8, 2: 1.0, 3: 0.85, 4: 0.95, 5: 1.3, 6: 1.45, 7: 1.5, 8: 1.55, 9: 1.35,
+              10: 1.0, 11: 0.9, 12: 1.15}
+GUN_CARPANI = {0: 0.85, 1: 0.9, 2: 0.95, 3: 1.0, 4: 1.15, 5: 1.6, 6: 0.55}
+OZEL_GUNLER = {(2, 14): 2.2, (12, 31): 1.8, (3, 8): 1.4}
+
+ADLAR = [
+    "Ayşe", "Fatma", "Emine", "Hatice", "Zeynep", "Elif", "Meryem", "Şerife", "Zehra", "Sultan",
+    "Hülya", "Özlem", "Gül", "Esra", "Büşra", "İrem", "Merve", "Ebru", "Çiğdem", "Gökçe",
+    "Mehmet", "Mustafa", "Ahmet", "Ali", "Hüseyin", "Hasan", "İbrahim", "İsmail", "Osman", "Yusuf",
+    "Murat", "Ömer", "Ramazan", "Halil", "Süleyman", "Abdullah", "Mahmut", "Salih", "Kemal", "Oğuz",
+]
+SOYADLAR = [
+    "Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Yıldırım", "Öztürk", "Aydın", "Özdemir",
+    "Arslan", "Doğan", "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Özkan", "Şimşek",
+    "Polat", "Özçelik", "Korkmaz", "Çakır", "Erdoğan", "Güneş", "Aksoy", "Işık", "Türkmen", "Güler",
+]
+HASARLAR = [
+    "Klipsi kırık", "Zinciri kopmuş", "Taşı düşmüş", "Ölçü küçültme", "Ölçü büyütme", "Kilit arızalı",
+    "Cila ve parlatma", "Lehim açılmış", "Kararma, temizlik", "Menteşe kırık", "Taş değişimi",
+    "Ezilme, düzeltme", "Halka açılmış", "İsim yazdırma",
+]
+TAMIR_DURUMLARI = ["Beklemede", "Tamirde", "Tamamlandı", "Teslim Edildi"]
+
+
+def _utc_offset_hours() -> int:
+    offset = datetime.now().astimezone().utcoffset()
+    return int(offset.total_seconds() // 3600)
+
+
+def _generate_products(rng: random.Random, count: int, start: date, end: date) -> list[tuple]:
+    ayarlar = list(AYAR_DAGILIMI)
+    ayar_agirlik = list(AYAR_DAGILIMI.values())
+    span_days = (end - start).days
+    rows = []
+    for i in range(count):
+        cins_adi, gram_ort, gram_sapma, onek = rng.choices(URUN_TURLERI, URUN_TURU_AGIRLIKLARI)[0]
+        if cins_adi in SIKKE_TURLERI:
+            ayar, gram = 22, gram_ort
+            cins = cins_adi
+        else:
+            ayar = 24 if cins_adi == "Gram Altın" else rng.choices(ayarlar, ayar_agirlik)[0]
+            gram = round(gram_ort * rng.lognormvariate(0, gram_sapma), 2) if gram_sapma else gram_ort
+            sifat = rng.choice(SIFATLAR)
+            cins = f"{sifat} {cins_adi}" if sifat else cins_adi
+        iscilik = 1.0 if cins_adi in SIKKE_TURLERI or cins_adi == "Gram Altın" else rng.uniform(1.05, 1.3)
+        maliyet = round(gram * HAS_ALTIN_GRAM_FIYATI * AYAR_SAFLIK[ayar] * iscilik, 2)
+        satis_fiyati = round(maliyet * rng.uniform(1.08, 1.35), 2)
+        # Çoğu üründen birkaç adet; bir kısmı tükenmiş, sikkelerden ise yüksek stok
+        stok = int(rng.expovariate(1 / 40)) if cins_adi in SIKKE_TURLERI else int(rng.expovariate(1 / 4))
+        eklenme = start + timedelta(days=rng.randrange(span_days + 1))
+        rows.append((f"{onek}{i + 1:07d}", cins, ayar, gram, maliyet, satis_fiyati, stok,
+                     None, None, eklenme.isoformat()))
+    return rows
+
+
+def _day_weights(start: date, end: date) -> tuple[list[date], list[float]]:
+    days, cumulative, total = [], [], 0.0
+    day = start
+    while day <= end:
+        weight = AY_CARPANI[day.month] * GUN_CARPANI[day.weekday()] * OZEL_GUNLER.get((day.month, day.day), 1.0)
+        # Anneler Günü: Mayıs'ın ikinci pazarı ve önceki hafta
+        if day.month == 5 and 8 <= day.day <= 14:
+            weight *= 1.5
+        total += weight
+        days.append(day)
+        cumulative.append(total)
+        day += timedelta(days=1)
+    return days, cumulative
+
+
+def _daily_counts(rng: random.Random, count: int, day_cum: list[float]) -> list[int]:
+    """Toplam hareket sayısını günlere ağırlıklarıyla orantılı (rastgele yuvarlamayla) dağıtır."""
+    total = day_cum[-1]
+    counts, previous, assigned = [], 0.0, 0
+    for cum in day_cum:
+        expected = count * (cum - previous) / total
+        previous = cum
+        n = int(expected + rng.random())
+        counts.append(n)
+        assigned += n
+    # Yuvarlama farkı son güne yazılır
+    counts[-1] = max(0, counts[-1] + count - assigned)
+    return counts
+
+
+def _generate_movements(rng: random.Random, count: int, products: list[tuple], start: date, end: date):
+    """
+    (urun_id, tip, adet, birim_fiyat, toplam_tutar, tarih, gun, cins, ayar, birim_maliyet)
+    satırlarını parti parti üretir.
+    Gerçek kullanımdaki gibi hareketler kronolojik sırada eklenir (id ile tarih birlikte artar).
+    """
+    days, day_cum = _day_weights(start, end)
+    counts = _daily_counts(rng, count, day_cum)
+
+    # Popülerlik: az sayıda ürün satışların büyük kısmını oluşturur (Zipf benzeri)
+    product_ids = list(range(1, len(products) + 1))
+    rng.shuffle(product_ids)
+    product_cum, total = [], 0.0
+    for rank in range(1, len(product_ids) + 1):
+        total += 1 / rank ** 0.8
+        product_cum.append(total)
+    maliyetler = [p[4] for p in products]
+    satislar = [p[5] for p in products]
+
+    offset = _utc_offset_hours()
+    batch = []
+    for day, n in zip(days, counts):
+        if not n:
+            continue
+        day_string = day.isoformat()
+        day_key = day.year * 10000 + day.month * 100 + day.day
+        # Dükkan 10:00-20:00 arası açık; gün içindeki saniyeler sıralı üretilir
+        seconds = sorted(rng.randrange(10 * 3600, 20 * 3600) for _ in range(n))
+        for urun_id, second in zip(rng.choices(product_ids, cum_weights=product_cum, k=n), seconds):
+            satis = rng.random() < 0.7
+            adet = 1 if rng.random() < 0.85 else rng.randint(2, 5)
+            birim = satislar[urun_id - 1] if satis else maliyetler[urun_id - 1]
+            # tarih sütunu CURRENT_TIMESTAMP gibi UTC tutulur
+            utc_saat = second // 3600 - offset
+            if 0 <= utc_saat < 24:
+                tarih = f"{day_string} {utc_saat:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+            else:
+                local = datetime.combine(day, datetime.min.time()) + timedelta(seconds=second)
+                tarih = (local - timedelta(hours=offset)).strftime("%Y-%m-%d %H:%M:%S")
+            urun = products[urun_id - 1]
+            batch.append((urun_id, 'Satış' if satis else 'Alış', adet, birim, adet * birim, tarih, day_key,
+                          urun[1], urun[2], urun[4]))
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _generate_repairs(rng: random.Random, count: int, start: date, end: date) -> list[tuple]:
+    span_days = (end - start).days
+    rows = []
+    for _ in range(count):
+        alinan = start + timedelta(days=rng.randrange(span_days + 1))
+        yas = (end - alinan).days
+        # Eski kayıtların çoğu teslim edilmiş, yeniler hâlâ atölyede
+        if yas > 30:
+            durum = rng.choices(TAMIR_DURUMLARI, [1, 1, 3, 95])[0]
+        else:
+            durum = rng.choices(TAMIR_DURUMLARI, [35, 35, 20, 10])[0]
+        telefon = f"05{rng.randint(30, 59)} {rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}"
+        cins_adi = rng.choices(URUN_TURLERI, URUN_TURU_AGIRLIKLARI)[0][0]
+        rows.append((
+            f"{rng.choice(ADLAR)} {rng.choice(SOYADLAR)}", telefon, cins_adi, rng.choice(HASARLAR),
+            alinan.isoformat(), (alinan + timedelta(days=rng.randint(2, 14))).isoformat(),
+            round(rng.uniform(150, 2500), -1), durum, None
+        ))
+    return rows
+
+
+def generate(products: int, movements: int, repairs: int, years: int = 3, seed: int = 42):
+    """Veritabanını (LOCALAPPDATA'ya göre) oluşturur ve sentetik veriyle doldurur."""
+    from app.database import create_table, pooled_connection, close_all, checkpoint_wal
+    from app.utils import DATABASE_PATH
+
+    if os.path.exists(DATABASE_PATH):
+        sys.exit(f"{DATABASE_PATH} zaten mevcut; boş bir --data-dir seçin.")
+
+    rng = random.Random(seed)
+    end = date.today()
+    start = end - timedelta(days=365 * years)
+    create_table()
+
+    t0 = time.perf_counter()
+    with pooled_connection() as conn:
+        # Yalnızca bu yükleme bağlantısı için: çökme güvenliği yerine hız
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute(f"PRAGMA cache_size = {LOAD_CACHE_KIB}")
+
+        product_rows = _generate_products(rng, products, start, end)
+        conn.executemany(
+            """INSERT INTO urunler (urun_kodu, cins, ayar, gram, maliyet, satis_fiyati, stok_adeti,
+                                    aciklama, resim_yolu, eklenme_tarihi)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", product_rows)
+        conn.commit()
+        print(f"{products:,} ürün eklendi ({time.perf_counter() - t0:.1f} sn)")
+
+        inserted = 0
+        for batch in _generate_movements(rng, movements, product_rows, start, end):
+            conn.executemany(
+                """INSERT INTO hareketler (urun_id, tip, adet, birim_fiyat, toplam_tutar, tarih, gun,
+                                           cins, ayar, birim_maliyet)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", batch)
+            conn.commit()
+            reported = inserted // 1_000_000
+            inserted += len(batch)
+            if inserted // 1_000_000 > reported or inserted == movements:
+                print(f"{inserted:,} hareket eklendi ({time.perf_counter() - t0:.1f} sn)")
+
+        conn.executemany(
+            """INSERT INTO tamirler (musteri_ad_soyad, musteri_telefon, urun_aciklamasi, hasar_tespiti,
+                                     alinan_tarih, tahmini_teslim_tarihi, tamir_ucreti, durum, notlar)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", _generate_repairs(rng, repairs, start, end))
+        conn.commit()
+        print(f"{repairs:,} tamir kaydı eklendi ({time.perf_counter() - t0:.1f} sn)")
+
+        conn.execute("ANALYZE")
+    checkpoint_wal()
+    close_all()
+    print(f"Veri seti hazır: {DATABASE_PATH} ({os.path.getsize(DATABASE_PATH) / 1e6:,.0f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentetik StokGold veritabanı üretir.")
+    parser.add_argument("--data-dir", required=True, help="LOCALAPPDATA yerine kullanılacak klasör")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--products", type=int, help="ürün sayısı (--scale değerini ezer)")
+    parser.add_argument("--movements", type=int, help="hareket sayısı (--scale değerini ezer)")
+    parser.add_argument("--repairs", type=int, help="tamir kaydı sayısı (--scale değerini ezer)")
+    parser.add_argument("--years", type=int, default=3, help="verinin kapsadığı yıl sayısı")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    products, movements, repairs = SCALES[args.scale]
+    # app.utils yolları import anında LOCALAPPDATA'dan hesaplar; app'ten önce ayarlanmalı
+    os.environ['LOCALAPPDATA'] = os.path.abspath(args.data_dir)
+    generate(args.products or products, args.movements or movements, args.repairs or repairs,
+             years=args.years, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+# MIT License
+# Copyright (c) 2025 Aykut Yahya Ay
+# See LICENSE file for full license details.
+
+"""
+app/database.py'deki genel fonksiyonları generate_dataset ile üretilmiş bir veri
+setine karşı ölçer.
+
+Kullanım:
+    python -m benchmarks.run_benchmarks --data-dir /tmp/stokgold-10k
+    python -m benchmarks.run_benchmarks --data-dir /tmp/stokgold-10k --writes --json after.json --compare before.json
+    python -m benchmarks.run_benchmarks --data-dir /tmp/stokgold-10k --filter Urun --memory
+
+Okuma ölçümleri veri setinin kendisinde çalışır. --writes verilirse yazma ölçümleri
+veri setinin geçici bir kopyasında çalışır; asıl veri seti değişmez. --memory her ölçüm
+için tek çağrıdaki en yüksek Python belleğini tracemalloc ile ekler.
+"""
+
+import argparse
+import inspect
+import itertools
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+# Ölçülmeyen altyapı fonksiyonları (bağlantı, ayar, şema yönetimi, tek seferlik arşivleme)
+INFRASTRUCTURE = {
+    'load_tuning_profile', 'set_tuning_profile', 'set_query_tracing', 'get_db_connection',
+    'pooled_connection', 'close_thread_connection', 'close_all', 'apply_migrations',
+    'create_table', 'check_external_changes', 'get_archive_path', 'archive_year',
+}
+
+
+def _fresh_connection(db, fn):
+    """
+    fn'i havuzsuz eski yol gibi çalıştırır: her çağrıdan sonra thread'in bağlantısı
+    kapatılır, böylece bir sonraki çağrı bağlantıyı baştan açar.
+    """
+    def call():
+        fn()
+        db.close_thread_connection()
+    return call
+
+
+# Satırdan model oluşturma ölçümlerinin satır sayısı; küçük veri setinde ürünler tekrarlanır
+HYDRATION_ROWS = 100_000
+
+
+def _row_to_urun_eski(row):
+    """from_db_row öncesindeki yol: sqlite3.Row'dan ada göre okuma, strptime ve doğrulayan kurucu."""
+    from app.models import Urun
+    tarih_objesi = datetime.strptime(row['eklenme_tarihi'], '%Y-%m-%d').date() if row['eklenme_tarihi'] else None
+    return Urun(
+        id=row['id'], urun_kodu=row['urun_kodu'], cins=row['cins'], ayar=row['ayar'], gram=row['gram'],
+        maliyet=row['maliyet'], satis_fiyati=row['satis_fiyati'], stok_adeti=row['stok_adeti'],
+        aciklama=row['aciklama'], resim_yolu=row['resim_yolu'], eklenme_tarihi=tarih_objesi,
+    )
+
+
+def _hydration_cases(db) -> dict:
+    """HYDRATION_ROWS ürün satırını okuyup Urun'a çevirir: eski yol ile from_db_row yolu yan yana."""
+    from app.models import Urun, URUN_COLUMNS
+    repeat_sql = f"""WITH RECURSIVE tekrar(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM tekrar WHERE i < ?1)
+                     SELECT {{columns}} FROM tekrar, urunler LIMIT ?2"""
+    with db.pooled_connection() as conn:
+        product_count = conn.execute("SELECT COUNT(*) FROM urunler").fetchone()[0]
+    repeat = -(-HYDRATION_ROWS // max(product_count, 1))
+
+    def old_path():
+        with db.pooled_connection() as conn:
+            rows = conn.execute(repeat_sql.format(columns="urunler.*"), (repeat, HYDRATION_ROWS)).fetchall()
+        return [_row_to_urun_eski(row) for row in rows]
+
+    def from_db_row():
+        with db.pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            sql = repeat_sql.format(columns=", ".join(f"urunler.{c}" for c in URUN_COLUMNS))
+            return list(map(Urun.from_db_row, cursor.execute(sql, (repeat, HYDRATION_ROWS))))
+
+    label = f"{HYDRATION_ROWS // 1000}k satır"
+    return {
+        f'Urun[{label}, eski yol]': old_path,
+        f'Urun.from_db_row[{label}]': from_db_row,
+    }
+
+
+def _read_cases(db) -> dict:
+    today = date.today()
+    first_page, next_key = db.get_products_page(limit=100)
+    busiest_day = _busiest_recent_day(db)
+    return {
+        'get_storage_diagnostics': lambda: db.get_storage_diagnostics(),
+        'get_all_products': lambda: db.get_all_products(),
+        'get_products_page[ilk]': lambda: db.get_products_page(limit=100),
+        'get_products_page[sonraki]': lambda: db.get_products_page(after_key=next_key, limit=100),
+        'get_products_by_ids[100]': lambda: db.get_products_by_ids([urun.id for urun in first_page]),
+        'get_products_page[filtre]': lambda: db.get_products_page(limit=100, sort='stok_adeti',
+                                                                  filters={'ayar': 22, 'max_stok': 2}),
+        'search_products[kelime]': lambda: db.search_products("yüzük"),
+        'search_products[kod]': lambda: db.search_products(first_page[0].urun_kodu if first_page else "YZ"),
+        'search_products[kısa]': lambda: db.search_products("ka"),
+        'get_total_inventory_value': lambda: db.get_total_inventory_value(),
+        'get_product_counts_by_type': lambda: db.get_product_counts_by_type(),
+        'get_total_grams': lambda: db.get_total_grams(),
+        'get_summaries_for_range[30 gün]': lambda: db.get_summaries_for_range(
+            (today - timedelta(days=30)).isoformat(), today.isoformat()),
+        'get_daily_summary': lambda: db.get_daily_summary(busiest_day),
+        'get_daily_summary[yeni bağlantı]': _fresh_connection(db, lambda: db.get_daily_summary(busiest_day)),
+        'get_transactions_for_date': lambda: db.get_transactions_for_date(busiest_day),
+        'get_statistics_for_period[1 yıl]': lambda: db.get_statistics_for_period(
+            (today - timedelta(days=365)).isoformat(), today.isoformat()),
+        'get_low_stock_products': lambda: db.get_low_stock_products(5),
+        'get_low_stock_products[izleme]': lambda: db.get_low_stock_products(),
+        'get_product_variety_count': lambda: db.get_product_variety_count(),
+        'get_latest_products': lambda: db.get_latest_products(5),
+        'get_latest_products[yeni bağlantı]': _fresh_connection(db, lambda: db.get_latest_products(5)),
+        'get_dashboard_snapshot': lambda: db.get_dashboard_snapshot(use_cache=False),
+        'get_dashboard_snapshot[önbellek]': lambda: db.get_dashboard_snapshot(),
+        'verify_inventory_totals': lambda: db.verify_inventory_totals(),
+        'get_top_profitable_products': lambda: db.get_top_profitable_products(5),
+        'get_best_selling_products[30 gün]': lambda: db.get_best_selling_products(
+            (today - timedelta(days=29)).isoformat(), today.isoformat()),
+        'get_best_selling_products[1 yıl]': lambda: db.get_best_selling_products(
+            (today - timedelta(days=365)).isoformat(), today.isoformat(), by='adet'),
+        'get_archived_years': lambda: db.get_archived_years(),
+        'get_archivable_years': lambda: db.get_archivable_years(),
+        'get_all_tamirler': lambda: db.get_all_tamirler(),
+        'search_repairs': lambda: db.search_repairs("ayşe"),
+        'search_repair_ids': lambda: db.search_repair_ids("0532"),
+    }
+
+
+def _busiest_recent_day(db) -> str:
+    with db.pooled_connection() as conn:
+        row = conn.execute(
+            "SELECT gun FROM gunluk_ozet WHERE tip = 'Satış' GROUP BY gun ORDER BY SUM(islem_sayisi) DESC LIMIT 1"
+        ).fetchone()
+    return db._day_str(row[0]) if row else date.today().isoformat()
+
+
+def _write_cases(db) -> dict:
+    from app.models import Urun
+    from app.tamir_model import Tamir
+
+    counter = itertools.count()
+    urun = db.get_products_page(limit=1)[0][0]
+    tamir_id = db.add_tamir(Tamir(musteri_ad_soyad="Benchmark Müşteri", urun_aciklamasi="Yüzük"))
+    tamir = next(t for t in db.search_repairs("Benchmark") if t.id == tamir_id)
+
+    def add_and_delete_product():
+        new_id = db.add_product(Urun(urun_kodu=f"BENCH-{next(counter)}", cins="Benchmark Yüzük", stok_adeti=1))
+        db.delete_product(new_id)
+
+    def add_products_bulk_100():
+        batch = next(counter)
+        db.add_products_bulk([Urun(urun_kodu=f"BULK-{batch}-{i}", cins="Benchmark Kolye") for i in range(100)])
+
+    def purchase_then_sale():
+        db.record_movement(urun.id, 'Alış', 1, urun.maliyet)
+        db.record_movement(urun.id, 'Satış', 1, urun.satis_fiyati)
+
+    # Aynı 64 hareket (32 alış + 32 satış) önce tek tek commit ile, sonra yazma kuyruğuyla
+    def record_movements_64():
+        for _ in range(32):
+            db.record_movement(urun.id, 'Alış', 1, urun.maliyet)
+            db.record_movement(urun.id, 'Satış', 1, urun.satis_fiyati)
+
+    def queue_movements_64():
+        movement_queue = db.get_movement_queue()
+        futures = []
+        for _ in range(32):
+            futures.append(movement_queue.submit(urun.id, 'Alış', 1, urun.maliyet))
+            futures.append(movement_queue.submit(urun.id, 'Satış', 1, urun.satis_fiyati))
+        for future in futures:
+            future.result()
+
+    def stock_up_then_down():
+        db.update_stock(urun.id, 1)
+        db.update_stock(urun.id, -1)
+
+    def add_and_delete_tamir():
+        db.delete_tamir(db.add_tamir(Tamir(musteri_ad_soyad="Benchmark", urun_aciklamasi="Küpe")))
+
+    return {
+        'add_product+delete_product': add_and_delete_product,
+        'add_products_bulk[100]': add_products_bulk_100,
+        'update_product': lambda: db.update_product(urun),
+        'update_stock[+1,-1]': stock_up_then_down,
+        'update_stock[+1,-1, yeni bağlantı]': _fresh_connection(db, stock_up_then_down),
+        'log_transaction': lambda: db.log_transaction(urun.id, 'Alış', 1, urun.maliyet),
+        'record_movement[alış+satış]': purchase_then_sale,
+        'record_movement[64 hareket]': record_movements_64,
+        'get_movement_queue[64 hareket]': queue_movements_64,
+        'add_tamir+delete_tamir': add_and_delete_tamir,
+        'update_tamir': lambda: db.update_tamir(tamir),
+        'checkpoint_wal': lambda: db.checkpoint_wal(),
+        'rebuild_daily_rollup': lambda: db.rebuild_daily_rollup(),
+        'rebuild_inventory_totals': lambda: db.rebuild_inventory_totals(),
+    }
+
+
+def _measure(fn, repeat: int, max_seconds: float) -> dict:
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    # Çok yavaş fonksiyonlarda (tam tarama, yeniden oluşturma) toplam süreyi sınırla
+    if elapsed * repeat > max_seconds:
+        repeat = max(1, int(max_seconds / elapsed))
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {'best_ms': min(times) * 1000, 'median_ms': statistics.median(times) * 1000, 'loops': number * repeat}
+
+
+def _peak_memory_mb(fn) -> float:
+    """fn'in tek çağrısında Python tarafında ayrılan en yüksek bellek (SQLite'ın kendi önbelleği hariç)."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+def _check_coverage(db, names: list[str]):
+    public = {name for name, fn in inspect.getmembers(db, inspect.isfunction)
+              if fn.__module__ == db.__name__ and not name.startswith('_')}
+    covered = {name.split('[')[0] for case in names for name in case.split('+')}
+    missing = sorted(public - covered - INFRASTRUCTURE)
+    if missing:
+        print(f"Uyarı: ölçülmeyen genel fonksiyonlar: {', '.join(missing)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StokGold veritabanı fonksiyonlarını ölçer.")
+    parser.add_argument("--data-dir", required=True, help="generate_dataset ile üretilmiş klasör")
+    parser.add_argument("--writes", action="store_true", help="yazma fonksiyonlarını da (geçici kopyada) ölç")
+    parser.add_argument("--filter", default="", help="yalnızca adında bu metin geçen ölçümler")
+    parser.add_argument("--profile", help="depolama ayar profili (safe, balanced, fast-pos)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="ölçüm başına üst süre sınırı")
+    parser.add_argument("--memory", action="store_true", help="her ölçüm için tracemalloc ile en yüksek belleği de ölç")
+    parser.add_argument("--json", help="sonuçları bu dosyaya yaz")
+    parser.add_argument("--compare", help="önceki --json çıktısıyla karşılaştır")
+    args = parser.parse_args()
+
+    data_dir = os.path.abspath(args.data_dir)
+    if not os.path.exists(os.path.join(data_dir, "StokGold", "stokgold.db")):
+        sys.exit(f"{data_dir} içinde veri seti yok; önce benchmarks.generate_dataset çalıştırın.")
+    if args.writes:
+        work_dir = tempfile.mkdtemp(prefix="stokgold-bench-")
+        shutil.copytree(os.path.join(data_dir, "StokGold"), os.path.join(work_dir, "StokGold"))
+        data_dir = work_dir
+
+    # app.utils yolları import anında LOCALAPPDATA'dan hesaplar; app'ten önce ayarlanmalı
+    os.environ['LOCALAPPDATA'] = data_dir
+    from app import database as db
+
+    if args.profile:
+        db.set_tuning_profile(args.profile)
+    db.create_table()
+
+    cases = _read_cases(db)
+    cases.update(_hydration_cases(db))
+    if args.writes:
+        cases.update(_write_cases(db))
+    _check_coverage(db, list(cases))
+
+    previous = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+
+    results = {}
+    header = f"{'ölçüm':40} {'en iyi (ms)':>12} {'medyan (ms)':>12} {'tekrar':>8}"
+    print(header + (f" {'bellek (MB)':>12}" if args.memory else ""))
+    for name, fn in cases.items():
+        if args.filter not in name:
+            continue
+        result = results[name] = _measure(fn, args.repeat, args.max_seconds)
+        line = f"{name:40} {result['best_ms']:12.3f} {result['median_ms']:12.3f} {result['loops']:8d}"
+        if args.memory:
+            result['peak_mb'] = _peak_memory_mb(fn)
+            line += f" {result['peak_mb']:12.1f}"
+        if name in previous:
+            line += f"   ({previous[name]['best_ms'] / result['best_ms']:.2f}x)"
+        print(line)
+
+    db.close_all()
+    if args.writes:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# MIT License
+# Copyright (c) 2025 Aykut Yahya Ay
+# See LICENSE file for full license details.
+
+"""
+Depolama ayar profillerinin (safe, balanced, fast-pos) satış hızına etkisini ölçer.
+
+Her profil için aynı sayıda satış iki yoldan yazılır:
+
+  * update_stock + log_transaction: eski yol, satış başına iki commit,
+  * record_movement: stok ve hareket tek BEGIN IMMEDIATE işleminde, tek commit.
+
+Sonuç saniyedeki satış sayısı olarak yazdırılır. Ölçüm geçici bir klasörde çalışır;
+--data-dir verilirse generate_dataset ile üretilmiş veri setinin kopyası kullanılır,
+asıl veri seti değişmez.
+
+Kullanım:
+    python -m benchmarks.sales_throughput --sales 2000
+    python -m benchmarks.sales_throughput --data-dir ./bench-data --sales 5000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+PROFILES = ('safe', 'balanced', 'fast-pos')
+START_STOCK = 10 ** 9
+
+
+def _two_commits(db, urun_id: int, sales: int):
+    for _ in range(sales):
+        db.update_stock(urun_id, -1)
+        db.log_transaction(urun_id, 'Satış', 1, 100.0)
+
+
+def _one_commit(db, urun_id: int, sales: int):
+    for _ in range(sales):
+        db.record_movement(urun_id, 'Satış', 1, 100.0)
+
+
+PATHS = {
+    'update_stock+log_transaction': _two_commits,
+    'record_movement': _one_commit,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ayar profillerine göre saniyedeki satış sayısını ölçer.")
+    parser.add_argument("--sales", type=int, default=2000, help="profil ve yol başına satış sayısı")
+    parser.add_argument("--data-dir", help="generate_dataset ile üretilmiş klasör (verilmezse boş veritabanı)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="stokgold-sales-") as work_dir:
+        if args.data_dir:
+            source = os.path.join(os.path.abspath(args.data_dir), "StokGold")
+            if not os.path.exists(os.path.join(source, "stokgold.db")):
+                sys.exit(f"{args.data_dir} içinde veri seti yok; önce benchmarks.generate_dataset çalıştırın.")
+            shutil.copytree(source, os.path.join(work_dir, "StokGold"))
+
+        # app.utils yolları import anında LOCALAPPDATA'dan hesaplar; app'ten önce ayarlanmalı
+        os.environ['LOCALAPPDATA'] = work_dir
+        from app import database as db
+        from app.models import Urun
+
+        db.create_table()
+        urun_id = db.add_product(Urun(urun_kodu="BENCH-SATIS", cins="Çeyrek Altın", stok_adeti=START_STOCK))
+
+        print(f"{'profil':10} {'yol':30} {'satış/sn':>10} {'ms/satış':>10}")
+        try:
+            for profile in PROFILES:
+                db.set_tuning_profile(profile)
+                for path, write in PATHS.items():
+                    started = time.perf_counter()
+                    write(db, urun_id, args.sales)
+                    elapsed = time.perf_counter() - started
+                    print(f"{profile:10} {path:30} {args.sales / elapsed:10,.0f} {elapsed * 1000 / args.sales:10.3f}")
+        finally:
+            db.close_all()
+
+
+if __name__ == "__main__":
+    main()
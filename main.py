@@ -4,9 +4,10 @@
 
 import sys
 from PySide6.QtWidgets import QApplication
-from app.database import create_table
+from app.database import create_table, close_all
 from app.utils import ensure_data_dirs_exist
 from app.ui.main_app_window import MainApplicationWindow
+from app.ui.query_runner import get_query_pool
 
 def main():
     """Uygulamanın ana giriş noktası."""
@@ -14,6 +15,9 @@ def main():
     ensure_data_dirs_exist()
     create_table()
     app = QApplication(sys.argv)
+    # Bağlantılar kapatılmadan önce arka planda süren sorgular bitirilir
+    app.aboutToQuit.connect(get_query_pool().waitForDone)
+    app.aboutToQuit.connect(close_all)
     window = MainApplicationWindow()
     window.showMaximized()
     sys.exit(app.exec())